@@ -0,0 +1 @@
+python3 src/bench_site.py "$@"
\ No newline at end of file
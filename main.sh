@@ -1,2 +1,5 @@
 python3 src/main.py
-cd docs && python3 -m http.server 8888
+# Rebuild affected outputs on every change while the dev server runs
+python3 src/main.py --incremental --watch &
+trap "kill $!" EXIT
+python3 -m http.server 8888 --directory docs
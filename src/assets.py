@@ -0,0 +1,220 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+
+from buildlog import log
+from manifest import hash_file, prune_empty_dirs
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+
+LINK_MODES = ("copy", "reflink", "hardlink")
+
+# ioctl request number for FICLONE (share all extents of one file with another)
+_FICLONE = 0x40049409
+
+# Copying is I/O bound, so use the same default as ThreadPoolExecutor
+DEFAULT_COPY_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+# Largest count handed to a single copy_file_range/sendfile call
+_KERNEL_COPY_CHUNK = 1 << 30
+
+
+def _copy_file_range(src_fd, dst_fd, offset, count):
+    return os.copy_file_range(src_fd, dst_fd, count, offset, offset)
+
+
+def _sendfile(src_fd, dst_fd, offset, count):
+    return os.sendfile(dst_fd, src_fd, offset, count)
+
+
+# Kernel-side copy primitives in order of preference; both need Linux
+_KERNEL_COPIES = [
+    copy
+    for copy, name in ((_copy_file_range, "copy_file_range"), (_sendfile, "sendfile"))
+    if hasattr(os, name)
+]
+
+
+def _kernel_copy(src_fd, dst_fd, size):
+    """Copy size bytes between file descriptors without userspace buffers.
+
+    Returns False if no kernel primitive works for this pair of files (e.g.
+    an unsupported filesystem), in which case nothing has been written.
+    """
+    for copy in _KERNEL_COPIES:
+        offset = 0
+        try:
+            while offset < size:
+                count = min(_KERNEL_COPY_CHUNK, size - offset)
+                sent = copy(src_fd, dst_fd, offset, count)
+                if sent == 0:
+                    # The source shrank while being copied
+                    break
+                offset += sent
+            return True
+        except OSError:
+            if offset:
+                raise
+    return False
+
+
+def copy_file_fast(src_path, dst_path):
+    """Copy a file's data and metadata, keeping the data in the kernel.
+
+    Uses os.copy_file_range, then os.sendfile, and only falls back to a
+    buffered userspace copy where neither is supported.
+    """
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        size = os.fstat(src.fileno()).st_size
+        if not _kernel_copy(src.fileno(), dst.fileno(), size):
+            shutil.copyfileobj(src, dst)
+    shutil.copystat(src_path, dst_path)
+
+
+def is_up_to_date(src_path, dst_path, checksum=False):
+    """Return True if dst_path already holds the contents of src_path.
+
+    Compares sizes plus either modification times (the default; copies keep
+    the source mtime) or, with checksum=True, content hashes.
+    """
+    try:
+        dst_stat = os.stat(dst_path)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src_path)
+    if (src_stat.st_dev, src_stat.st_ino) == (dst_stat.st_dev, dst_stat.st_ino):
+        # Hard-linked to the source
+        return True
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if checksum:
+        return hash_file(src_path) == hash_file(dst_path)
+    return src_stat.st_mtime_ns == dst_stat.st_mtime_ns
+
+
+def _reflink(src_path, dst_path):
+    if fcntl is None:
+        raise OSError("reflinks are not supported on this platform")
+    with open(src_path, "rb") as src, open(dst_path, "wb") as dst:
+        fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+    shutil.copystat(src_path, dst_path)
+
+
+def sync_file(src_path, dst_path, link_mode="copy"):
+    """Place src_path's contents at dst_path and return how it was done.
+
+    - "hardlink" links dst_path to the source inode
+    - "reflink" shares the source's data blocks on copy-on-write filesystems
+    - Either falls back to a regular copy (with metadata) where the
+      filesystem does not allow it
+    - The new file is written next to dst_path and moved into place, so the
+      old copy is never truncated in place
+    - Returns "hardlinked", "reflinked" or "copied"
+    """
+    if link_mode not in LINK_MODES:
+        raise ValueError(f"Unknown link mode: {link_mode}")
+    tmp_path = f"{dst_path}.{os.getpid()}.tmp"
+    try:
+        if link_mode == "hardlink":
+            try:
+                os.link(src_path, tmp_path)
+                os.replace(tmp_path, dst_path)
+                return "hardlinked"
+            except OSError:
+                pass
+        elif link_mode == "reflink":
+            try:
+                _reflink(src_path, tmp_path)
+                os.replace(tmp_path, dst_path)
+                return "reflinked"
+            except OSError:
+                pass
+        copy_file_fast(src_path, tmp_path)
+        os.replace(tmp_path, dst_path)
+        return "copied"
+    finally:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+
+
+def sync_files(pairs, link_mode="copy", workers=DEFAULT_COPY_WORKERS):
+    """Run sync_file for every (src_path, dst_path) pair on a thread pool.
+
+    Destination directories must already exist. Returns the actions in the
+    order of pairs.
+    """
+    if workers <= 1 or len(pairs) <= 1:
+        return [sync_file(src, dst, link_mode) for src, dst in pairs]
+    with ThreadPoolExecutor(max_workers=min(workers, len(pairs))) as executor:
+        return list(
+            executor.map(lambda pair: sync_file(pair[0], pair[1], link_mode), pairs)
+        )
+
+
+def sync_tree(
+    src_dir,
+    dst_dir,
+    manifest=None,
+    link_mode="copy",
+    checksum=False,
+    clean=False,
+    workers=DEFAULT_COPY_WORKERS,
+):
+    """Bring the static files in dst_dir in line with src_dir.
+
+    - clean=True deletes dst_dir first (a from-scratch build)
+    - Only files that are missing or differ (see is_up_to_date) are written
+    - Every destination directory is created first, then the files are
+      written by a pool of `workers` threads
+    - With a BuildManifest, files synced by an earlier run whose source is
+      gone are deleted, and the set of synced files is recorded; rendered
+      pages in dst_dir are never touched
+    - Logs each written file (verbose only) and returns a dict of counts per
+      action
+    """
+    if not os.path.exists(src_dir):
+        raise FileNotFoundError(f"Source directory does not exist: {src_dir}")
+
+    if clean and os.path.exists(dst_dir):
+        shutil.rmtree(dst_dir)
+    os.makedirs(dst_dir, exist_ok=True)
+
+    counts = {"copied": 0, "reflinked": 0, "hardlinked": 0, "unchanged": 0}
+    synced = {}
+    pending = []
+    for root, _dirs, files in os.walk(src_dir, followlinks=True):
+        rel_dir = os.path.relpath(root, src_dir)
+        dst_root = dst_dir if rel_dir == "." else os.path.join(dst_dir, rel_dir)
+        os.makedirs(dst_root, exist_ok=True)
+        for filename in sorted(files):
+            src_path = os.path.join(root, filename)
+            dst_path = os.path.join(dst_root, filename)
+            synced[dst_path] = src_path
+            if is_up_to_date(src_path, dst_path, checksum):
+                counts["unchanged"] += 1
+            else:
+                pending.append((src_path, dst_path))
+
+    actions = sync_files(pending, link_mode, workers)
+    for (src_path, dst_path), action in zip(pending, actions):
+        counts[action] += 1
+        if log.verbose:
+            log.detail(f"{action.capitalize()} {src_path} -> {dst_path}")
+    log.count("files", len(pending))
+    log.count("bytes", sum(os.path.getsize(dst_path) for _src, dst_path in pending))
+    log.count("unchanged_files", counts["unchanged"])
+
+    counts["removed"] = 0
+    if manifest is not None:
+        for dst_path in sorted(set(manifest.assets) - set(synced)):
+            if os.path.isfile(dst_path):
+                os.remove(dst_path)
+                prune_empty_dirs(os.path.dirname(dst_path), dst_dir)
+                counts["removed"] += 1
+                log.info(f"Removed stale asset {dst_path}")
+        manifest.assets = synced
+    return counts
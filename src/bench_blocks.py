@@ -0,0 +1,69 @@
+"""Compare scan_markdown_blocks with the split-then-classify block pipeline.
+
+Both sides turn a synthetic page (bench_corpus.make_page) into the HTML of
+each block: the pipeline with the reference splitter and per-block helpers
+kept in test_utils, the scanner with scan_markdown_blocks and
+block_lines_to_html_node. Throughput is reported in MB of markdown per
+second.
+
+Usage: python3 src/bench_blocks.py [--paragraphs N ...] [--words N] [--repeat R]
+"""
+
+import argparse
+import timeit
+
+from bench_corpus import make_page
+from test_utils import _reference_block_html, _reference_blocks
+from utils import block_lines_to_html_node, scan_markdown_blocks
+
+
+def pipeline_html(markdown):
+    return [_reference_block_html(block) for block in _reference_blocks(markdown)]
+
+
+def scanner_html(markdown):
+    blocks = scan_markdown_blocks(markdown.split("\n"))
+    return [block_lines_to_html_node(*block).to_html() for block in blocks]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, nargs="+", default=[20, 200, 2000])
+    parser.add_argument("--words", type=int, default=60, help="words per block")
+    parser.add_argument(
+        "--markup-every",
+        type=int,
+        default=8,
+        help="words per inline markup span; raise it to weigh block parsing more",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(
+        f"{'blocks':>8} {'KB':>8} {'pipeline MB/s':>14} {'scanner MB/s':>13}"
+        f" {'speedup':>8}"
+    )
+    for paragraphs in args.paragraphs:
+        markdown = make_page("Bench", paragraphs, args.words, args.markup_every)
+        assert scanner_html(markdown) == pipeline_html(markdown)
+        megabytes = len(markdown.encode("utf-8")) / 1e6
+        number = max(5, 10000 // paragraphs)
+        old = min(
+            timeit.repeat(
+                lambda: pipeline_html(markdown), number=number, repeat=args.repeat
+            )
+        )
+        new = min(
+            timeit.repeat(
+                lambda: scanner_html(markdown), number=number, repeat=args.repeat
+            )
+        )
+        print(
+            f"{paragraphs:>8} {megabytes * 1000:>8.1f}"
+            f" {megabytes * number / old:>14.2f} {megabytes * number / new:>13.2f}"
+            f" {old / new:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""Generate a synthetic site (content/, static/ and template.html) for benchmarks.
+
+Usage: python3 src/bench_corpus.py DEST [--pages N] [--paragraphs N] ...
+"""
+
+import argparse
+import os
+import random
+
+from bench_inline import make_paragraph
+
+
+TEMPLATE = """<!doctype html>
+<html>
+<head>
+<title>{{ Title }}</title>
+<link href="/index.css" rel="stylesheet" />
+</head>
+<body>
+<article>{{ Content }}</article>
+</body>
+</html>
+"""
+
+_LINE_WORDS = 12
+
+
+def make_page(title, paragraphs, words, markup_every=8, seed=0):
+    """Return a markdown page mixing every block type the converter handles.
+
+    paragraphs sets the page size; every block has roughly `words` words and
+    an inline markup span every `markup_every` words.
+    """
+    rng = random.Random(seed)
+    blocks = [f"# {title}"]
+    for i in range(paragraphs):
+        text = make_paragraph(words, markup_every, seed=rng.random())
+        # List and quote lines are generated whole so no markup span is split
+        lines = [
+            make_paragraph(_LINE_WORDS, markup_every, seed=rng.random())
+            for _ in range(max(1, words // _LINE_WORDS))
+        ]
+        kind = i % 6
+        if kind == 1:
+            blocks.append(f"## Section {i}")
+            blocks.append(text)
+        elif kind == 2:
+            blocks.append("\n".join(f"- {line}" for line in lines))
+        elif kind == 3:
+            blocks.append("\n".join(f"> {line}" for line in lines))
+        elif kind == 4:
+            blocks.append(
+                "\n".join(f"{n}. {line}" for n, line in enumerate(lines, 1))
+            )
+        elif kind == 5 and i % 12 == 5:
+            blocks.append(f"```\ndef f{i}(x):\n    return x * {i}\n```")
+        else:
+            blocks.append(text)
+    return "\n\n".join(blocks) + "\n"
+
+
+def make_corpus(
+    dest,
+    pages=100,
+    paragraphs=20,
+    words=60,
+    markup_every=8,
+    depth=2,
+    static_files=20,
+    static_size=64 * 1024,
+    seed=0,
+):
+    """Write a synthetic site into dest and return its paths.
+
+    - pages markdown files are spread over a directory tree `depth` levels
+      deep under dest/content
+    - static_files files of static_size bytes go under dest/static
+    - Returns a dict with the "content", "static" and "template" paths
+    """
+    rng = random.Random(seed)
+    content = os.path.join(dest, "content")
+    static = os.path.join(dest, "static")
+    template = os.path.join(dest, "template.html")
+    os.makedirs(content, exist_ok=True)
+    os.makedirs(static, exist_ok=True)
+    with open(template, "w", encoding="utf-8") as f:
+        f.write(TEMPLATE)
+
+    for i in range(pages):
+        # Spread pages over a few branches at every level down to depth
+        parts = [f"level{level}-{(i >> level) % 3}" for level in range(depth)]
+        path = os.path.join(content, *parts, f"page{i}.md")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        markdown = make_page(
+            f"Page {i}", paragraphs, words, markup_every, seed=rng.random()
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(markdown)
+
+    for i in range(static_files):
+        subdir = os.path.join(static, "images" if i % 2 else "css")
+        os.makedirs(subdir, exist_ok=True)
+        with open(os.path.join(subdir, f"asset{i}.bin"), "wb") as f:
+            f.write(rng.randbytes(static_size))
+
+    return {"content": content, "static": static, "template": template}
+
+
+def add_corpus_arguments(parser):
+    """Add the make_corpus options to an argparse parser."""
+    parser.add_argument("--pages", type=int, default=100)
+    parser.add_argument(
+        "--paragraphs", type=int, default=20, help="blocks per page (page size)"
+    )
+    parser.add_argument("--words", type=int, default=60, help="words per block")
+    parser.add_argument(
+        "--markup-every",
+        type=int,
+        default=8,
+        help="one inline markup span every N words (markup density)",
+    )
+    parser.add_argument("--depth", type=int, default=2, help="directory nesting depth")
+    parser.add_argument("--static-files", type=int, default=20)
+    parser.add_argument(
+        "--static-size", type=int, default=64 * 1024, help="bytes per static file"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def corpus_options(args):
+    """Return the make_corpus keyword arguments from parsed arguments."""
+    return {
+        "pages": args.pages,
+        "paragraphs": args.paragraphs,
+        "words": args.words,
+        "markup_every": args.markup_every,
+        "depth": args.depth,
+        "static_files": args.static_files,
+        "static_size": args.static_size,
+        "seed": args.seed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("dest")
+    add_corpus_arguments(parser)
+    args = parser.parse_args()
+    paths = make_corpus(args.dest, **corpus_options(args))
+    print(f"Wrote {args.pages} pages to {paths['content']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""Micro-benchmarks for the hot-path helpers against their original versions.
+
+Each row times the current function and a copy of the implementation it
+replaced (per-call constant construction and uncompiled regex patterns) on
+the same input.
+
+Usage: python3 src/bench_hotpaths.py [--number N]
+"""
+
+import argparse
+import re
+import timeit
+
+from blocknode import BlockType, block_to_block_type
+from htmlnode import LeafNode, ParentNode
+from utils import (
+    block_lines_to_html_node,
+    extract_markdown_images,
+    extract_markdown_links,
+    scan_markdown_blocks,
+    text_to_children,
+)
+
+
+def _legacy_leaf_to_html(node):
+    void_tags = {
+        "img",
+        "br",
+        "hr",
+        "input",
+        "meta",
+        "link",
+        "source",
+        "track",
+        "area",
+        "base",
+        "col",
+        "embed",
+        "param",
+        "wbr",
+    }
+    if node.tag is None:
+        return node.value
+    if node.tag in void_tags:
+        return f"<{node.tag}{node.props_to_html()} />"
+    if node.value is None:
+        raise ValueError("LeafNode must have a value")
+    return f"<{node.tag}{node.props_to_html()}>{node.value}</{node.tag}>"
+
+
+def _legacy_block_to_block_type(markdown):
+    heading_types = ["# ", "## ", "### ", "#### ", "##### ", "###### "]
+    num_and_dot_re = r"^\d+\.\ "
+    if any([markdown.startswith(ht) for ht in heading_types]):
+        return BlockType.HEADING
+    elif markdown.startswith(">"):
+        return BlockType.QUOTE
+    elif re.match(num_and_dot_re, markdown):
+        return BlockType.ORDERED_LIST
+    elif markdown.startswith("- "):
+        return BlockType.UNORDERED_LIST
+    elif markdown.startswith("```") and markdown.endswith("```"):
+        return BlockType.CODE
+    else:
+        return BlockType.PARAGRAPH
+
+
+def _legacy_extract_markdown_images(text):
+    return re.findall(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+
+
+def _legacy_extract_markdown_links(text):
+    return re.findall(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)", text)
+
+
+def _legacy_quote_block_to_node(block):
+    lines = []
+    for line in block.splitlines():
+        stripped = re.sub(r"^>\s?", "", line.strip())
+        if stripped != "":
+            lines.append(stripped)
+    return ParentNode("blockquote", text_to_children(" ".join(lines)))
+
+
+def _legacy_ol_block_to_node(block):
+    items = []
+    for line in block.splitlines():
+        s = line.strip()
+        if not s:
+            continue
+        m = re.match(r"^(\d+)\.\s+(.*)$", s)
+        if m:
+            items.append(ParentNode("li", text_to_children(m.group(2).strip())))
+    return ParentNode("ol", items)
+
+
+def _block_to_node(block):
+    return block_lines_to_html_node(*next(scan_markdown_blocks(block.split("\n"))))
+
+
+_BLOCKS = [
+    "# Heading",
+    "###### Small heading",
+    "> quoted text",
+    "12. numbered item",
+    "- bullet item",
+    "```\ncode\n```",
+    "A plain paragraph that is not any other block type.",
+]
+_INLINE = " ".join(
+    ["see [docs](/docs) and ![logo](/images/logo.png) for more words here"] * 10
+)
+_QUOTE = "\n".join(f"> quoted line {i} with some text" for i in range(20))
+_OL = "\n".join(f"{i}. ordered item {i} with some text" for i in range(1, 21))
+_LEAVES = [
+    LeafNode("b", "bold"),
+    LeafNode("img", None, {"src": "/x.png", "alt": "x"}),
+    LeafNode(None, "plain text"),
+    LeafNode("a", "link", {"href": "/page"}),
+]
+
+
+def _cases():
+    return [
+        (
+            "LeafNode.to_html",
+            lambda: [leaf.to_html() for leaf in _LEAVES],
+            lambda: [_legacy_leaf_to_html(leaf) for leaf in _LEAVES],
+        ),
+        (
+            "block_to_block_type",
+            lambda: [block_to_block_type(b) for b in _BLOCKS],
+            lambda: [_legacy_block_to_block_type(b) for b in _BLOCKS],
+        ),
+        (
+            "extract_markdown_images",
+            lambda: extract_markdown_images(_INLINE),
+            lambda: _legacy_extract_markdown_images(_INLINE),
+        ),
+        (
+            "extract_markdown_links",
+            lambda: extract_markdown_links(_INLINE),
+            lambda: _legacy_extract_markdown_links(_INLINE),
+        ),
+        (
+            "quote block",
+            lambda: _block_to_node(_QUOTE),
+            lambda: _legacy_quote_block_to_node(_QUOTE),
+        ),
+        (
+            "ordered list block",
+            lambda: _block_to_node(_OL),
+            lambda: _legacy_ol_block_to_node(_OL),
+        ),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'function':<24} {'before us':>10} {'after us':>10} {'speedup':>8}")
+    for name, new, old in _cases():
+        new_time = min(timeit.repeat(new, number=args.number, repeat=args.repeat))
+        old_time = min(timeit.repeat(old, number=args.number, repeat=args.repeat))
+        per_call = 1e6 / args.number
+        print(
+            f"{name:<24} {old_time * per_call:>10.2f} {new_time * per_call:>10.2f}"
+            f" {old_time / new_time:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
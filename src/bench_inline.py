@@ -0,0 +1,63 @@
+"""Compare scan_inline with the original five-pass inline pipeline.
+
+Usage: python3 src/bench_inline.py [--words N ...] [--repeat R]
+"""
+
+import argparse
+import random
+import timeit
+
+from inline import scan_inline
+from utils import _text_to_textnodes_split
+
+
+_MARKUP = [
+    "**bold words**",
+    "_italic words_",
+    "`inline code`",
+    "[a link](https://example.com/page)",
+    "![an image](/images/picture.png)",
+]
+
+
+def make_paragraph(words, markup_every=8, seed=0):
+    """Return a paragraph of roughly `words` words with regular inline markup."""
+    rng = random.Random(seed)
+    parts = []
+    for i in range(words):
+        if i % markup_every == markup_every - 1:
+            parts.append(rng.choice(_MARKUP))
+        else:
+            parts.append(rng.choice(["lorem", "ipsum", "dolor", "sit", "amet"]))
+    return " ".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--words", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'words':>8} {'pipeline ms':>12} {'scanner ms':>12} {'speedup':>8}")
+    for words in args.words:
+        text = make_paragraph(words)
+        assert scan_inline(text) == _text_to_textnodes_split(text)
+        number = max(1, 20000 // words)
+        old = min(
+            timeit.repeat(
+                lambda: _text_to_textnodes_split(text),
+                number=number,
+                repeat=args.repeat,
+            )
+        )
+        new = min(
+            timeit.repeat(lambda: scan_inline(text), number=number, repeat=args.repeat)
+        )
+        print(
+            f"{words:>8} {old / number * 1000:>12.3f} {new / number * 1000:>12.3f}"
+            f" {old / new:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
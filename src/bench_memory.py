@@ -0,0 +1,97 @@
+"""Measure per-node memory of the slotted node classes on a synthetic document.
+
+Compares TextNode and LeafNode/ParentNode against dict-based equivalents
+(the pre-__slots__ class layout) holding the same values.
+
+Usage: python3 src/bench_memory.py [--paragraphs N]
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+from bench_inline import make_paragraph
+from htmlnode import LeafNode, ParentNode
+from inline import scan_inline
+from textnode import TextNode
+from utils import markdown_to_html_node, text_node_to_html_node
+
+
+class _DictTextNode:
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type
+        self.url = url
+
+
+class _DictHTMLNode:
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+def _traced_bytes(build):
+    """Return (result, bytes allocated while calling build())."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return result, after - before
+
+
+def make_document(paragraphs):
+    return "\n\n".join(
+        f"## Section {i}\n\n{make_paragraph(200, seed=i)}" for i in range(paragraphs)
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paragraphs", type=int, default=500)
+    args = parser.parse_args()
+
+    md = make_document(args.paragraphs)
+    # Build the inputs up front so only the node objects are measured
+    text_nodes = [n for p in md.split("\n\n") for n in scan_inline(p)]
+    fields = [(n.text, n.text_type, n.url) for n in text_nodes]
+    leaves = [text_node_to_html_node(n) for n in text_nodes]
+    leaf_fields = [(n.tag, n.value, n.props) for n in leaves]
+    count = len(fields)
+
+    rows = []
+    _, slotted = _traced_bytes(lambda: [TextNode(*f) for f in fields])
+    _, legacy = _traced_bytes(lambda: [_DictTextNode(*f) for f in fields])
+    rows.append(("TextNode", slotted / count, legacy / count))
+
+    _, slotted = _traced_bytes(lambda: [LeafNode(*f) for f in leaf_fields])
+    _, legacy = _traced_bytes(
+        lambda: [_DictHTMLNode(t, v, None, p) for t, v, p in leaf_fields]
+    )
+    rows.append(("LeafNode", slotted / count, legacy / count))
+
+    _, slotted = _traced_bytes(lambda: [ParentNode("p", leaves) for _ in fields])
+    _, legacy = _traced_bytes(
+        lambda: [_DictHTMLNode("p", None, leaves) for _ in fields]
+    )
+    rows.append(("ParentNode", slotted / count, legacy / count))
+
+    print(f"{count} nodes per class, bytes per node (including list slot)")
+    print(f"{'class':<12} {'slots':>8} {'dict':>8} {'saved':>8}")
+    for name, new, old in rows:
+        print(f"{name:<12} {new:>8.1f} {old:>8.1f} {1 - new / old:>7.1%}")
+
+    _, tree_bytes = _traced_bytes(lambda: markdown_to_html_node(md))
+    print(
+        f"markdown_to_html_node on a {len(md) / 1e6:.1f} MB document:"
+        f" {tree_bytes / 1e6:.1f} MB retained"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""Time the build pipeline on a synthetic site and save the results as JSON.
+
+Generates a corpus with bench_corpus.make_corpus, then times
+generate_pages_recursive, markdown_to_html_node, text_to_textnodes and
+copy_tree_clean on it. With --compare, each timing is checked against an
+earlier results file and the script exits with status 1 if any benchmark
+got slower than --threshold allows.
+
+Usage: python3 src/bench_site.py [--pages N ...] [--output FILE] [--compare FILE]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench_corpus import add_corpus_arguments, corpus_options, make_corpus
+from blocknode import BlockType
+from utils import (
+    copy_tree_clean,
+    generate_pages_recursive,
+    markdown_to_html_node,
+    scan_markdown_blocks,
+    text_to_textnodes,
+)
+
+
+def _time(func, repeat):
+    # Output from the build functions would swamp the results table
+    runs = []
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            func()
+            runs.append(time.perf_counter() - start)
+    return {"min": min(runs), "median": statistics.median(runs), "runs": runs}
+
+
+def _read_pages(content_dir):
+    pages = []
+    for root, _dirs, files in os.walk(content_dir):
+        for filename in sorted(files):
+            with open(os.path.join(root, filename), encoding="utf-8") as f:
+                pages.append(f.read())
+    return pages
+
+
+def _inline_texts(pages):
+    # The text of every paragraph, the bulk of text_to_textnodes' input
+    texts = []
+    for markdown in pages:
+        for block, block_type, _lines in scan_markdown_blocks(markdown.split("\n")):
+            if block_type is BlockType.PARAGRAPH:
+                texts.append(block.replace("\n", " "))
+    return texts
+
+
+def run_benchmarks(paths, repeat=5, jobs=1):
+    """Return {benchmark name: timings} for a corpus from make_corpus."""
+    pages = _read_pages(paths["content"])
+    texts = _inline_texts(pages)
+    with tempfile.TemporaryDirectory() as out:
+        docs = os.path.join(out, "docs")
+        assets = os.path.join(out, "assets")
+        return {
+            "generate_pages_recursive": _time(
+                lambda: generate_pages_recursive(
+                    paths["content"], paths["template"], docs, "/", jobs=jobs
+                ),
+                repeat,
+            ),
+            "markdown_to_html_node": _time(
+                lambda: [markdown_to_html_node(markdown) for markdown in pages],
+                repeat,
+            ),
+            "text_to_textnodes": _time(
+                lambda: [text_to_textnodes(text) for text in texts], repeat
+            ),
+            "copy_tree_clean": _time(
+                lambda: copy_tree_clean(paths["static"], assets), repeat
+            ),
+        }
+
+
+def _git_commit():
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def compare(results, baseline, threshold):
+    """Print each benchmark against baseline; return the names that regressed.
+
+    A benchmark regresses when its minimum time exceeds the baseline's by
+    more than the threshold ratio (1.10 allows a 10% slowdown).
+    """
+    regressed = []
+    print(f"{'benchmark':<26} {'baseline ms':>12} {'current ms':>12} {'ratio':>7}")
+    for name, timing in results.items():
+        old = baseline.get(name)
+        if old is None:
+            continue
+        ratio = timing["min"] / old["min"] if old["min"] else float("inf")
+        flag = "  REGRESSED" if ratio > threshold else ""
+        print(
+            f"{name:<26} {old['min'] * 1000:>12.2f} {timing['min'] * 1000:>12.2f}"
+            f" {ratio:>6.2f}x{flag}"
+        )
+        if ratio > threshold:
+            regressed.append(name)
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    add_corpus_arguments(parser)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-j", "--jobs", type=int, default=1)
+    parser.add_argument(
+        "--output", default="bench-results.json", help="where to save the results"
+    )
+    parser.add_argument("--compare", help="earlier results file to check against")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.10,
+        help="slowdown ratio treated as a regression (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    options = corpus_options(args)
+    with tempfile.TemporaryDirectory() as corpus:
+        paths = make_corpus(corpus, **options)
+        results = run_benchmarks(paths, args.repeat, args.jobs)
+
+    report = {
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "corpus": options,
+        "repeat": args.repeat,
+        "jobs": args.jobs,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+
+    print(f"{'benchmark':<26} {'min ms':>10} {'median ms':>10}")
+    for name, timing in results.items():
+        print(
+            f"{name:<26} {timing['min'] * 1000:>10.2f} {timing['median'] * 1000:>10.2f}"
+        )
+    print(f"Wrote {args.output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("corpus") != options:
+            print("Warning: baseline was measured on a different corpus")
+        if compare(results, baseline["results"], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import hashlib
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+from pagecache import CACHE_VERSION
+
+
+# Total size of the fragments kept in memory, in characters of HTML
+DEFAULT_MEMORY_BYTES = 8 * 1024 * 1024
+DEFAULT_DISK_ENTRIES = 1_000_000
+
+# Rows are written in batches; this many pending rows, or this much pending
+# HTML, forces a flush
+_FLUSH_EVERY = 1000
+_FLUSH_BYTES = 4 * 1024 * 1024
+
+
+class BlockCache:
+    """Serialized HTML of single markdown blocks, keyed by the block's hash.
+
+    - Fragments live in an in-memory LRU holding up to max_bytes of HTML,
+      and, with a path, in an SQLite database shared by later builds and
+      pool workers. A fragment larger than an eighth of max_bytes is not
+      kept in memory, so one huge block cannot flush out all the others
+    - Keys include the renderer's CACHE_VERSION and the minify setting
+    - hits, disk_hits and misses count lookups for summary(); a build adds
+      the counts of its pool workers' copies with add_counts()
+
+    Pickling (for process pool workers) keeps the settings but not the
+    memory cache, counters or connection; workers reopen the database.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MEMORY_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._db = None
+        # Rows to insert and keys whose last use to update, written by flush()
+        self._new_rows = []
+        self._new_bytes = 0
+        self._used_keys = []
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def __getstate__(self):
+        return {"path": self.path, "max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["path"], state["max_bytes"])
+
+    def _connect(self):
+        if self._db is None:
+            parent = os.path.dirname(self.path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            # Several pool workers may write at once; wait for their locks
+            self._db = sqlite3.connect(self.path, timeout=30)
+            # Losing the last few rows on a crash is harmless for a cache
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=OFF")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS blocks "
+                "(key TEXT PRIMARY KEY, html TEXT NOT NULL, used REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS blocks_used ON blocks (used)")
+            # A running row count, so evict() need not count the table
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS meta "
+                "(id INTEGER PRIMARY KEY CHECK (id = 0), rows INTEGER NOT NULL)"
+            )
+            if self._db.execute("SELECT rows FROM meta").fetchone() is None:
+                with self._db:
+                    self._db.execute(
+                        "INSERT OR IGNORE INTO meta SELECT 0, COUNT(*) FROM blocks"
+                    )
+        return self._db
+
+    @staticmethod
+    def key(block, minify=False):
+        digest = hashlib.blake2b(block.encode("utf-8"), digest_size=16).hexdigest()
+        return f"{digest}-v{CACHE_VERSION}{'-min' if minify else ''}"
+
+    def fragment(self, block, minify, render):
+        """Return the HTML for block, calling render(block, minify) on a miss."""
+        key = self.key(block, minify)
+        memory = self._memory
+        html = memory.get(key)
+        if html is not None:
+            memory.move_to_end(key)
+            self.hits += 1
+            return html
+
+        if self.path is not None:
+            row = (
+                self._connect()
+                .execute("SELECT html FROM blocks WHERE key = ?", (key,))
+                .fetchone()
+            )
+            if row is not None:
+                html = row[0]
+                self.disk_hits += 1
+                self._used_keys.append(key)
+        if html is None:
+            html = render(block, minify)
+            self.misses += 1
+            if self.path is not None:
+                self._new_rows.append((key, html))
+                self._new_bytes += len(html)
+        if (
+            len(self._new_rows) + len(self._used_keys) >= _FLUSH_EVERY
+            or self._new_bytes >= _FLUSH_BYTES
+        ):
+            self.flush()
+
+        size = len(html)
+        if size <= self.max_bytes // 8:
+            memory[key] = html
+            self._memory_bytes += size
+            while self._memory_bytes > self.max_bytes:
+                _key, dropped = memory.popitem(last=False)
+                self._memory_bytes -= len(dropped)
+        return html
+
+    def flush(self):
+        """Write new fragments and last-use times to the database."""
+        if not self._new_rows and not self._used_keys:
+            return
+        now = time.time()
+        with self._connect() as db:
+            # A key already stored (by another worker) holds the same HTML
+            inserted = db.executemany(
+                "INSERT OR IGNORE INTO blocks VALUES (?, ?, ?)",
+                [(key, html, now) for key, html in self._new_rows],
+            ).rowcount
+            db.execute("UPDATE meta SET rows = rows + ?", (inserted,))
+            db.executemany(
+                "UPDATE blocks SET used = ? WHERE key = ?",
+                [(now, key) for key in self._used_keys],
+            )
+        self._new_rows = []
+        self._new_bytes = 0
+        self._used_keys = []
+
+    def evict(self, max_entries=DEFAULT_DISK_ENTRIES):
+        """Drop the least recently used rows beyond max_entries on disk.
+
+        Returns the number of rows removed. Below max_entries this only
+        reads the running row count; above it, only the excess rows are
+        visited, oldest first through the index on their last use.
+        """
+        if self.path is None or not os.path.exists(self.path):
+            return 0
+        db = self._connect()
+        self.flush()
+        with db:
+            rows = db.execute("SELECT rows FROM meta").fetchone()[0]
+            if rows <= max_entries:
+                return 0
+            removed = db.execute(
+                "DELETE FROM blocks WHERE key IN "
+                "(SELECT key FROM blocks ORDER BY used LIMIT ?)",
+                (rows - max_entries,),
+            ).rowcount
+            db.execute("UPDATE meta SET rows = rows - ?", (removed,))
+        return removed
+
+    def close(self):
+        self.flush()
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def counts(self):
+        """Return (hits, disk_hits, misses)."""
+        return self.hits, self.disk_hits, self.misses
+
+    def add_counts(self, hits, disk_hits, misses):
+        """Add lookups counted elsewhere, such as by a pool worker's copy."""
+        self.hits += hits
+        self.disk_hits += disk_hits
+        self.misses += misses
+
+    @property
+    def lookups(self):
+        return self.hits + self.disk_hits + self.misses
+
+    def summary(self):
+        """Return a one-line account of the lookups counted."""
+        lookups = self.lookups
+        rate = (self.hits + self.disk_hits) / lookups if lookups else 0.0
+        return (
+            f"Block cache: {self.hits} memory hit(s), {self.disk_hits} disk hit(s), "
+            f"{self.misses} miss(es) ({rate:.0%} hit rate)"
+        )
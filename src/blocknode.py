@@ -10,19 +10,30 @@ class BlockType(Enum):
     UNORDERED_LIST = "unordered_list"
     ORDERED_LIST = "ordered_list"
 
+
+HEADING_PREFIXES = ("# ", "## ", "### ", "#### ", "##### ", "###### ")
+_ORDERED_LIST_RE = re.compile(r"^\d+\.\ ")
+
+
 def block_to_block_type(markdown):
-    heading_types = ["# ", "## ", "### ", "#### ", "##### ", "###### "]
-    num_and_dot_re = r"^\d+\.\ "
-    
-    if any([markdown.startswith(ht) for ht in heading_types]):
-        return BlockType.HEADING
-    elif markdown.startswith(">"):
+    # Every block type is identified by a distinct first character, so
+    # dispatch on it instead of trying each prefix in turn
+    if not markdown:
+        return BlockType.PARAGRAPH
+    first = markdown[0]
+    if first == "#":
+        if markdown.startswith(HEADING_PREFIXES):
+            return BlockType.HEADING
+    elif first == ">":
         return BlockType.QUOTE
-    elif re.match(num_and_dot_re, markdown):
-        return BlockType.ORDERED_LIST
-    elif markdown.startswith("- "):
-        return BlockType.UNORDERED_LIST
-    elif markdown.startswith("```") and markdown.endswith("```"):
-        return BlockType.CODE
-    else:
-        return BlockType.PARAGRAPH
\ No newline at end of file
+    elif first == "-":
+        if markdown.startswith("- "):
+            return BlockType.UNORDERED_LIST
+    elif first == "`":
+        if markdown.startswith("```") and markdown.endswith("```"):
+            return BlockType.CODE
+    elif first.isdecimal():
+        # isdecimal() is exactly the set of characters \d matches
+        if _ORDERED_LIST_RE.match(markdown):
+            return BlockType.ORDERED_LIST
+    return BlockType.PARAGRAPH
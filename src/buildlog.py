@@ -0,0 +1,98 @@
+import sys
+import time
+
+
+QUIET = 0
+NORMAL = 1
+VERBOSE = 2
+
+# Lines held back before the buffer is written out in one go
+DEFAULT_BUFFER_LINES = 256
+
+
+class BuildLog:
+    """Buffered, level-controlled build output with running totals.
+
+    - QUIET prints errors only, NORMAL adds notable events (stale outputs
+      removed, rebuilds) and the final summary, VERBOSE adds one line per
+      rendered page and copied file
+    - Lines are collected and written in batches; errors are written to
+      stderr straight away, after flushing what came before them
+    - count() accumulates totals such as pages and bytes for summary()
+
+    Per-file call sites check log.verbose before formatting a line, so the
+    default levels do no per-file work at all.
+    """
+
+    def __init__(self, level=NORMAL, stream=None, buffer_lines=DEFAULT_BUFFER_LINES):
+        self.configure(level, stream, buffer_lines)
+        self._lines = []
+        self.reset()
+
+    def configure(self, level=NORMAL, stream=None, buffer_lines=DEFAULT_BUFFER_LINES):
+        """Set the level and output; stream defaults to the current sys.stdout."""
+        self.level = level
+        self.verbose = level >= VERBOSE
+        self.stream = stream
+        self.buffer_lines = buffer_lines
+
+    def reset(self):
+        """Clear the totals and restart the summary clock."""
+        self.totals = {}
+        self.started = time.perf_counter()
+
+    def _emit(self, message):
+        self._lines.append(message)
+        if len(self._lines) >= self.buffer_lines:
+            self.flush()
+
+    def info(self, message):
+        """Log a notable event (NORMAL and VERBOSE)."""
+        if self.level >= NORMAL:
+            self._emit(message)
+
+    def detail(self, message):
+        """Log a per-file line (VERBOSE only)."""
+        if self.verbose:
+            self._emit(message)
+
+    def error(self, message):
+        """Log an error at every level, unbuffered, on stderr."""
+        self.flush()
+        print(message, file=sys.stderr, flush=True)
+
+    def flush(self):
+        """Write out any buffered lines."""
+        if not self._lines:
+            return
+        stream = self.stream if self.stream is not None else sys.stdout
+        stream.write("\n".join(self._lines) + "\n")
+        stream.flush()
+        self._lines = []
+
+    def count(self, name, amount=1):
+        self.totals[name] = self.totals.get(name, 0) + amount
+
+    def summary(self):
+        """Return a one-line account of the totals and rates since reset()."""
+        elapsed = time.perf_counter() - self.started
+        totals = self.totals
+        pages = totals.get("pages", 0)
+        files = totals.get("files", 0)
+        mib = totals.get("bytes", 0) / (1024 * 1024)
+        parts = [f"Rendered {pages} page(s)"]
+        if totals.get("unchanged_pages"):
+            parts.append(f"skipped {totals['unchanged_pages']} unchanged")
+        parts.append(f"synced {files} static file(s) ({mib:.1f} MiB)")
+        if totals.get("unchanged_files"):
+            parts.append(f"{totals['unchanged_files']} already up to date")
+        if totals.get("failed_pages"):
+            parts.append(f"{totals['failed_pages']} page(s) FAILED")
+        line = ", ".join(parts) + f" in {elapsed:.2f}s"
+        if elapsed > 0:
+            line += f" ({pages / elapsed:.0f} pages/s, {mib / elapsed:.1f} MiB/s)"
+        return line
+
+
+# The log shared by the build; main() configures it from the command line
+log = BuildLog()
@@ -0,0 +1,137 @@
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from buildlog import log
+
+try:
+    import brotli
+except ImportError:  # optional dependency; only gzip variants are written
+    brotli = None
+
+
+COMPRESSIBLE_EXTENSIONS = (".html", ".css")
+
+DEFAULT_COMPRESS_WORKERS = os.cpu_count() or 1
+
+
+def _gzip(data):
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=11)
+
+
+def available_formats():
+    """Return {suffix: compress function} for the variants available here."""
+    formats = {"gz": _gzip}
+    if brotli is not None:
+        formats["br"] = _brotli
+    return formats
+
+
+def _is_variant_fresh(path, variant_path):
+    # Variants carry their source's mtime, and AtomicOutput and sync_tree
+    # leave the mtime of unchanged outputs alone
+    try:
+        return os.stat(variant_path).st_mtime_ns == os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return False
+
+
+def _compress_file(job):
+    """Write the missing or outdated variants of one file.
+
+    Runs inside pool workers. Returns (size, {suffix: compressed size}) for
+    the variants that were written.
+    """
+    path, suffixes = job
+    formats = available_formats()
+    with open(path, "rb") as f:
+        data = f.read()
+    source_stat = os.stat(path)
+    written = {}
+    for suffix in suffixes:
+        variant_path = f"{path}.{suffix}"
+        compressed = formats[suffix](data)
+        tmp_path = f"{variant_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(compressed)
+            os.utime(tmp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+            os.replace(tmp_path, variant_path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        written[suffix] = len(compressed)
+    return len(data), written
+
+
+def compress_tree(
+    directory, extensions=COMPRESSIBLE_EXTENSIONS, workers=DEFAULT_COMPRESS_WORKERS
+):
+    """Write precompressed siblings (.gz, and .br if brotli is installed).
+
+    - Covers every file under directory whose name ends with one of extensions
+    - Only files with a missing or out-of-date variant are recompressed, on a
+      process pool of `workers` processes
+    - Variants whose source file no longer exists are deleted
+    - Logs and returns a dict with the number of files compressed and
+      skipped, and the bytes before and after compression per suffix
+    """
+    suffixes = list(available_formats())
+    jobs = []
+    skipped = 0
+    for root, _dirs, files in os.walk(directory):
+        names = set(files)
+        for filename in files:
+            path = os.path.join(root, filename)
+            stem, dot, ext = filename.rpartition(".")
+            if dot and ext in ("gz", "br") and stem.endswith(extensions):
+                if stem not in names:
+                    os.remove(path)
+                    log.info(f"Removed stale variant {path}")
+                continue
+            if not filename.endswith(extensions):
+                continue
+            stale = [
+                suffix
+                for suffix in suffixes
+                if not _is_variant_fresh(path, f"{path}.{suffix}")
+            ]
+            if stale:
+                jobs.append((path, stale))
+            else:
+                skipped += 1
+
+    if workers <= 1 or len(jobs) <= 1:
+        results = [_compress_file(job) for job in jobs]
+    else:
+        workers = min(workers, len(jobs))
+        chunksize = max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_compress_file, jobs, chunksize=chunksize))
+
+    stats = {"compressed": len(jobs), "skipped": skipped}
+    for suffix in suffixes:
+        stats[f"{suffix}_bytes_in"] = 0
+        stats[f"{suffix}_bytes_out"] = 0
+    for size, written in results:
+        for suffix, compressed_size in written.items():
+            stats[f"{suffix}_bytes_in"] += size
+            stats[f"{suffix}_bytes_out"] += compressed_size
+
+    for suffix in suffixes:
+        bytes_in = stats[f"{suffix}_bytes_in"]
+        bytes_out = stats[f"{suffix}_bytes_out"]
+        if bytes_in:
+            log.info(
+                f"Wrote .{suffix} variants: {bytes_in} -> {bytes_out} bytes "
+                f"(saved {bytes_in - bytes_out} bytes, {1 - bytes_out / bytes_in:.0%})"
+            )
+    if jobs and brotli is None:
+        log.info("brotli is not installed; skipped .br variants")
+    log.info(f"Compressed {len(jobs)} file(s), {skipped} already up to date")
+    return stats
@@ -0,0 +1,152 @@
+import json
+import os
+import time
+
+from manifest import hash_file
+
+
+INDEX_VERSION = 1
+
+# Directories modified this recently (in ns) when a scan starts are listed
+# again next time; coarse filesystem timestamps could hide a second change
+_RACY_WINDOW_NS = 2 * 10**9
+
+
+class DirectoryIndex:
+    """Cached listing of the markdown files under a content directory.
+
+    For every directory it records the directory's mtime, the .md files it
+    holds and its subdirectories. Creating, deleting or renaming an entry
+    changes the mtime of the directory holding it, so a warm scan only
+    lists directories whose mtime differs and costs one stat for each of
+    the others. Edits to a file's contents don't affect the listing; the
+    manifest's content hashes catch those.
+
+    source_hash() also keeps each page's size, mtime and content hash, so a
+    warm build hashes only pages whose stat changed instead of reading all
+    of the content.
+
+    Like os.walk, symlinks to directories are not followed.
+    """
+
+    def __init__(self, path=None, root=None, dirs=None):
+        self.path = path
+        self.root = root
+        self.dirs = dirs if dirs is not None else {}
+        self.listed = 0
+        self.reused = 0
+        self.hashed = 0
+        self.hashes_reused = 0
+        self._racy_after = time.time_ns() - _RACY_WINDOW_NS
+
+    @classmethod
+    def load(cls, path):
+        """Load an index from path, or return an empty one."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != INDEX_VERSION:
+            return cls(path)
+        return cls(path, data.get("root"), data.get("dirs", {}))
+
+    def save(self):
+        """Write the index to disk atomically."""
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": INDEX_VERSION, "root": self.root, "dirs": self.dirs}, f
+            )
+        os.replace(tmp_path, self.path)
+
+    def scan(self, root):
+        """Return the sorted paths, relative to root, of every .md file.
+
+        Refreshes the index as it goes: entries for directories that no
+        longer exist are dropped.
+        """
+        if root != self.root:
+            self.root = root
+            self.dirs = {}
+        old_dirs = self.dirs
+        self.dirs = {}
+        self.listed = 0
+        self.reused = 0
+        racy_after = self._racy_after = time.time_ns() - _RACY_WINDOW_NS
+
+        pages = []
+        pending = [""]
+        while pending:
+            rel_dir = pending.pop()
+            path = os.path.join(root, rel_dir) if rel_dir else root
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            entry = old_dirs.get(rel_dir)
+            if entry is None or entry["mtime_ns"] != mtime_ns:
+                old_stats = entry.get("stats", {}) if entry is not None else {}
+                try:
+                    entry = self._list(path)
+                except FileNotFoundError:
+                    continue
+                # Keep the hashes of pages that are still there
+                entry["stats"] = {
+                    name: old_stats[name]
+                    for name in entry["pages"]
+                    if name in old_stats
+                }
+                self.listed += 1
+                if mtime_ns >= racy_after:
+                    # Too fresh to trust: a change later in the same
+                    # timestamp tick would go unnoticed
+                    mtime_ns = None
+                entry["mtime_ns"] = mtime_ns
+            else:
+                self.reused += 1
+            self.dirs[rel_dir] = entry
+
+            prefix = rel_dir + os.sep if rel_dir else ""
+            pages.extend(prefix + name for name in entry["pages"])
+            pending.extend(prefix + name for name in entry["subdirs"])
+        pages.sort()
+        return pages
+
+    def source_hash(self, rel_path):
+        """Return the content hash of the page at rel_path, as scan() returned it.
+
+        The hash recorded for the page is reused while its size and mtime are
+        unchanged; otherwise the file is hashed and the result recorded,
+        unless its mtime is too recent to be trusted.
+        """
+        rel_dir, name = os.path.split(rel_path)
+        path = os.path.join(self.root, rel_path)
+        st = os.stat(path)
+        stats = self.dirs[rel_dir].setdefault("stats", {})
+        known = stats.get(name)
+        if known is not None and known[0] == st.st_size and known[1] == st.st_mtime_ns:
+            self.hashes_reused += 1
+            return known[2]
+        source_hash = hash_file(path)
+        self.hashed += 1
+        if st.st_mtime_ns < self._racy_after:
+            stats[name] = [st.st_size, st.st_mtime_ns, source_hash]
+        else:
+            stats.pop(name, None)
+        return source_hash
+
+    def _list(self, path):
+        page_names = []
+        subdirs = []
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    if not entry.is_symlink():
+                        subdirs.append(entry.name)
+                elif entry.name.lower().endswith(".md"):
+                    page_names.append(entry.name)
+        return {"pages": page_names, "subdirs": subdirs}
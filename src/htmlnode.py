@@ -1,13 +1,59 @@
+from minify import collapse_whitespace
+
+
+# Void/self-closing tags (e.g., img, br, hr, input, meta, link)
+VOID_TAGS = frozenset(
+    {
+        "img",
+        "br",
+        "hr",
+        "input",
+        "meta",
+        "link",
+        "source",
+        "track",
+        "area",
+        "base",
+        "col",
+        "embed",
+        "param",
+        "wbr",
+    }
+)
+
+# Elements whose text is rendered exactly as written; never minified
+PRESERVE_WHITESPACE_TAGS = frozenset({"pre", "code", "textarea"})
+
+
 class HTMLNode:
+    # Pages create huge numbers of nodes; slots drop the per-instance __dict__
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
         self.children = children
         self.props = props
 
-    def to_html(self):
+    def to_html(self, minify=False):
         raise NotImplementedError("Subclasses must implement to_html method")
 
+    def iter_html(self, minify=False):
+        """Yield the node's HTML as a sequence of string chunks.
+
+        Joining the chunks gives to_html(minify). Subclasses that can stream
+        their output override this; the default yields to_html() in one piece.
+        With minify=True, runs of whitespace in text collapse to one space,
+        except inside <pre>, <code> and <textarea>.
+        """
+        yield self.to_html(minify)
+
+    def write_html(self, fp, minify=False):
+        """Write the node's HTML to a file-like object chunk by chunk."""
+        write = fp.write
+        for chunk in self.iter_html(minify):
+            write(chunk)
+
     def props_to_html(self):
         if not self.props:
             return ""
@@ -16,47 +62,61 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag=tag, value=value, props=props)
 
-    def to_html(self):
-        # Support void/self-closing tags (e.g., img, br, hr, input, meta, link)
-        void_tags = {
-            "img",
-            "br",
-            "hr",
-            "input",
-            "meta",
-            "link",
-            "source",
-            "track",
-            "area",
-            "base",
-            "col",
-            "embed",
-            "param",
-            "wbr",
-        }
+    def to_html(self, minify=False):
+        value = self.value
+        if minify and value and self.tag not in PRESERVE_WHITESPACE_TAGS:
+            value = collapse_whitespace(value)
         if self.tag is None:
-            return self.value
-        if self.tag in void_tags:
+            return value
+        if self.tag in VOID_TAGS:
             # Render as self-closing; ignore value
             return f"<{self.tag}{self.props_to_html()} />"
-        if self.value is None:
+        if value is None:
             raise ValueError("LeafNode must have a value")
 
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        return f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>"
 
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, children, props=None):
         super().__init__(tag=tag, children=children, props=props)
 
-    def to_html(self):
+    def to_html(self, minify=False):
+        return "".join(self.iter_html(minify))
+
+    def _open_tag(self):
         if self.tag is None:
             raise ValueError("ParentNode must have a tag")
         if self.children is None:
             raise ValueError("ParentNode must have children")
+        return f"<{self.tag}{self.props_to_html()}>"
 
-        children_html = "".join(child.to_html() for child in self.children)
-        return f"<{self.tag}{self.props_to_html()}>{children_html}</{self.tag}>"
+    def iter_html(self, minify=False):
+        # Walk the tree with an explicit stack instead of recursing, so deep
+        # nesting neither hits the recursion limit nor builds a string per level.
+        # Each entry also records whether text below it may be minified.
+        yield self._open_tag()
+        minify = minify and self.tag not in PRESERVE_WHITESPACE_TAGS
+        stack = [(self.tag, iter(self.children), minify)]
+        while stack:
+            tag, children, minify = stack[-1]
+            for child in children:
+                if isinstance(child, ParentNode):
+                    yield child._open_tag()
+                    child_minify = minify and child.tag not in PRESERVE_WHITESPACE_TAGS
+                    stack.append((child.tag, iter(child.children), child_minify))
+                    break
+                if isinstance(child, LeafNode):
+                    yield child.to_html(minify)
+                else:
+                    yield from child.iter_html(minify)
+            else:
+                stack.pop()
+                yield f"</{tag}>"
@@ -0,0 +1,185 @@
+import re
+from itertools import chain
+
+from textnode import TextNode, TextType
+
+
+# Images and links use the same patterns as extract_markdown_images/links.
+# Images are found first; the other tokens share one alternation, tried left
+# to right between them. The leading lookahead lets the engine skip plain
+# characters without trying every branch at each position.
+_IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_INLINE_TOKEN_RE = re.compile(
+    r"(?=[\[*_`])(?:"
+    r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
+    r"|\*\*|_|`"
+    r")"
+)
+
+_DELIMITERS = ("**", "_", "`")
+
+# Enum attribute lookups are comparatively slow; bind the members once
+_PLAIN = TextType.PLAIN
+_BOLD = TextType.BOLD
+_ITALIC = TextType.ITALIC
+_CODE = TextType.CODE
+
+
+def _inline_tokens(text):
+    # Like split_nodes_image, take every image before looking for links, so
+    # an image wins over a link match that would overlap it
+    pos = 0
+    if "![" in text:
+        for image in _IMAGE_RE.finditer(text):
+            yield from _INLINE_TOKEN_RE.finditer(text, pos, image.start())
+            yield image
+            pos = image.end()
+    yield from _INLINE_TOKEN_RE.finditer(text, pos)
+
+
+def scan_inline(text):
+    """Convert inline markdown into TextNodes in one left-to-right walk.
+
+    Produces exactly what the split_nodes_image -> split_nodes_link ->
+    split_nodes_delimiter("**", "_", "`") pipeline produces:
+
+    - Images are found first, then links between them; both are opaque and
+      delimiters never span across them
+    - "**" splits first, so "_" and "`" inside bold text are literal
+    - "_" splits plain text next, so "`" inside italic text is literal
+    - Every node (link and image text included) must hold an even number
+      of each delimiter, otherwise a ValueError is raised. Errors are
+      reported in pipeline order: any "**" problem first, then "_", then "`"
+    """
+    if "*" not in text and "_" not in text and "`" not in text and "[" not in text:
+        # Nothing to tokenize: skip the scan entirely
+        return [TextNode(text, _PLAIN)] if text else []
+
+    nodes = []
+    append = nodes.append
+    # First offending node text per delimiter, raised once the walk is done
+    errors = {}
+
+    # Plain segment: the text between images/links
+    seg_start = 0
+    # Level 1: "**"-delimited piece (bold or plain)
+    bold = False
+    piece_start = 0
+    piece_underscores = 0
+    piece_backticks = 0
+    # Level 2: "_"-delimited sub-piece of a plain piece (italic or plain)
+    italic = False
+    sub_start = 0
+    sub_backticks = 0
+    # Level 3: "`"-delimited run of a plain sub-piece (code or plain)
+    code = False
+    run_start = 0
+
+    # A trailing None closes everything, like an image/link boundary would
+    for m in chain(_inline_tokens(text), (None,)):
+        if m is None:
+            pos = len(text)
+            first = ""
+        else:
+            pos = m.start()
+            first = text[pos]
+
+        if first == "_":
+            if bold:
+                piece_underscores += 1
+                continue
+            if italic:
+                if sub_backticks % 2:
+                    errors.setdefault("`", text[sub_start:pos])
+                if pos > sub_start:
+                    append(TextNode(text[sub_start:pos], _ITALIC))
+            else:
+                if code:
+                    errors.setdefault("`", text[sub_start:pos])
+                if pos > run_start:
+                    append(
+                        TextNode(
+                            text[run_start:pos],
+                            _CODE if code else _PLAIN,
+                        )
+                    )
+                code = False
+            italic = not italic
+            sub_start = run_start = pos + 1
+            sub_backticks = 0
+            continue
+
+        if first == "`":
+            if bold:
+                piece_backticks += 1
+            elif italic:
+                sub_backticks += 1
+            else:
+                if pos > run_start:
+                    append(
+                        TextNode(
+                            text[run_start:pos],
+                            _CODE if code else _PLAIN,
+                        )
+                    )
+                code = not code
+                run_start = pos + 1
+            continue
+
+        # "**", an image, a link or the end of text: close the current piece
+        if bold:
+            if first == "*":
+                piece_text = text[piece_start:pos]
+                if piece_underscores % 2:
+                    errors.setdefault("_", piece_text)
+                if piece_backticks % 2:
+                    errors.setdefault("`", piece_text)
+                if piece_text:
+                    append(TextNode(piece_text, _BOLD))
+            else:
+                # An unclosed "**" makes the whole plain segment invalid
+                errors.setdefault("**", text[seg_start:pos])
+        elif italic:
+            # An odd number of "_" leaves the piece ending inside italic text
+            errors.setdefault("_", text[piece_start:pos])
+            if sub_backticks % 2:
+                errors.setdefault("`", text[sub_start:pos])
+            if pos > sub_start:
+                append(TextNode(text[sub_start:pos], _ITALIC))
+        else:
+            if code:
+                errors.setdefault("`", text[sub_start:pos])
+            if pos > run_start:
+                append(
+                    TextNode(
+                        text[run_start:pos],
+                        _CODE if code else _PLAIN,
+                    )
+                )
+
+        if m is None:
+            break
+        if first == "*":
+            bold = not bold
+        else:
+            if first == "!":
+                node = TextNode(m.group(1), TextType.IMAGE, m.group(2))
+            else:
+                node = TextNode(m.group(1), TextType.LINK, m.group(2))
+            for delimiter in _DELIMITERS:
+                if node.text.count(delimiter) % 2:
+                    errors.setdefault(delimiter, node.text)
+            append(node)
+            seg_start = m.end()
+            bold = False
+
+        piece_start = sub_start = run_start = m.end()
+        piece_underscores = piece_backticks = sub_backticks = 0
+        italic = code = False
+
+    for delimiter in _DELIMITERS:
+        if delimiter in errors:
+            raise ValueError(
+                f"Unmatched delimiter '{delimiter}' in text: {errors[delimiter]}"
+            )
+    return nodes
@@ -0,0 +1,107 @@
+import os
+import posixpath
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote, urlsplit
+
+
+class BrokenLinksError(Exception):
+    """Raised after a build when pages link to outputs that do not exist.
+
+    broken is a sorted list of (source, kind, url) triples, where kind is
+    "link" or "image".
+    """
+
+    def __init__(self, broken):
+        self.broken = broken
+        lines = [f"{len(broken)} broken internal link(s):"]
+        lines.extend(f"  {source}: {kind} {url}" for source, kind, url in broken)
+        super().__init__("\n".join(lines))
+
+
+def _output_keys(rel_path):
+    # Every site-relative path a server answers with this output
+    yield rel_path
+    if rel_path.endswith(".html"):
+        stem = rel_path[: -len(".html")]
+        if stem == "index" or stem.endswith("/index"):
+            # Directory URLs: "blog/tom/" and "blog/tom" serve blog/tom/index.html
+            yield stem[: -len("index")].rstrip("/")
+        else:
+            yield stem
+
+
+def resolve_link(url, page_dir):
+    """Return the site-relative path url points to, or None if it is external.
+
+    page_dir is the directory of the linking page relative to the site root
+    ("" for the root). Queries and fragments are ignored, and links to the
+    page itself (empty or fragment-only) count as external.
+    """
+    parts = urlsplit(url)
+    if parts.scheme or parts.netloc or not parts.path:
+        return None
+    path = unquote(parts.path)
+    if path.startswith("/"):
+        path = path.lstrip("/")
+    else:
+        path = posixpath.join(page_dir, path)
+    path = posixpath.normpath(path)
+    return "" if path == "." else path
+
+
+class LinkChecker:
+    """Validates internal links and images against a set of known outputs.
+
+    - Targets (rendered pages and synced static files) are registered with
+      add_outputs() before any page is checked. They go into a hash set, so
+      a link costs one lookup rather than a filesystem probe
+    - check() queues a page's links on a background thread, so checking
+      overlaps with rendering; finish() waits for every queued page and
+      returns the broken links
+    """
+
+    def __init__(self, dest_dir):
+        self.dest_dir = dest_dir
+        self.targets = set()
+        self.checked = 0
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures = []
+
+    def add_outputs(self, dest_paths):
+        """Register output files (paths under dest_dir) as link targets."""
+        dest_dir = self.dest_dir
+        for dest_path in dest_paths:
+            rel_path = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+            self.targets.update(_output_keys(rel_path))
+
+    def check(self, source, dest_path, links, images):
+        """Queue the links and images of the page rendered to dest_path."""
+        rel_dir = os.path.relpath(os.path.dirname(dest_path), self.dest_dir)
+        page_dir = "" if rel_dir == "." else rel_dir.replace(os.sep, "/")
+        self._futures.append(
+            self._executor.submit(self._check, source, page_dir, links, images)
+        )
+
+    def _check(self, source, page_dir, links, images):
+        targets = self.targets
+        broken = []
+        for kind, urls in (("link", links), ("image", images)):
+            for url in urls:
+                path = resolve_link(url, page_dir)
+                if path is not None and path not in targets:
+                    broken.append((source, kind, url))
+        return len(links) + len(images), broken
+
+    def finish(self):
+        """Wait for every queued page; return the sorted broken links."""
+        broken = []
+        try:
+            for future in self._futures:
+                checked, page_broken = future.result()
+                self.checked += checked
+                broken.extend(page_broken)
+        finally:
+            self._futures = []
+            self._executor.shutdown()
+        broken.sort()
+        return broken
@@ -1,13 +1,293 @@
-import sys
-from utils import copy_tree_clean, generate_pages_recursive
+import argparse
+import os
+from assets import DEFAULT_COPY_WORKERS, LINK_MODES, sync_tree
+from blockcache import BlockCache
+from buildlog import NORMAL, QUIET, VERBOSE, log
+from compress import DEFAULT_COMPRESS_WORKERS, compress_tree
+from discovery import DirectoryIndex
+from linkcheck import BrokenLinksError, LinkChecker
+from manifest import BuildManifest
+from pagecache import DEFAULT_MAX_BYTES, PageCache
+from profiler import Profiler
+from search import SearchIndex
+from siteindex import SiteIndex, site_file_paths, write_feed, write_sitemap
+from utils import DEFAULT_IO_THREADS, PageGenerationError, generate_pages_recursive
+from watch import Watcher
 
 
-def main():
-    base_path = sys.argv[1] if len(sys.argv) > 1 else "/"
-    # Delete/clean and copy static assets into the generated docs directory
-    copy_tree_clean("static", "docs")
-    # Generate pages for all markdown files in the content directory
-    generate_pages_recursive("content", "template.html", "docs", base_path)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into docs/")
+    parser.add_argument(
+        "base_path", nargs="?", default="/", help="URL prefix for site links"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="keep docs/ and only re-render pages whose inputs changed",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=".cache",
+        help="directory for build state such as the page manifest and page cache",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="always parse markdown instead of reusing cached page and block content",
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=DEFAULT_MAX_BYTES // (1024 * 1024),
+        help="maximum size of the page cache in MiB (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="number of worker processes used to render pages",
+    )
+    parser.add_argument(
+        "--io-threads",
+        type=int,
+        default=DEFAULT_IO_THREADS,
+        help="threads reading and writing pages while a serial build renders; "
+        "0 disables the pipeline (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--link",
+        choices=LINK_MODES,
+        default="copy",
+        help="how static files are placed in docs/; link modes fall back to copying",
+    )
+    parser.add_argument(
+        "--copy-jobs",
+        type=int,
+        default=DEFAULT_COPY_WORKERS,
+        help="number of threads copying static files (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--checksum",
+        action="store_true",
+        help="compare static files by content hash instead of size and mtime",
+    )
+    parser.add_argument(
+        "--minify",
+        action="store_true",
+        help="strip insignificant whitespace from pages (<pre> blocks are kept)",
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help="write .gz (and .br, with brotli installed) copies of HTML and CSS",
+    )
+    parser.add_argument(
+        "--compress-jobs",
+        type=int,
+        default=DEFAULT_COMPRESS_WORKERS,
+        help="number of processes compressing outputs (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--site-url",
+        help="absolute URL the site is served from, e.g. https://example.com; "
+        "writes sitemap.xml and an Atom feed (atom.xml) into docs/",
+    )
+    parser.add_argument(
+        "--check-links",
+        action="store_true",
+        help="fail the build if a page links to or embeds a page or static file "
+        "that does not exist",
+    )
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="write a client-side search index into docs/search/, re-indexing "
+        "only pages whose source changed",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="after building, poll the inputs and rebuild affected outputs",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.5,
+        help="seconds between --watch polls (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="time each build stage and write a report to the cache directory; "
+        "renders pages serially",
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        default=10,
+        help="number of slowest pages listed in the profile (default: %(default)s)",
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-q",
+        "--quiet",
+        action="store_const",
+        dest="log_level",
+        const=QUIET,
+        default=NORMAL,
+        help="only report errors",
+    )
+    verbosity.add_argument(
+        "-v",
+        "--verbose",
+        action="store_const",
+        dest="log_level",
+        const=VERBOSE,
+        help="log every rendered page and copied file",
+    )
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.io_threads < 0:
+        parser.error("--io-threads must not be negative")
+    if args.copy_jobs < 1:
+        parser.error("--copy-jobs must be at least 1")
+    if args.compress_jobs < 1:
+        parser.error("--compress-jobs must be at least 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log.configure(args.log_level)
+    log.reset()
+    manifest_path = os.path.join(args.cache_dir, "manifest.json")
+    cache = None
+    block_cache = None
+    if not args.no_cache:
+        cache = PageCache(
+            os.path.join(args.cache_dir, "pages"), args.cache_size * 1024 * 1024
+        )
+        # Edited pages miss the page cache; their unchanged blocks hit this one
+        block_cache = BlockCache(os.path.join(args.cache_dir, "blocks.sqlite"))
+
+    profiler = None
+    if args.profile:
+        profiler = Profiler(args.profile_top)
+        profiler.install()
+
+    if args.incremental:
+        # Keep previously rendered pages and only sync changed static assets
+        manifest = BuildManifest.load(manifest_path)
+    else:
+        manifest = BuildManifest(manifest_path)
+    # Remembers the content tree's listing so unchanged directories are skipped
+    index = DirectoryIndex.load(os.path.join(args.cache_dir, "content-index.json"))
+    # Per-page metadata; only pages whose source changed are collected again
+    site_index = SiteIndex.load(os.path.join(args.cache_dir, "site-index.json"))
+    search_index = None
+    if args.search:
+        # Postings of unchanged pages are kept here between builds
+        search_index = SearchIndex.load(os.path.join(args.cache_dir, "search"))
+    # A full build deletes/cleans the generated docs directory first
+    sync_tree(
+        "static",
+        "docs",
+        manifest,
+        link_mode=args.link,
+        checksum=args.checksum,
+        clean=not args.incremental,
+        workers=args.copy_jobs,
+    )
+    link_checker = None
+    if args.check_links:
+        link_checker = LinkChecker("docs")
+        link_checker.add_outputs(manifest.assets)
+        # Files the build writes itself are valid targets too
+        if args.site_url:
+            link_checker.add_outputs(site_file_paths("docs"))
+        if search_index is not None:
+            link_checker.add_outputs(search_index.output_paths("docs"))
+
+    try:
+        # Generate pages for all markdown files in the content directory
+        generate_pages_recursive(
+            "content",
+            "template.html",
+            "docs",
+            args.base_path,
+            manifest,
+            # The profiler's hooks only see pages rendered on the main thread
+            jobs=1 if profiler is not None else args.jobs,
+            cache=cache,
+            io_threads=0 if profiler is not None else args.io_threads,
+            index=index,
+            minify=args.minify,
+            block_cache=block_cache,
+            site_index=site_index,
+            link_checker=link_checker,
+            search_index=search_index,
+        )
+        if args.site_url:
+            write_sitemap(site_index, "docs", args.base_path, args.site_url)
+            write_feed(site_index, "docs", args.base_path, args.site_url)
+        if args.compress:
+            compress_tree("docs", workers=args.compress_jobs)
+    except (PageGenerationError, BrokenLinksError) as e:
+        # Every failed page or broken link is listed; no traceback needed
+        log.error(str(e))
+        if not args.watch:
+            raise SystemExit(1)
+        # Keep watching, as after a failed rebuild, so the content can be fixed
+    finally:
+        # Keep the records of pages that did render, even if others failed
+        manifest.save()
+        index.save()
+        site_index.save()
+        if search_index is not None:
+            # Publish before saving: a crash in between re-indexes those pages
+            written = search_index.publish("docs", args.base_path)
+            search_index.save()
+            log.info(f"Wrote {written} search index file(s)")
+        if block_cache is not None:
+            block_cache.evict()
+            block_cache.flush()
+            if block_cache.lookups:
+                log.info(block_cache.summary())
+        if profiler is not None:
+            profiler.uninstall()
+            report_path = os.path.join(args.cache_dir, "profile.json")
+            profiler.write_report(report_path)
+            log.info(profiler.summary())
+            log.info(f"Wrote profile to {report_path}")
+        log.info(log.summary())
+        log.flush()
+
+    if args.watch:
+        watcher = Watcher(
+            "content",
+            "static",
+            "template.html",
+            "docs",
+            args.base_path,
+            manifest,
+            cache,
+            link_mode=args.link,
+            minify=args.minify,
+            block_cache=block_cache,
+            site_index=site_index,
+            site_url=args.site_url,
+            search_index=search_index,
+            compress=args.compress,
+            compress_workers=args.compress_jobs,
+        )
+        try:
+            watcher.run(args.interval)
+        except KeyboardInterrupt:
+            pass
+    if block_cache is not None:
+        block_cache.close()
 
 
 if __name__ == "__main__":
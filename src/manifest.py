@@ -0,0 +1,127 @@
+import hashlib
+import json
+import os
+
+
+MANIFEST_VERSION = 1
+
+
+def hash_file(path):
+    """Return the hex SHA-256 digest of a file's contents.
+
+    The file is read in fixed-size chunks so large inputs are never held
+    in memory at once.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Persistent record of the inputs every generated page was built from.
+
+    Each output path maps to the hash of its markdown source, the hash of the
+    template, the base_path it was rendered with and whether it was
+    minified. An incremental build
+    compares these against the current inputs to decide what to re-render.
+    assets maps every file synced from the static directory to its source, so
+    stale copies can be removed without touching rendered pages.
+    """
+
+    def __init__(self, path, entries=None, assets=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+        self.assets = assets if assets is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        """Load a manifest from path, or return an empty one.
+
+        A missing, unreadable or incompatible manifest simply means every
+        page is treated as changed.
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return cls(path)
+        return cls(path, data.get("outputs", {}), data.get("assets", {}))
+
+    def save(self):
+        """Write the manifest to disk atomically."""
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "outputs": self.entries,
+                    "assets": self.assets,
+                },
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, self.path)
+
+    def is_fresh(
+        self, dest_path, source_hash, template_hash, base_path, minify=False
+    ):
+        """Return True if dest_path exists and was built from these inputs."""
+        entry = self.entries.get(dest_path)
+        if entry is None:
+            return False
+        return (
+            entry.get("source_hash") == source_hash
+            and entry.get("template_hash") == template_hash
+            and entry.get("base_path") == base_path
+            and entry.get("minify", False) == minify
+            and os.path.isfile(dest_path)
+        )
+
+    def record(
+        self, dest_path, from_path, source_hash, template_hash, base_path, minify=False
+    ):
+        self.entries[dest_path] = {
+            "source": from_path,
+            "source_hash": source_hash,
+            "template_hash": template_hash,
+            "base_path": base_path,
+            "minify": minify,
+        }
+
+    def remove_stale(self, current_outputs, dest_root):
+        """Delete outputs whose markdown source no longer exists.
+
+        - current_outputs is the set of output paths produced by this build
+        - Removes the stale files and their manifest entries
+        - Prunes directories left empty, stopping at dest_root
+        - Returns the list of removed output paths
+        """
+        removed = []
+        for dest_path in sorted(set(self.entries) - set(current_outputs)):
+            del self.entries[dest_path]
+            if os.path.isfile(dest_path):
+                os.remove(dest_path)
+                prune_empty_dirs(os.path.dirname(dest_path), dest_root)
+            removed.append(dest_path)
+        return removed
+
+
+def prune_empty_dirs(directory, stop_dir):
+    """Remove directory and its parents while empty, stopping at stop_dir."""
+    stop_dir = os.path.abspath(stop_dir)
+    directory = os.path.abspath(directory)
+    while directory != stop_dir and directory.startswith(stop_dir + os.sep):
+        try:
+            os.rmdir(directory)
+        except OSError:
+            # Not empty (or already gone); nothing more to prune
+            return
+        directory = os.path.dirname(directory)
@@ -0,0 +1,50 @@
+import re
+
+
+# HTML's whitespace characters; unlike \s this leaves U+00A0 (&nbsp;) alone
+_WHITESPACE_RE = re.compile(r"[ \t\n\r\f]+")
+
+# Elements whose contents are rendered (or executed) exactly as written
+_PRESERVED_RE = re.compile(
+    r"<(pre|textarea|script|style)\b.*?</\1\s*>", re.DOTALL | re.IGNORECASE
+)
+
+# Space next to these tags never affects rendering, so it can be dropped
+_BLOCK_TAGS = (
+    "html|head|body|title|meta|link|base|article|aside|blockquote|dd|details|"
+    "div|dl|dt|figcaption|figure|footer|form|h[1-6]|header|hr|li|main|nav|ol|"
+    "p|section|table|tbody|td|tfoot|th|thead|tr|ul"
+)
+_BLOCK_TAG_SPACE_RE = re.compile(
+    rf" ?(<!doctype[^>]*>|</?(?:{_BLOCK_TAGS})\b[^>]*>) ?", re.IGNORECASE
+)
+
+
+def collapse_whitespace(text):
+    """Replace every run of whitespace in text with a single space."""
+    return _WHITESPACE_RE.sub(" ", text)
+
+
+def _minify_flow(html):
+    return _BLOCK_TAG_SPACE_RE.sub(r"\1", collapse_whitespace(html))
+
+
+def minify_markup(html):
+    """Return html with insignificant whitespace removed.
+
+    - Whitespace runs collapse to one space, and space next to block-level
+      and document tags is dropped
+    - <pre>, <textarea>, <script> and <style> elements are kept byte for byte
+
+    Meant for hand-written markup such as the page template; rendered
+    HTMLNode trees are compacted while serialising instead (see
+    HTMLNode.iter_html).
+    """
+    parts = []
+    pos = 0
+    for match in _PRESERVED_RE.finditer(html):
+        parts.append(_minify_flow(html[pos : match.start()]))
+        parts.append(match.group(0))
+        pos = match.end()
+    parts.append(_minify_flow(html[pos:]))
+    return "".join(parts)
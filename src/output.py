@@ -0,0 +1,99 @@
+import os
+
+
+# Bytes read at a time when copying the unchanged prefix of an old file
+_COPY_CHUNK = 1 << 16
+
+
+def prepare_output_dirs(dest_paths):
+    """Create the parent directory of every path in dest_paths, once each."""
+    created = set()
+    for dest_path in dest_paths:
+        directory = os.path.dirname(dest_path)
+        if directory and directory not in created:
+            os.makedirs(directory, exist_ok=True)
+            created.add(directory)
+
+
+class AtomicOutput:
+    """A text file writer that replaces dest_path atomically, and only if needed.
+
+    - Use as a context manager and write() text into it, e.g. with
+      Template.write
+    - New content goes to a temporary file next to dest_path and is moved
+      into place with os.replace when the block succeeds, so an interrupted
+      build never leaves a half-written page; on an error the old file is
+      kept
+    - While the output matches the existing file nothing is written at all;
+      if it turns out identical the file (and its mtime) is left untouched
+      and changed is False
+    - The parent directory is created only if it turns out to be missing
+    """
+
+    def __init__(self, dest_path):
+        self.dest_path = dest_path
+        self.changed = None
+        self._tmp_path = f"{dest_path}.{os.getpid()}.tmp"
+        self._tmp = None
+        self._old = None
+        self._matched = 0
+
+    def __enter__(self):
+        try:
+            self._old = open(self.dest_path, "rb")
+        except FileNotFoundError:
+            self._open_tmp()
+        return self
+
+    def write(self, text):
+        if os.linesep != "\n":
+            # Match the newline translation of a text-mode file
+            text = text.replace("\n", os.linesep)
+        data = text.encode("utf-8")
+        if self._old is not None:
+            if self._old.read(len(data)) == data:
+                self._matched += len(data)
+                return
+            self._diverge()
+        self._tmp.write(data)
+
+    def _open_tmp(self):
+        try:
+            self._tmp = open(self._tmp_path, "wb")
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(self.dest_path), exist_ok=True)
+            self._tmp = open(self._tmp_path, "wb")
+
+    def _diverge(self):
+        # Start the new file with the prefix that matched the old one
+        self._open_tmp()
+        old = self._old
+        self._old = None
+        with old:
+            old.seek(0)
+            remaining = self._matched
+            while remaining:
+                chunk = old.read(min(_COPY_CHUNK, remaining))
+                if not chunk:
+                    break
+                self._tmp.write(chunk)
+                remaining -= len(chunk)
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None and self._old is not None:
+            if self._old.read(1) == b"":
+                self._old.close()
+                self.changed = False
+                return
+            # The old file is longer than the new content
+            self._diverge()
+        if self._old is not None:
+            self._old.close()
+        if self._tmp is not None:
+            self._tmp.close()
+        if exc_type is not None:
+            if self._tmp is not None:
+                os.remove(self._tmp_path)
+            return
+        os.replace(self._tmp_path, self.dest_path)
+        self.changed = True
@@ -0,0 +1,213 @@
+import json
+import os
+import time
+
+
+# Bump whenever the rendered HTML for the same markdown would change, so
+# entries written by older builds are never served
+CACHE_VERSION = 1
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# Rendered chunks are grouped into records of roughly this many characters
+_RECORD_CHARS = 1 << 16
+
+# The size of each shard directory, kept between builds by evict()
+_SIZES_NAME = "sizes.json"
+
+# Shards modified this recently (in ns) are listed again next time; coarse
+# filesystem timestamps could hide a second change
+_RACY_WINDOW_NS = 2 * 10**9
+
+
+class PageCache:
+    """On-disk cache of rendered page content keyed by the markdown's hash.
+
+    Each entry holds the page title and the output of the markdown converter
+    before any template or base_path processing, so template-only and
+    base_path-only changes never need to re-parse the markdown.
+
+    Entries are files of the form:
+
+        <title>\\n
+        <length>\\n<length characters of HTML>   (repeated)
+
+    Records are concatenations of whole HTMLNode chunks, so an href/src
+    attribute never spans two records and the base_path rewrite can still
+    be applied record by record.
+
+    A variant names the rendering options the content was produced with
+    (such as "min" for minified output) and is part of the key, so builds
+    with different options never share entries.
+
+    evict() keeps the total size of every shard directory along with the
+    directory's mtime, which changes whenever an entry is added, replaced
+    or removed. A build therefore only lists the shards it wrote to, and
+    only stats every entry when the cache has grown past max_bytes.
+    """
+
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _path(self, source_hash, variant=None):
+        key = f"{source_hash}-v{CACHE_VERSION}"
+        if variant:
+            key = f"{key}-{variant}"
+        return os.path.join(self.directory, key[:2], f"{key}.html")
+
+    def load(self, source_hash, variant=None):
+        """Return a CachedPage for source_hash, or None on a miss."""
+        path = self._path(source_hash, variant)
+        try:
+            f = open(path, "r", encoding="utf-8", newline="")
+        except FileNotFoundError:
+            return None
+        # Touch the entry so eviction drops the least recently used first
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return CachedPage(f)
+
+    def store(self, source_hash, title, variant=None):
+        """Return a CacheWriter that creates the entry for source_hash."""
+        return CacheWriter(self._path(source_hash, variant), title)
+
+    def size(self):
+        """Return the total size of the entries, listing only changed shards."""
+        sizes_path = os.path.join(self.directory, _SIZES_NAME)
+        try:
+            with open(sizes_path, "r", encoding="utf-8") as f:
+                sizes = json.load(f)
+        except (OSError, ValueError):
+            sizes = {}
+        if not isinstance(sizes, dict):
+            sizes = {}
+        racy_after = time.time_ns() - _RACY_WINDOW_NS
+        current = {}
+        total = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            mtime_ns = shard.stat().st_mtime_ns
+            known = sizes.get(shard.name)
+            if isinstance(known, list) and known[0] == mtime_ns:
+                size = known[1]
+            else:
+                size = sum(
+                    entry.stat().st_size
+                    for entry in os.scandir(shard.path)
+                    if entry.name.endswith(".html")
+                )
+            if mtime_ns < racy_after:
+                current[shard.name] = [mtime_ns, size]
+            total += size
+        if current != sizes:
+            tmp_path = f"{sizes_path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(current, f)
+            os.replace(tmp_path, sizes_path)
+        return total
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits max_bytes.
+
+        Returns the number of entries removed.
+        """
+        if not os.path.isdir(self.directory) or self.size() <= self.max_bytes:
+            return 0
+        entries = []
+        total = 0
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if not entry.name.endswith(".html"):
+                    continue
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+                total += st.st_size
+
+        removed = 0
+        entries.sort()
+        for _mtime, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+        return removed
+
+
+class CachedPage:
+    """An open cache entry; use as a context manager to close it."""
+
+    def __init__(self, f):
+        self._f = f
+        self.title = f.readline()[:-1]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._f.close()
+
+    def iter_content(self):
+        """Yield the cached HTML record by record."""
+        f = self._f
+        while True:
+            header = f.readline()
+            if not header:
+                return
+            yield f.read(int(header))
+
+
+class CacheWriter:
+    """Writes one cache entry; it only becomes visible if the block succeeds."""
+
+    def __init__(self, path, title):
+        self.path = path
+        self.title = title
+        self._buffer = []
+        self._buffered = 0
+        self._f = None
+
+    def __enter__(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        self._f = open(self._tmp_path, "w", encoding="utf-8", newline="")
+        self._f.write(f"{self.title}\n")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None:
+                self._flush()
+        finally:
+            self._f.close()
+        if exc_type is None:
+            os.replace(self._tmp_path, self.path)
+        else:
+            os.remove(self._tmp_path)
+
+    def tee(self, chunks):
+        """Yield chunks unchanged while recording them into the entry."""
+        for chunk in chunks:
+            self._buffer.append(chunk)
+            self._buffered += len(chunk)
+            if self._buffered >= _RECORD_CHARS:
+                self._flush()
+            yield chunk
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        record = "".join(self._buffer)
+        self._f.write(f"{len(record)}\n")
+        self._f.write(record)
+        self._buffer = []
+        self._buffered = 0
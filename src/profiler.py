@@ -0,0 +1,244 @@
+import functools
+import json
+import os
+import time
+
+import assets
+import discovery
+import htmlnode
+import pagecache
+import template
+import utils
+
+
+class Profiler:
+    """Per-stage wall time and call counts for a build.
+
+    Nothing is measured until install() is called: it swaps the pipeline's
+    functions for timing wrappers, and uninstall() puts the originals back,
+    so a build without --profile runs exactly the same code as before.
+
+    Stage times are exclusive. Time spent in a nested stage (for example
+    text_to_textnodes inside block_to_html_node, or markdown conversion
+    pulled through the template's generator) is only counted once, in the
+    innermost stage; time outside every stage (walking directories, the
+    manifest) makes up the rest of the profiled total.
+
+    The wrappers keep a single call stack, so pages must be rendered on the
+    main thread; --profile turns off both the process pool and the I/O
+    pipeline.
+    """
+
+    def __init__(self, top=10):
+        self.top = top
+        self.stages = {}
+        self.pages = []
+        self.copy_files = 0
+        self.copy_bytes = 0
+        self.copy_seconds = 0.0
+        self.total_seconds = 0.0
+        self._stack = []
+        self._patched = []
+        self._started = None
+
+    # Timing primitives
+
+    def _enter(self):
+        # Each frame accumulates the time spent in nested stages
+        self._stack.append(0.0)
+        return time.perf_counter()
+
+    def _exit(self, name, start):
+        elapsed = time.perf_counter() - start
+        nested = self._stack.pop()
+        self.stages[name][1] += elapsed - nested
+        if self._stack:
+            self._stack[-1] += elapsed
+        return elapsed
+
+    def _count(self, name):
+        self.stages.setdefault(name, [0, 0.0])[0] += 1
+
+    def _timed(self, name, func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self._count(name)
+            start = self._enter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self._exit(name, start)
+
+        return wrapper
+
+    def _timed_generator(self, name, func):
+        # Generators run a piece at a time, so time every resumption
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            self._count(name)
+            gen = func(*args, **kwargs)
+            try:
+                while True:
+                    start = self._enter()
+                    try:
+                        item = next(gen)
+                    except StopIteration:
+                        return
+                    finally:
+                        self._exit(name, start)
+                    yield item
+            finally:
+                gen.close()
+
+        return wrapper
+
+    def _timed_page(self, func):
+        timed = self._timed("generate_page", func)
+
+        @functools.wraps(func)
+        def wrapper(from_path, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return timed(from_path, *args, **kwargs)
+            finally:
+                self.pages.append((time.perf_counter() - start, from_path))
+
+        return wrapper
+
+    def _timed_copy(self, func):
+        timed = self._timed("static_copy", func)
+
+        @functools.wraps(func)
+        def wrapper(pairs, *args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return timed(pairs, *args, **kwargs)
+            finally:
+                self.copy_seconds += time.perf_counter() - start
+                self.copy_files += len(pairs)
+                self.copy_bytes += sum(os.path.getsize(src) for src, _dst in pairs)
+
+        return wrapper
+
+    # Installing the hooks
+
+    def _patch(self, owner, attr, wrapper):
+        self._patched.append((owner, attr, owner.__dict__[attr]))
+        setattr(owner, attr, wrapper)
+
+    def install(self):
+        """Start profiling by wrapping every stage of the build."""
+        if self._patched:
+            raise RuntimeError("Profiler is already installed")
+        hooks = [
+            (utils, "hash_file", self._timed, "hash"),
+            (discovery, "hash_file", self._timed, "hash"),
+            (utils, "extract_title", self._timed, "extract_title"),
+            (
+                utils,
+                "scan_markdown_blocks",
+                self._timed_generator,
+                "markdown_to_blocks",
+            ),
+            (utils, "text_to_textnodes", self._timed, "text_to_textnodes"),
+            (
+                utils,
+                "block_lines_to_html_node",
+                self._timed,
+                "block_to_html_node",
+            ),
+            (htmlnode.ParentNode, "iter_html", self._timed_generator, "to_html"),
+            (template.Template, "iter_render", self._timed_generator, "template"),
+            (template.Template, "write", self._timed, "disk_io"),
+            (utils, "_write_page", self._timed, "disk_io"),
+            (pagecache.PageCache, "load", self._timed, "cache"),
+            (pagecache.CachedPage, "iter_content", self._timed_generator, "cache"),
+            (pagecache.CacheWriter, "tee", self._timed_generator, "cache"),
+        ]
+        for owner, attr, wrap, name in hooks:
+            self.stages.setdefault(name, [0, 0.0])
+            self._patch(owner, attr, wrap(name, getattr(owner, attr)))
+        self.stages.setdefault("generate_page", [0, 0.0])
+        self.stages.setdefault("static_copy", [0, 0.0])
+        self._patch(utils, "generate_page", self._timed_page(utils.generate_page))
+        for owner in (assets, utils):
+            self._patch(owner, "sync_files", self._timed_copy(owner.sync_files))
+        self._started = time.perf_counter()
+
+    def uninstall(self):
+        """Stop profiling and restore the original functions."""
+        if self._started is not None:
+            self.total_seconds += time.perf_counter() - self._started
+            self._started = None
+        for owner, attr, original in reversed(self._patched):
+            setattr(owner, attr, original)
+        self._patched = []
+
+    def __enter__(self):
+        self.install()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.uninstall()
+
+    # Reporting
+
+    def report(self):
+        """Return the collected measurements as a JSON-serialisable dict."""
+        slowest = sorted(self.pages, reverse=True)[: self.top]
+        return {
+            "total_seconds": self.total_seconds,
+            "pages": len(self.pages),
+            "stages": {
+                name: {"calls": calls, "seconds": seconds}
+                for name, (calls, seconds) in self.stages.items()
+            },
+            "slowest_pages": [
+                {"path": path, "seconds": seconds} for seconds, path in slowest
+            ],
+            "static_copy": {
+                "files": self.copy_files,
+                "bytes": self.copy_bytes,
+                "seconds": self.copy_seconds,
+                "bytes_per_second": (
+                    self.copy_bytes / self.copy_seconds if self.copy_seconds else 0.0
+                ),
+            },
+        }
+
+    def write_report(self, path):
+        """Write report() to path as JSON."""
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.report(), f, indent=1)
+
+    def summary(self):
+        """Return a human-readable table of the report."""
+        report = self.report()
+        total = report["total_seconds"]
+        lines = [
+            f"Profiled {report['pages']} page(s) in {total * 1000:.1f} ms",
+            f"{'stage':<20} {'calls':>8} {'ms':>10} {'%':>6}",
+        ]
+        stages = sorted(
+            report["stages"].items(), key=lambda item: item[1]["seconds"], reverse=True
+        )
+        for name, stage in stages:
+            share = stage["seconds"] / total * 100 if total else 0.0
+            lines.append(
+                f"{name:<20} {stage['calls']:>8} "
+                f"{stage['seconds'] * 1000:>10.2f} {share:>6.1f}"
+            )
+        if report["slowest_pages"]:
+            lines.append("Slowest pages:")
+            for page in report["slowest_pages"]:
+                lines.append(f"  {page['seconds'] * 1000:>10.2f} ms  {page['path']}")
+        copy = report["static_copy"]
+        lines.append(
+            f"Static copy: {copy['files']} file(s), {copy['bytes']} bytes in "
+            f"{copy['seconds'] * 1000:.1f} ms "
+            f"({copy['bytes_per_second'] / (1024 * 1024):.1f} MiB/s)"
+        )
+        return "\n".join(lines)
@@ -0,0 +1,262 @@
+import json
+import os
+import re
+import shutil
+
+from output import AtomicOutput
+from siteindex import page_url
+
+
+SEARCH_INDEX_VERSION = 1
+
+# Postings are split into this many files by a hash of their term
+DEFAULT_SHARDS = 64
+
+# Words of two or more letters, digits or underscores, matched lowercased
+_TERM_RE = re.compile(r"\w{2,}")
+
+_FNV_OFFSET = 0x811C9DC5
+_FNV_PRIME = 0x01000193
+
+
+def count_terms(terms, text):
+    """Add each search term of text to the term -> occurrences dict terms."""
+    for term in _TERM_RE.findall(text.lower()):
+        terms[term] = terms.get(term, 0) + 1
+
+
+def shard_of(term, shards=DEFAULT_SHARDS):
+    """Return the shard holding term's postings.
+
+    The 32-bit FNV-1a hash of the term's UTF-8 bytes, modulo shards; a
+    browser computes the same with TextEncoder and Math.imul.
+    """
+    h = _FNV_OFFSET
+    for byte in term.encode("utf-8"):
+        h = ((h ^ byte) * _FNV_PRIME) & 0xFFFFFFFF
+    return h % shards
+
+
+def _dump(data):
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"), sort_keys=True)
+
+
+class SearchIndex:
+    """An inverted index of every page's words, for client-side search.
+
+    - Terms come from the TextNodes of each page, counted into PageInfo.terms
+      while it renders; a page whose source hash matches its record is not
+      tokenized again
+    - Postings map a term to [doc, count, doc, count, ...] in doc order, and
+      live in shards files chosen by shard_of(term). A page remembers which
+      shards hold its terms, so updating or removing pages only reads and
+      rewrites those shards, each once however many of its pages changed
+    - The authoritative copy is kept under path (a cache directory) and
+      published into dest_dir/search/: N.json for each shard, plus
+      docs.json with the shard count and the [url, title, words] of each doc
+      id (null for ids no longer in use). A browser loads docs.json, then
+      only the shards of the terms it searches for
+    """
+
+    def __init__(self, path, shards=DEFAULT_SHARDS, pages=None, docs=None):
+        self.path = path
+        self.shards = shards
+        # dest_path -> [doc id, source hash, bit mask of the shards used]
+        self.pages = pages if pages is not None else {}
+        # doc id -> [dest_path, title, words], or None if free
+        self.docs = docs if docs is not None else []
+        # Free doc ids, lowest last
+        self._free = [doc for doc, entry in enumerate(self.docs) if entry is None]
+        self._free.reverse()
+        # shard -> term -> {doc: count}, read on first use
+        self._loaded = {}
+        # Changes not applied to the shards yet: docs whose old postings are
+        # dropped, and postings to add, by shard
+        self._stale = {}
+        self._added = {}
+        # Shards changed since the last save() and the last publish(); a new
+        # index replaces whatever an earlier one published
+        self._unsaved = set()
+        self._unpublished = set(range(shards)) if pages is None else set()
+
+    @classmethod
+    def load(cls, path, shards=DEFAULT_SHARDS):
+        """Load the index kept under path, or return an empty one."""
+        try:
+            with open(os.path.join(path, "state.json"), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path, shards)
+        if (
+            not isinstance(data, dict)
+            or data.get("version") != SEARCH_INDEX_VERSION
+            or data.get("shards") != shards
+            or not all(
+                os.path.isfile(os.path.join(path, f"{n}.json")) for n in range(shards)
+            )
+        ):
+            return cls(path, shards)
+        return cls(path, shards, data["pages"], data["docs"])
+
+    def _shard_path(self, shard):
+        return os.path.join(self.path, f"{shard}.json")
+
+    def _shard(self, shard):
+        postings = self._loaded.get(shard)
+        if postings is None:
+            postings = {}
+            try:
+                with open(self._shard_path(shard), "r", encoding="utf-8") as f:
+                    stored = json.load(f)
+            except FileNotFoundError:
+                stored = {}
+            for term, flat in stored.items():
+                postings[term] = dict(zip(flat[::2], flat[1::2]))
+            self._loaded[shard] = postings
+        return postings
+
+    def is_current(self, dest_path, source_hash):
+        """Return True if dest_path's postings were taken from this source."""
+        page = self.pages.get(dest_path)
+        return page is not None and page[1] == source_hash
+
+    def _drop(self, doc, mask):
+        # Queue the removal of doc's postings from every shard in mask
+        shard = 0
+        while mask:
+            if mask & 1:
+                self._stale.setdefault(shard, set()).add(doc)
+                added = self._added.get(shard)
+                if added:
+                    for docs in added.values():
+                        docs.pop(doc, None)
+            mask >>= 1
+            shard += 1
+
+    def record(self, dest_path, source_hash, info):
+        """Replace dest_path's postings with the terms of PageInfo info."""
+        page = self.pages.get(dest_path)
+        if page is None:
+            doc = self._free.pop() if self._free else len(self.docs)
+            if doc == len(self.docs):
+                self.docs.append(None)
+        else:
+            doc = page[0]
+            self._drop(doc, page[2])
+        mask = 0
+        shards = self.shards
+        added = self._added
+        for term, count in info.terms.items():
+            shard = shard_of(term, shards)
+            added.setdefault(shard, {}).setdefault(term, {})[doc] = count
+            mask |= 1 << shard
+        self.pages[dest_path] = [doc, source_hash, mask]
+        self.docs[doc] = [dest_path, info.title, info.words]
+
+    def retain(self, dest_paths):
+        """Drop the pages not in dest_paths from the index; return their paths."""
+        removed = sorted(set(self.pages) - set(dest_paths))
+        for dest_path in removed:
+            self.remove(dest_path)
+        return removed
+
+    def remove(self, dest_path):
+        """Drop dest_path's postings, if it has any."""
+        page = self.pages.pop(dest_path, None)
+        if page is not None:
+            self._drop(page[0], page[2])
+            self.docs[page[0]] = None
+            self._free.append(page[0])
+            self._free.sort(reverse=True)
+
+    def _apply(self):
+        # One pass over each shard with queued changes
+        for shard in set(self._stale) | set(self._added):
+            postings = self._shard(shard)
+            stale = self._stale.get(shard)
+            if stale:
+                for term in list(postings):
+                    docs = postings[term]
+                    if not stale.isdisjoint(docs):
+                        for doc in stale.intersection(docs):
+                            del docs[doc]
+                        if not docs:
+                            del postings[term]
+            for term, docs in self._added.get(shard, {}).items():
+                if docs:
+                    postings.setdefault(term, {}).update(docs)
+            self._unsaved.add(shard)
+            self._unpublished.add(shard)
+        self._stale = {}
+        self._added = {}
+
+    def _write_shard(self, path, shard):
+        postings = self._shard(shard)
+        stored = {}
+        for term, docs in postings.items():
+            flat = []
+            for doc in sorted(docs):
+                flat.append(doc)
+                flat.append(docs[doc])
+            stored[term] = flat
+        with AtomicOutput(path) as out:
+            out.write(_dump(stored))
+        return out.changed
+
+    def save(self):
+        """Write the changed shards and the page records under path."""
+        self._apply()
+        os.makedirs(self.path, exist_ok=True)
+        for shard in range(self.shards):
+            path = self._shard_path(shard)
+            if shard in self._unsaved or not os.path.isfile(path):
+                self._write_shard(path, shard)
+        self._unsaved.clear()
+        state = {
+            "version": SEARCH_INDEX_VERSION,
+            "shards": self.shards,
+            "pages": self.pages,
+            "docs": self.docs,
+        }
+        tmp_path = os.path.join(self.path, "state.json.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(_dump(state))
+        os.replace(tmp_path, os.path.join(self.path, "state.json"))
+
+    def output_paths(self, dest_dir):
+        """Return the paths publish() writes under dest_dir."""
+        search_dir = os.path.join(dest_dir, "search")
+        paths = [os.path.join(search_dir, f"{n}.json") for n in range(self.shards)]
+        paths.append(os.path.join(search_dir, "docs.json"))
+        return paths
+
+    def publish(self, dest_dir, base_path):
+        """Write the index into dest_dir/search/; return the number of files written.
+
+        Shards changed since the last publish are written from memory; the
+        others are copied from path only if dest_dir lacks them (as after a
+        full build, which cleans it). docs.json is rewritten if it changed.
+        """
+        self._apply()
+        search_dir = os.path.join(dest_dir, "search")
+        os.makedirs(search_dir, exist_ok=True)
+        written = 0
+        for shard in range(self.shards):
+            dest_path = os.path.join(search_dir, f"{shard}.json")
+            if shard in self._unpublished:
+                written += self._write_shard(dest_path, shard)
+            elif not os.path.isfile(dest_path):
+                shutil.copyfile(self._shard_path(shard), dest_path)
+                written += 1
+        self._unpublished.clear()
+        docs = [
+            (
+                None
+                if entry is None
+                else [page_url(entry[0], dest_dir, base_path), entry[1], entry[2]]
+            )
+            for entry in self.docs
+        ]
+        with AtomicOutput(os.path.join(search_dir, "docs.json")) as out:
+            out.write(_dump({"shards": self.shards, "docs": docs}))
+        return written + out.changed
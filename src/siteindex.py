@@ -0,0 +1,198 @@
+import json
+import os
+from datetime import datetime, timezone
+from urllib.parse import quote
+from xml.sax.saxutils import escape
+
+from output import AtomicOutput
+
+
+SITE_INDEX_VERSION = 1
+
+# Pages listed in the Atom feed, newest first
+DEFAULT_FEED_ENTRIES = 20
+
+# Names of the site files written into the output directory
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "atom.xml"
+
+_XML_ATTR_ENTITIES = {'"': "&quot;"}
+
+
+class PageInfo:
+    """Metadata gathered from one page while it is rendered.
+
+    Filled in by generate_page: title, plus the word count, link URLs and
+    image URLs of its markdown blocks (see iter_markdown_html). With
+    collect_terms, terms also counts the search terms of the blocks' text
+    (see search.count_terms); otherwise it is None.
+    """
+
+    __slots__ = ("title", "words", "links", "images", "terms")
+
+    def __init__(self, collect_terms=False):
+        self.title = None
+        self.words = 0
+        self.links = []
+        self.images = []
+        self.terms = {} if collect_terms else None
+
+
+class SiteIndex:
+    """Persistent metadata of every generated page, for site-wide outputs.
+
+    - entries maps each output path to its source, source hash, title, word
+      count, outgoing links, images and updated time (the source's mtime
+      when its content last changed)
+    - Entries are filled from PageInfo while pages render; a page whose
+      source hash matches its entry is not collected again
+    - sitemap.xml and the Atom feed are written from the index alone, so
+      neither needs another pass over the content
+    """
+
+    def __init__(self, path=None, entries=None):
+        self.path = path
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, path):
+        """Load an index from path, or return an empty one."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return cls(path)
+        if not isinstance(data, dict) or data.get("version") != SITE_INDEX_VERSION:
+            return cls(path)
+        return cls(path, data.get("pages", {}))
+
+    def save(self):
+        """Write the index to disk atomically."""
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": SITE_INDEX_VERSION, "pages": self.entries},
+                f,
+                indent=1,
+                sort_keys=True,
+            )
+        os.replace(tmp_path, self.path)
+
+    def is_current(self, dest_path, source_hash):
+        """Return True if dest_path's entry was collected from this source."""
+        entry = self.entries.get(dest_path)
+        return entry is not None and entry["source_hash"] == source_hash
+
+    def record(self, dest_path, from_path, source_hash, info):
+        """Store the PageInfo collected while rendering dest_path."""
+        self.entries[dest_path] = {
+            "source": from_path,
+            "source_hash": source_hash,
+            "title": info.title,
+            "words": info.words,
+            # Each URL once, in order of first use
+            "links": list(dict.fromkeys(info.links)),
+            "images": list(dict.fromkeys(info.images)),
+            "updated": os.stat(from_path).st_mtime,
+        }
+
+    def retain(self, dest_paths):
+        """Drop the entries of outputs not in dest_paths; return their paths."""
+        removed = sorted(set(self.entries) - set(dest_paths))
+        for dest_path in removed:
+            del self.entries[dest_path]
+        return removed
+
+    def pages(self, dest_dir, base_path):
+        """Return (url, entry) pairs for every page under dest_dir, by URL."""
+        pages = [
+            (page_url(dest_path, dest_dir, base_path), entry)
+            for dest_path, entry in self.entries.items()
+        ]
+        pages.sort(key=lambda page: page[0])
+        return pages
+
+
+def page_url(dest_path, dest_dir, base_path):
+    """Return the site-relative URL of an output; index.html maps to its directory."""
+    rel_path = os.path.relpath(dest_path, dest_dir).replace(os.sep, "/")
+    if rel_path == "index.html" or rel_path.endswith("/index.html"):
+        rel_path = rel_path[: -len("index.html")]
+    return base_path.rstrip("/") + "/" + quote(rel_path)
+
+
+def _timestamp(seconds):
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def site_file_paths(dest_dir):
+    """Return the paths write_sitemap and write_feed write under dest_dir."""
+    return [os.path.join(dest_dir, SITEMAP_NAME), os.path.join(dest_dir, FEED_NAME)]
+
+
+def write_sitemap(site_index, dest_dir, base_path, site_url):
+    """Write dest_dir/sitemap.xml listing every page; returns its path."""
+    site_url = site_url.rstrip("/")
+    path = os.path.join(dest_dir, SITEMAP_NAME)
+    with AtomicOutput(path) as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+        for url, entry in site_index.pages(dest_dir, base_path):
+            out.write(
+                f"<url><loc>{escape(site_url + url)}</loc>"
+                f"<lastmod>{_timestamp(entry['updated'])}</lastmod></url>\n"
+            )
+        out.write("</urlset>\n")
+    return path
+
+
+def write_feed(
+    site_index, dest_dir, base_path, site_url, max_entries=DEFAULT_FEED_ENTRIES
+):
+    """Write dest_dir/atom.xml with the most recently updated pages.
+
+    - The feed's title (and author) is the title of the site's root page, or
+      site_url if there is none; the root page itself is not an entry
+    - Entries are the max_entries pages updated last, newest first
+    - Returns the feed's path
+    """
+    site_url = site_url.rstrip("/")
+    root_url = base_path.rstrip("/") + "/"
+    pages = site_index.pages(dest_dir, base_path)
+    title = site_url
+    entries = []
+    for url, entry in pages:
+        if url == root_url:
+            title = entry["title"] or site_url
+        else:
+            entries.append((url, entry))
+    entries.sort(key=lambda page: page[1]["updated"], reverse=True)
+    entries = entries[:max_entries]
+    updated = max((entry["updated"] for _url, entry in pages), default=0)
+
+    path = os.path.join(dest_dir, FEED_NAME)
+    feed_url = escape(f"{site_url}{root_url}{FEED_NAME}", _XML_ATTR_ENTITIES)
+    with AtomicOutput(path) as out:
+        out.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        out.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        out.write(f"<title>{escape(title)}</title>\n")
+        out.write(f"<id>{escape(site_url + root_url)}</id>\n")
+        out.write(f'<link rel="self" href="{feed_url}" />\n')
+        out.write(
+            f'<link href="{escape(site_url + root_url, _XML_ATTR_ENTITIES)}" />\n'
+        )
+        out.write(f"<updated>{_timestamp(updated)}</updated>\n")
+        out.write(f"<author><name>{escape(title)}</name></author>\n")
+        for url, entry in entries:
+            absolute = site_url + url
+            out.write(
+                f"<entry><title>{escape(entry['title'] or url)}</title>"
+                f'<link href="{escape(absolute, _XML_ATTR_ENTITIES)}" />'
+                f"<id>{escape(absolute)}</id>"
+                f"<updated>{_timestamp(entry['updated'])}</updated></entry>\n"
+            )
+        out.write("</feed>\n")
+    return path
@@ -0,0 +1,77 @@
+import re
+
+from minify import minify_markup
+
+
+# Matches "{{ Name }}" placeholders such as {{ Title }} and {{ Content }}
+_PLACEHOLDER_RE = re.compile(r"\{\{ (\w+) \}\}")
+
+
+def rewrite_root_urls(html, base_path):
+    """Prefix root-relative href/src attributes in html with base_path."""
+    if base_path == "/":
+        # Replacing '="/' with '="/' is a no-op, so skip the copies entirely
+        return html
+    return html.replace('href="/', f'href="{base_path}').replace(
+        'src="/', f'src="{base_path}'
+    )
+
+
+class Template:
+    """An HTML template compiled into literal segments and placeholder slots.
+
+    The source is split once, and base_path rewriting (and, with
+    minify=True, whitespace removal) is applied to the literal segments up
+    front, so rendering a page is a single join over the segments and the
+    substituted values.
+    """
+
+    def __init__(self, source, base_path="/", minify=False):
+        parts = _PLACEHOLDER_RE.split(source)
+        # split() alternates literal text and captured placeholder names
+        self.base_path = base_path
+        literals = parts[::2]
+        if minify:
+            literals = [minify_markup(part) for part in literals]
+        self.segments = [rewrite_root_urls(part, base_path) for part in literals]
+        self.slots = parts[1::2]
+
+    @classmethod
+    def from_file(cls, path, base_path="/", minify=False):
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(f.read(), base_path, minify)
+
+    def render(self, **values):
+        """Return the template with each {{ Name }} replaced by values[Name].
+
+        Values get the same base_path rewriting as the template itself.
+        Placeholders without a value are left in place.
+        """
+        return "".join(self.iter_render(**values))
+
+    def iter_render(self, **values):
+        """Yield the rendered page in chunks instead of building one string.
+
+        A value may be a string or an iterable of string chunks, such as
+        HTMLNode.iter_html(). The base_path rewrite is applied per chunk, so
+        chunks must not split an href/src attribute; HTMLNode chunks never do.
+        An iterable is consumed once, so use one only for a single placeholder.
+        """
+        base_path = self.base_path
+        yield self.segments[0]
+        for slot, segment in zip(self.slots, self.segments[1:]):
+            value = values.get(slot)
+            if value is None:
+                yield f"{{{{ {slot} }}}}"
+            elif isinstance(value, str):
+                yield rewrite_root_urls(value, base_path)
+            else:
+                for chunk in value:
+                    yield rewrite_root_urls(chunk, base_path)
+            yield segment
+
+    def write(self, fp, **values):
+        """Render the template straight into a file-like object."""
+        write = fp.write
+        for chunk in self.iter_render(**values):
+            write(chunk)
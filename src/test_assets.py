@@ -0,0 +1,144 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import assets
+from assets import copy_file_fast, sync_file, sync_files, sync_tree
+from fixtures import TempDirTestCase
+from manifest import BuildManifest
+
+
+class TestSyncTree(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        root = self.root
+        self.static = os.path.join(root, "static")
+        self.docs = os.path.join(root, "docs")
+        self.manifest = BuildManifest(os.path.join(root, "manifest.json"))
+        self._write(os.path.join(self.static, "index.css"), "body {}")
+        self._write(os.path.join(self.static, "images", "a.png"), "aaaa")
+
+    def _sync(self, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return sync_tree(self.static, self.docs, self.manifest, **kwargs)
+
+    def test_only_changed_files_are_copied(self):
+        self.assertEqual(self._sync()["copied"], 2)
+        counts = self._sync()
+        self.assertEqual((counts["copied"], counts["unchanged"]), (0, 2))
+
+        self._write(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        counts = self._sync()
+        self.assertEqual((counts["copied"], counts["unchanged"]), (1, 1))
+        with open(os.path.join(self.docs, "index.css"), encoding="utf-8") as f:
+            self.assertEqual(f.read(), "body { margin: 0 }")
+
+    def test_checksum_catches_same_size_and_mtime(self):
+        self._sync()
+        src = os.path.join(self.static, "images", "a.png")
+        st = os.stat(src)
+        self._write(src, "bbbb")
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns))
+        self.assertEqual(self._sync()["copied"], 0)
+        self.assertEqual(self._sync(checksum=True)["copied"], 1)
+
+    def test_stale_assets_removed_but_pages_kept(self):
+        self._sync()
+        page = os.path.join(self.docs, "index.html")
+        self._write(page, "<html></html>")
+        os.remove(os.path.join(self.static, "images", "a.png"))
+
+        self.assertEqual(self._sync()["removed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "images")))
+        self.assertTrue(os.path.exists(page))
+        self.assertEqual(
+            self.manifest.assets,
+            {
+                os.path.join(self.docs, "index.css"): os.path.join(
+                    self.static, "index.css"
+                )
+            },
+        )
+
+    def test_clean_wipes_destination(self):
+        self._write(os.path.join(self.docs, "old.html"), "old")
+        self._sync(clean=True)
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "old.html")))
+
+    def test_hardlink_mode_shares_inode(self):
+        self.assertEqual(self._sync(link_mode="hardlink")["hardlinked"], 2)
+        src = os.stat(os.path.join(self.static, "index.css"))
+        dst = os.stat(os.path.join(self.docs, "index.css"))
+        self.assertEqual((src.st_dev, src.st_ino), (dst.st_dev, dst.st_ino))
+        self.assertEqual(self._sync(link_mode="hardlink")["unchanged"], 2)
+
+    def test_parallel_sync_matches_serial(self):
+        for i in range(20):
+            self._write(os.path.join(self.static, f"d{i % 3}", f"{i}.txt"), str(i))
+        self.assertEqual(self._sync(workers=8)["copied"], 22)
+        for i in range(20):
+            with open(os.path.join(self.docs, f"d{i % 3}", f"{i}.txt")) as f:
+                self.assertEqual(f.read(), str(i))
+        self.assertEqual(self._sync(workers=1)["unchanged"], 22)
+
+
+class TestSyncFile(unittest.TestCase):
+    def test_reflink_falls_back_to_copy(self):
+        with tempfile.TemporaryDirectory() as root:
+            src = os.path.join(root, "src.txt")
+            dst = os.path.join(root, "dst.txt")
+            with open(src, "w", encoding="utf-8") as f:
+                f.write("data")
+            self.assertIn(sync_file(src, dst, "reflink"), ("reflinked", "copied"))
+            with open(dst, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "data")
+            # No temporary file is left behind
+            self.assertEqual(sorted(os.listdir(root)), ["dst.txt", "src.txt"])
+
+    def test_copy_file_fast_keeps_data_and_mtime(self):
+        with tempfile.TemporaryDirectory() as root:
+            src = os.path.join(root, "src.bin")
+            dst = os.path.join(root, "dst.bin")
+            data = os.urandom(200_000)
+            with open(src, "wb") as f:
+                f.write(data)
+            os.utime(src, ns=(1_000_000_000, 1_000_000_000))
+            copy_file_fast(src, dst)
+            with open(dst, "rb") as f:
+                self.assertEqual(f.read(), data)
+            self.assertEqual(os.stat(dst).st_mtime_ns, 1_000_000_000)
+
+    def test_copy_file_fast_without_kernel_copy(self):
+        with tempfile.TemporaryDirectory() as root:
+            src = os.path.join(root, "src.txt")
+            dst = os.path.join(root, "dst.txt")
+            with open(src, "w", encoding="utf-8") as f:
+                f.write("data")
+            saved = assets._KERNEL_COPIES
+            assets._KERNEL_COPIES = []
+            try:
+                copy_file_fast(src, dst)
+            finally:
+                assets._KERNEL_COPIES = saved
+            with open(dst, encoding="utf-8") as f:
+                self.assertEqual(f.read(), "data")
+
+    def test_sync_files_preserves_order(self):
+        with tempfile.TemporaryDirectory() as root:
+            pairs = []
+            for i in range(10):
+                src = os.path.join(root, f"{i}.src")
+                with open(src, "w", encoding="utf-8") as f:
+                    f.write(str(i))
+                pairs.append((src, os.path.join(root, f"{i}.dst")))
+            self.assertEqual(sync_files(pairs, workers=4), ["copied"] * 10)
+
+    def test_unknown_mode(self):
+        with self.assertRaises(ValueError):
+            sync_file("a", "b", "symlink")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,173 @@
+import contextlib
+import io
+import os
+import pickle
+import sqlite3
+import tempfile
+import unittest
+
+from blockcache import BlockCache
+from utils import generate_pages_recursive, iter_markdown_html
+
+MARKDOWN = """# Changelog
+
+## 1.1
+
+- Fixed **bold** bug
+- Added `code`
+
+```
+x  =  1
+
+y = 2
+```
+
+## 1.0
+
+- Fixed **bold** bug
+"""
+
+
+def _render(block, minify):
+    return f"<p>{block}</p>"
+
+
+class TestBlockCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self._tmp.name, "cache", "blocks.sqlite")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_output_matches_uncached(self):
+        lines = MARKDOWN.split("\n")
+        for minify in (False, True):
+            expected = "".join(iter_markdown_html(lines, minify))
+            cache = BlockCache()
+            for _ in range(2):
+                html = "".join(iter_markdown_html(lines, minify, cache))
+                self.assertEqual(html, expected)
+            # Six distinct blocks; the second pass only hit the cache
+            self.assertEqual((cache.misses, cache.hits), (6, 6))
+
+    def test_memory_and_disk_hits(self):
+        cache = BlockCache(self.db_path)
+        self.assertEqual(cache.fragment("a", False, _render), "<p>a</p>")
+        self.assertEqual(cache.fragment("a", False, _render), "<p>a</p>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        cache.close()
+
+        reopened = BlockCache(self.db_path)
+        self.assertEqual(reopened.fragment("a", False, _render), "<p>a</p>")
+        self.assertEqual((reopened.disk_hits, reopened.misses), (1, 0))
+        self.assertIn("1 disk hit(s)", reopened.summary())
+        reopened.close()
+
+    def test_minify_is_part_of_the_key(self):
+        cache = BlockCache()
+        cache.fragment("a", False, _render)
+        cache.fragment("a", True, lambda block, minify: "<p>min</p>")
+        self.assertEqual(cache.fragment("a", True, _render), "<p>min</p>")
+        self.assertEqual(cache.misses, 2)
+
+    def test_memory_is_bounded_by_size(self):
+        # Fragments are 8 characters, so 64 hold the last eight blocks
+        cache = BlockCache(max_bytes=64)
+        for block in "abcdefghi":
+            cache.fragment(block, False, _render)
+        cache.fragment("i", False, _render)
+        cache.fragment("a", False, _render)
+        self.assertEqual((cache.hits, cache.misses), (1, 10))
+
+    def test_oversized_fragments_stay_out_of_memory(self):
+        cache = BlockCache(max_bytes=64)
+        for block in ("a", "x" * 10, "a", "x" * 10):
+            cache.fragment(block, False, _render)
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+
+    def test_evict_keeps_recent_rows(self):
+        cache = BlockCache(self.db_path)
+        for block in ("a", "b", "c"):
+            cache.fragment(block, False, _render)
+        cache.flush()
+        self.assertEqual(cache.evict(max_entries=2), 1)
+        cache.close()
+
+    def test_evict_keeps_a_running_row_count(self):
+        first, second = BlockCache(self.db_path), BlockCache(self.db_path)
+        # Both render the same blocks, as two pool workers can; one row each
+        for cache in (first, second):
+            for block in ("a", "b"):
+                cache.fragment(block, False, _render)
+        first.flush()
+        second.flush()
+        rows = first._connect().execute("SELECT rows FROM meta").fetchone()[0]
+        self.assertEqual(rows, 2)
+        self.assertEqual(first.evict(max_entries=2), 0)
+        second.fragment("c", False, _render)
+        self.assertEqual(second.evict(max_entries=2), 1)
+        first.close()
+        second.close()
+
+    def test_row_count_starts_from_an_existing_table(self):
+        os.makedirs(os.path.dirname(self.db_path))
+        db = sqlite3.connect(self.db_path)
+        db.execute("CREATE TABLE blocks (key TEXT PRIMARY KEY, html TEXT, used REAL)")
+        db.executemany(
+            "INSERT INTO blocks VALUES (?, '<p></p>', ?)",
+            [("a", 1.0), ("b", 2.0), ("c", 3.0)],
+        )
+        db.commit()
+        db.close()
+        cache = BlockCache(self.db_path)
+        self.assertEqual(cache.evict(max_entries=1), 2)
+        rows = cache._connect().execute("SELECT key FROM blocks").fetchall()
+        self.assertEqual(rows, [("c",)])
+        cache.close()
+
+    def test_pickled_cache_reopens_database(self):
+        cache = BlockCache(self.db_path)
+        cache.fragment("a", False, _render)
+        cache.close()
+        clone = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(clone.lookups, 0)
+        clone.fragment("a", False, _render)
+        self.assertEqual(clone.disk_hits, 1)
+        clone.close()
+
+    def test_parallel_build_shares_disk_cache(self):
+        content = os.path.join(self._tmp.name, "content")
+        template = os.path.join(self._tmp.name, "template.html")
+        os.makedirs(content)
+        with open(template, "w", encoding="utf-8") as f:
+            f.write("{{ Title }}{{ Content }}")
+        for i in range(4):
+            with open(os.path.join(content, f"{i}.md"), "w", encoding="utf-8") as f:
+                f.write(MARKDOWN)
+        builds = []
+        with contextlib.redirect_stdout(io.StringIO()):
+            for dest in ("a", "b"):
+                builds.append(BlockCache(self.db_path))
+                generate_pages_recursive(
+                    content,
+                    template,
+                    os.path.join(self._tmp.name, dest),
+                    "/",
+                    jobs=2,
+                    block_cache=builds[-1],
+                )
+        # Lookups made by the workers are counted in the parent's cache
+        first, second = builds
+        self.assertGreater(first.misses, 0)
+        self.assertEqual(second.misses, 0)
+        self.assertEqual(second.lookups, first.lookups)
+        cache = BlockCache(self.db_path)
+        for block in ("# Changelog", "## 1.1", "## 1.0"):
+            cache.fragment(block, False, _render)
+        self.assertEqual(cache.disk_hits, 3)
+        cache.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -30,3 +30,12 @@ class TestBlockNode(unittest.TestCase):
             block_to_block_type("This is a paragraph with **bold** text."),
             BlockType.PARAGRAPH,
         )
+
+    def test_block_to_block_type_near_misses(self):
+        self.assertEqual(block_to_block_type(""), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("#hashtag"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("####### seven"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("-dash"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("1.no space"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("```\nunclosed"), BlockType.PARAGRAPH)
+        self.assertEqual(block_to_block_type("2024 was a year"), BlockType.PARAGRAPH)
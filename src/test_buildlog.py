@@ -0,0 +1,58 @@
+import contextlib
+import io
+import unittest
+
+from buildlog import NORMAL, QUIET, VERBOSE, BuildLog
+
+
+class TestBuildLog(unittest.TestCase):
+    def test_levels(self):
+        for level, expected in (
+            (QUIET, ""),
+            (NORMAL, "event\n"),
+            (VERBOSE, "event\nfile\n"),
+        ):
+            out = io.StringIO()
+            log = BuildLog(level, out)
+            log.info("event")
+            log.detail("file")
+            log.flush()
+            self.assertEqual(out.getvalue(), expected)
+            self.assertEqual(log.verbose, level == VERBOSE)
+
+    def test_output_is_buffered(self):
+        out = io.StringIO()
+        log = BuildLog(VERBOSE, out, buffer_lines=3)
+        log.detail("a")
+        log.detail("b")
+        self.assertEqual(out.getvalue(), "")
+        log.detail("c")
+        self.assertEqual(out.getvalue(), "a\nb\nc\n")
+
+    def test_error_flushes_pending_lines_first(self):
+        out = io.StringIO()
+        err = io.StringIO()
+        log = BuildLog(NORMAL, out)
+        log.info("before")
+        with contextlib.redirect_stderr(err):
+            log.error("boom")
+        self.assertEqual(out.getvalue(), "before\n")
+        self.assertEqual(err.getvalue(), "boom\n")
+
+    def test_summary_totals(self):
+        log = BuildLog(NORMAL, io.StringIO())
+        log.count("pages", 3)
+        log.count("pages")
+        log.count("files", 2)
+        log.count("bytes", 3 * 1024 * 1024)
+        log.count("failed_pages", 1)
+        summary = log.summary()
+        self.assertTrue(summary.startswith("Rendered 4 page(s)"), summary)
+        self.assertIn("synced 2 static file(s) (3.0 MiB)", summary)
+        self.assertIn("1 page(s) FAILED", summary)
+        log.reset()
+        self.assertTrue(log.summary().startswith("Rendered 0 page(s)"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import contextlib
+import gzip
+import io
+import os
+import unittest
+
+import compress
+from compress import compress_tree
+from fixtures import TempDirTestCase
+
+
+class TestCompressTree(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self._write("index.html", "<p>hello</p>" * 100)
+        self._write(os.path.join("blog", "page.html"), "<p>page</p>" * 100)
+        self._write("index.css", "body { margin: 0 }" * 10)
+        self._write("image.png", "not compressed")
+
+    def _write(self, rel_path, text):
+        super()._write(os.path.join(self.root, rel_path), text)
+
+    def _compress(self, workers=1):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return compress_tree(self.root, workers=workers)
+
+    def test_writes_gzip_variants_of_html_and_css(self):
+        stats = self._compress(workers=2)
+        self.assertEqual(stats["compressed"], 3)
+        self.assertLess(stats["gz_bytes_out"], stats["gz_bytes_in"])
+        with gzip.open(os.path.join(self.root, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), "<p>hello</p>" * 100)
+        self.assertFalse(os.path.exists(os.path.join(self.root, "image.png.gz")))
+
+    def test_only_changed_files_are_recompressed(self):
+        self._compress()
+        stats = self._compress()
+        self.assertEqual((stats["compressed"], stats["skipped"]), (0, 3))
+
+        self._write("index.css", "body { margin: 1px }")
+        stats = self._compress()
+        self.assertEqual((stats["compressed"], stats["skipped"]), (1, 2))
+        with gzip.open(os.path.join(self.root, "index.css.gz"), "rt") as f:
+            self.assertEqual(f.read(), "body { margin: 1px }")
+
+    def test_stale_variants_are_removed(self):
+        self._compress()
+        os.remove(os.path.join(self.root, "blog", "page.html"))
+        self._compress()
+        self.assertEqual(os.listdir(os.path.join(self.root, "blog")), [])
+
+    @unittest.skipIf(compress.brotli is None, "brotli is not installed")
+    def test_brotli_variants(self):
+        self._compress()
+        with open(os.path.join(self.root, "index.html.br"), "rb") as f:
+            data = compress.brotli.decompress(f.read())
+        self.assertEqual(data.decode("utf-8"), "<p>hello</p>" * 100)
+
+
+if __name__ == "__main__":
+    unittest.main()
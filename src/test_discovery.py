@@ -0,0 +1,118 @@
+import os
+import unittest
+
+from discovery import DirectoryIndex
+from fixtures import TempDirTestCase
+
+
+class TestDirectoryIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = os.path.join(self.root, "content")
+        for rel_path in ("index.md", "blog/a/index.md", "blog/b/INDEX.MD", "x.txt"):
+            self._write(rel_path)
+        self._age()
+
+    def _write(self, rel_path):
+        super()._write(os.path.join(self.root, rel_path), "# T")
+
+    def _age(self):
+        # Push every directory's mtime out of the racy window
+        for dirpath, _dirs, _files in os.walk(self.root):
+            os.utime(dirpath, ns=(10**18, 10**18))
+
+    def _age_file(self, rel_path, mtime_ns=10**18):
+        os.utime(os.path.join(self.root, rel_path), ns=(mtime_ns, mtime_ns))
+
+    def test_unchanged_pages_are_not_hashed_again(self):
+        index = DirectoryIndex(os.path.join(self._tmp.name, "index.json"))
+        pages = index.scan(self.root)
+        for rel_path in pages:
+            self._age_file(rel_path)
+        hashes = [index.source_hash(rel_path) for rel_path in pages]
+        self.assertEqual(index.hashed, 3)
+        index.save()
+
+        index = DirectoryIndex.load(index.path)
+        self.assertEqual(index.scan(self.root), pages)
+        self.assertEqual([index.source_hash(rel_path) for rel_path in pages], hashes)
+        self.assertEqual((index.hashed, index.hashes_reused), (0, 3))
+
+        # Same size, new content and mtime
+        with open(os.path.join(self.root, "index.md"), "w", encoding="utf-8") as f:
+            f.write("# U")
+        self._age_file("index.md", 2 * 10**18)
+        old_hash = hashes[pages.index("index.md")]
+        self.assertNotEqual(index.source_hash("index.md"), old_hash)
+        self.assertEqual(index.hashed, 1)
+
+    def test_recently_modified_pages_are_hashed_every_time(self):
+        index = DirectoryIndex()
+        index.scan(self.root)
+        index.source_hash("index.md")
+        index.source_hash("index.md")
+        self.assertEqual((index.hashed, index.hashes_reused), (2, 0))
+
+    def test_scan_lists_markdown_files(self):
+        pages = DirectoryIndex().scan(self.root)
+        self.assertEqual(
+            pages,
+            sorted(["index.md", "blog/a/index.md", "blog/b/INDEX.MD"]),
+        )
+
+    def test_warm_scan_only_lists_changed_directories(self):
+        index = DirectoryIndex()
+        first = index.scan(self.root)
+        self.assertEqual(index.listed, 4)
+        self.assertEqual(index.scan(self.root), first)
+        self.assertEqual((index.listed, index.reused), (0, 4))
+
+        self._write("blog/a/new.md")
+        os.utime(os.path.join(self.root, "blog", "a"), ns=(2 * 10**18, 2 * 10**18))
+        pages = index.scan(self.root)
+        self.assertIn("blog/a/new.md", pages)
+        self.assertEqual((index.listed, index.reused), (1, 3))
+
+    def test_fresh_directories_are_listed_again(self):
+        index = DirectoryIndex()
+        self._write("blog/c/index.md")
+        index.scan(self.root)
+        index.scan(self.root)
+        # blog and blog/c were modified just now, so they are not trusted
+        self.assertEqual(index.listed, 2)
+
+    def test_removed_directories_are_dropped(self):
+        index = DirectoryIndex()
+        index.scan(self.root)
+        os.remove(os.path.join(self.root, "blog", "b", "INDEX.MD"))
+        os.rmdir(os.path.join(self.root, "blog", "b"))
+        self.assertEqual(index.scan(self.root), ["blog/a/index.md", "index.md"])
+        self.assertNotIn(os.path.join("blog", "b"), index.dirs)
+
+    def test_directory_symlinks_are_not_followed(self):
+        os.symlink(os.path.join(self.root, "blog"), os.path.join(self.root, "linked"))
+        self.assertNotIn("linked/a/index.md", DirectoryIndex().scan(self.root))
+
+    def test_save_and_load(self):
+        path = os.path.join(self._tmp.name, "cache", "index.json")
+        index = DirectoryIndex(path)
+        pages = index.scan(self.root)
+        index.save()
+
+        loaded = DirectoryIndex.load(path)
+        self.assertEqual(loaded.scan(self.root), pages)
+        self.assertEqual(loaded.listed, 0)
+        # A different root starts from scratch
+        blog = os.path.join(self.root, "blog")
+        self.assertEqual(loaded.scan(blog), ["a/index.md", "b/INDEX.MD"])
+        self.assertEqual(loaded.listed, 3)
+
+    def test_load_tolerates_bad_files(self):
+        path = os.path.join(self._tmp.name, "index.json")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("{not json")
+        self.assertEqual(DirectoryIndex.load(path).dirs, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import contextlib
+import io
+import os
+import unittest
+
+import utils
+from fixtures import TempDirTestCase
+from pagecache import PageCache
+from utils import PageGenerationError, generate_pages_recursive
+
+
+TEMPLATE = '<title>{{ Title }}</title><link href="/x.css" />{{ Content }}'
+
+
+class TestGeneratePages(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self._write(self.template, TEMPLATE)
+        for i in range(12):
+            self._write(
+                os.path.join(self.content, f"section{i % 3}", f"page{i}.md"),
+                f"# Page {i}\n\nSome **bold** text and a [link](/page{i}).",
+            )
+
+    def _generate(self, dest, jobs, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_pages_recursive(
+                self.content, self.template, dest, "/base/", jobs=jobs, **kwargs
+            )
+
+    def _read_tree(self, dest):
+        tree = {}
+        for root, _dirs, files in os.walk(dest):
+            for filename in files:
+                path = os.path.join(root, filename)
+                with open(path, encoding="utf-8") as f:
+                    tree[os.path.relpath(path, dest)] = f.read()
+        return tree
+
+    def test_parallel_build_matches_serial(self):
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        serial_rendered = self._generate(serial, jobs=1)
+        parallel_rendered = self._generate(parallel, jobs=4)
+
+        self.assertEqual(
+            [os.path.relpath(p, serial) for p in serial_rendered],
+            [os.path.relpath(p, parallel) for p in parallel_rendered],
+        )
+        self.assertEqual(len(serial_rendered), 12)
+        self.assertEqual(self._read_tree(serial), self._read_tree(parallel))
+
+    def test_pipelined_build_matches_streaming(self):
+        self._write(
+            os.path.join(self.content, "code.md"),
+            "# Code\n\n```\nfirst\n\nsecond\n```\n\n> quote **b**",
+        )
+        streamed = os.path.join(self.root, "streamed")
+        self._generate(streamed, jobs=1, io_threads=0)
+        expected = self._read_tree(streamed)
+
+        cache = PageCache(os.path.join(self.root, "cache"))
+        # Cold cache, warm cache, and without a cache
+        for run, page_cache in enumerate((cache, cache, None)):
+            dest = os.path.join(self.root, f"pipelined{run}")
+            rendered = self._generate(dest, jobs=1, io_threads=2, cache=page_cache)
+            self.assertEqual(len(rendered), 13)
+            self.assertEqual(self._read_tree(dest), expected)
+
+    def test_minified_pipelined_build_matches_streaming(self):
+        streamed = os.path.join(self.root, "streamed")
+        pipelined = os.path.join(self.root, "pipelined")
+        self._generate(streamed, jobs=1, io_threads=0, minify=True)
+        self._generate(pipelined, jobs=1, io_threads=2, minify=True)
+        self.assertEqual(self._read_tree(streamed), self._read_tree(pipelined))
+
+    def test_large_sources_bypass_the_pipeline(self):
+        streamed = os.path.join(self.root, "streamed")
+        self._generate(streamed, jobs=1, io_threads=0)
+        saved = utils._PIPELINE_MAX_SOURCE_BYTES
+        utils._PIPELINE_MAX_SOURCE_BYTES = 0
+        try:
+            dest = os.path.join(self.root, "out")
+            self._generate(dest, jobs=1, io_threads=2)
+        finally:
+            utils._PIPELINE_MAX_SOURCE_BYTES = saved
+        self.assertEqual(self._read_tree(dest), self._read_tree(streamed))
+
+    def test_errors_are_collected_per_page(self):
+        bad_one = os.path.join(self.content, "bad1.md")
+        bad_two = os.path.join(self.content, "section1", "bad2.md")
+        self._write(bad_one, "No title here")
+        self._write(bad_two, "# Title\n\nUnclosed **bold")
+        dest = os.path.join(self.root, "out")
+
+        for jobs, io_threads in ((1, 0), (1, 2), (3, 0)):
+            with self.assertRaises(PageGenerationError) as context:
+                self._generate(dest, jobs=jobs, io_threads=io_threads)
+            failures = context.exception.failures
+            self.assertEqual([path for path, _ in failures], [bad_one, bad_two])
+            self.assertIn("ValueError", failures[0][1])
+            self.assertIn("2 page(s) failed", str(context.exception))
+            # The healthy pages were still generated
+            self.assertEqual(len(self._read_tree(dest)), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,3 +1,4 @@
+import io
 import unittest
 from htmlnode import HTMLNode, LeafNode, ParentNode
 
@@ -81,6 +82,60 @@ class TestHTMLNode(unittest.TestCase):
             "<div><span><b>grandchild</b></span></div>",
         )
 
+    def test_iter_html_matches_to_html(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "a"), LeafNode("b", "b")]),
+                LeafNode("img", None, {"src": "/x.png"}),
+                ParentNode("ul", [ParentNode("li", [LeafNode(None, "item")])]),
+            ],
+        )
+        chunks = list(node.iter_html())
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(
+            "".join(chunks),
+            '<div><p>a<b>b</b></p><img src="/x.png" /><ul><li>item</li></ul></div>',
+        )
+        self.assertEqual(node.to_html(), "".join(chunks))
+
+    def test_write_html(self):
+        buffer = io.StringIO()
+        ParentNode("p", [LeafNode("i", "x")]).write_html(buffer)
+        self.assertEqual(buffer.getvalue(), "<p><i>x</i></p>")
+
+    def test_minify_collapses_text_but_not_code(self):
+        node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode(None, "a  \n b"), LeafNode("code", "x  y")]),
+                ParentNode("pre", [LeafNode("code", "def f():\n\n    return  1\n")]),
+            ],
+        )
+        self.assertEqual(
+            node.to_html(minify=True),
+            "<div><p>a b<code>x  y</code></p>"
+            "<pre><code>def f():\n\n    return  1\n</code></pre></div>",
+        )
+        self.assertEqual(
+            "".join(node.iter_html(minify=True)), node.to_html(minify=True)
+        )
+        self.assertIn("a  \n b", node.to_html())
+
+    def test_deeply_nested_tree(self):
+        node = LeafNode(None, "core")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span>" * 5000 + "core"))
+        self.assertTrue(html.endswith("</span>" * 5000))
+
+    def test_parent_without_tag_raises(self):
+        with self.assertRaises(ValueError):
+            ParentNode(None, [LeafNode(None, "x")]).to_html()
+        with self.assertRaises(ValueError):
+            ParentNode("div", [ParentNode("p", None)]).to_html()
+
 
 if __name__ == "__main__":
     unittest.main()
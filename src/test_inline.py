@@ -0,0 +1,85 @@
+import random
+import unittest
+
+from inline import scan_inline
+from textnode import TextNode, TextType
+from utils import _text_to_textnodes_split
+
+
+def _outcome(func, text):
+    try:
+        return [(n.text, n.text_type, n.url) for n in func(text)]
+    except ValueError as e:
+        return str(e)
+
+
+class TestScanInline(unittest.TestCase):
+    def test_mixed_markup(self):
+        nodes = scan_inline("a **b** _c_ `d` [e](f) ![g](h)")
+        self.assertListEqual(
+            [
+                TextNode("a ", TextType.PLAIN),
+                TextNode("b", TextType.BOLD),
+                TextNode(" ", TextType.PLAIN),
+                TextNode("c", TextType.ITALIC),
+                TextNode(" ", TextType.PLAIN),
+                TextNode("d", TextType.CODE),
+                TextNode(" ", TextType.PLAIN),
+                TextNode("e", TextType.LINK, "f"),
+                TextNode(" ", TextType.PLAIN),
+                TextNode("g", TextType.IMAGE, "h"),
+            ],
+            nodes,
+        )
+
+    def test_nested_delimiters_stay_literal(self):
+        self.assertListEqual(
+            [TextNode("x_y_z", TextType.BOLD)], scan_inline("**x_y_z**")
+        )
+        self.assertListEqual(
+            [TextNode("a `b` c", TextType.ITALIC)], scan_inline("_a `b` c_")
+        )
+
+    def test_empty_text(self):
+        self.assertListEqual([], scan_inline(""))
+
+    def test_unmatched_delimiter_raises(self):
+        for text in ("**open", "one_two", "`tick", "[a_b](u)", "**a [l](u) b**"):
+            with self.assertRaises(ValueError) as context:
+                scan_inline(text)
+            self.assertIn("Unmatched delimiter", str(context.exception))
+
+    def test_error_order_matches_pipeline(self):
+        # The "**" pass runs first in the pipeline, even if "_" breaks earlier
+        with self.assertRaises(ValueError) as context:
+            scan_inline("a_b and **c")
+        self.assertEqual(
+            str(context.exception), "Unmatched delimiter '**' in text: a_b and **c"
+        )
+
+    def test_images_win_over_overlapping_links(self):
+        # "[](![x)" is a link, but the pipeline takes the image inside it first
+        for text in (" ![i](v)([](![x)](x)__!b", "![[t](u)[](`a![)](x)[t](u)"):
+            self.assertEqual(
+                _outcome(_text_to_textnodes_split, text),
+                _outcome(scan_inline, text),
+                text,
+            )
+        self.assertIn(TextNode("x)", TextType.IMAGE, "x"), scan_inline("[](![x)](x)"))
+
+    def test_matches_split_pipeline_on_random_text(self):
+        rng = random.Random(1234)
+        alphabet = "a * ** _ ` [ ] ( ) ! ![ ]( ![x](y) [l](u) ![a_](b) [*](c)"
+        alphabet = alphabet.split(" ")
+        alphabet.append(" ")
+        for _ in range(5000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            self.assertEqual(
+                _outcome(_text_to_textnodes_split, text),
+                _outcome(scan_inline, text),
+                text,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
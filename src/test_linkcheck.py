@@ -0,0 +1,116 @@
+import contextlib
+import io
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from linkcheck import BrokenLinksError, LinkChecker, resolve_link
+from manifest import BuildManifest
+from siteindex import SiteIndex
+from utils import generate_pages_recursive
+
+
+class TestResolveLink(unittest.TestCase):
+    def test_root_relative_and_relative_links(self):
+        self.assertEqual(resolve_link("/blog/tom", "contact"), "blog/tom")
+        self.assertEqual(resolve_link("/blog/tom/#intro", ""), "blog/tom")
+        self.assertEqual(resolve_link("/", "blog"), "")
+        self.assertEqual(
+            resolve_link("../images/a%20b.png", "blog/tom"), "blog/images/a b.png"
+        )
+        self.assertEqual(resolve_link("x.html?page=2", "blog"), "blog/x.html")
+        self.assertEqual(resolve_link("../../x", "blog"), "../x")
+
+    def test_external_and_same_page_links_are_skipped(self):
+        for url in ["https://example.com/x", "//cdn.example.com/a.js", "mailto:a@b.c"]:
+            self.assertIsNone(resolve_link(url, ""))
+        self.assertIsNone(resolve_link("#top", "blog"))
+        self.assertIsNone(resolve_link("", "blog"))
+
+
+class TestLinkChecker(unittest.TestCase):
+    def test_reports_missing_targets(self):
+        checker = LinkChecker("docs")
+        checker.add_outputs(
+            [
+                os.path.join("docs", "index.html"),
+                os.path.join("docs", "blog", "tom", "index.html"),
+                os.path.join("docs", "contact.html"),
+                os.path.join("docs", "images", "tom.png"),
+            ]
+        )
+        page = os.path.join("docs", "blog", "tom", "index.html")
+        links = ["/", "/blog/tom", "/blog/tom/", "/contact", "../../contact.html", "/x"]
+        checker.check("tom.md", page, links, ["/images/tom.png", "tom.png"])
+        self.assertEqual(
+            checker.finish(),
+            [("tom.md", "image", "tom.png"), ("tom.md", "link", "/x")],
+        )
+        self.assertEqual(checker.checked, 8)
+
+
+class TestCheckLinksDuringBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self._write(self.template, "{{ Title }}{{ Content }}")
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\n[a](/a)")
+        self._write(os.path.join(self.content, "a.md"), "# A\n\n[home](/)")
+        self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        self.site_index = SiteIndex()
+
+    def _build(self, link_checker=None, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_pages_recursive(
+                self.content,
+                self.template,
+                self.dest,
+                "/",
+                self.manifest,
+                site_index=self.site_index,
+                link_checker=link_checker or LinkChecker(self.dest),
+                **kwargs,
+            )
+
+    def test_unchanged_pages_are_checked_against_current_outputs(self):
+        self.assertEqual(len(self._build()), 2)
+        os.remove(os.path.join(self.content, "a.md"))
+        with self.assertRaises(BrokenLinksError) as context:
+            self._build()
+        source = os.path.join(self.content, "index.md")
+        self.assertEqual(context.exception.broken, [(source, "link", "/a")])
+        self.assertIn(f"{source}: link /a", str(context.exception))
+
+    def test_pages_are_checked_as_they_render(self):
+        outputs = [os.path.join(self.dest, name) for name in ("a.html", "index.html")]
+        written = []
+
+        class RecordingChecker(LinkChecker):
+            def check(self, source, dest_path, links, images):
+                written.append([os.path.exists(path) for path in outputs])
+                super().check(source, dest_path, links, images)
+
+        self._build(RecordingChecker(self.dest), io_threads=0)
+        # a.md was queued before index.md was rendered
+        self.assertEqual(written, [[True, False], [True, True]])
+
+    def test_broken_links_are_found_in_every_render_mode(self):
+        self._write(os.path.join(self.content, "b.md"), "# B\n\n[gone](/gone)")
+        for jobs, io_threads in ((1, 0), (1, 2), (2, 0)):
+            self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+            self.site_index = SiteIndex()
+            with self.assertRaises(BrokenLinksError) as context:
+                self._build(jobs=jobs, io_threads=io_threads)
+            source = os.path.join(self.content, "b.md")
+            self.assertEqual(context.exception.broken, [(source, "link", "/gone")])
+
+    def test_needs_a_site_index(self):
+        self.site_index = None
+        with self.assertRaises(ValueError):
+            self._build()
+
+
+if __name__ == "__main__":
+    unittest.main()
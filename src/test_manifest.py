@@ -0,0 +1,84 @@
+import contextlib
+import io
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from manifest import BuildManifest
+from utils import generate_pages_recursive
+
+
+TEMPLATE = "<title>{{ Title }}</title><main>{{ Content }}</main>"
+
+
+class TestIncrementalBuild(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.docs = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.root, "cache", "manifest.json")
+        self._write(self.template, TEMPLATE)
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\nWelcome")
+        self._write(os.path.join(self.content, "blog", "post.md"), "# Post\n\nBody")
+
+    def _build(self, base_path="/", minify=False):
+        manifest = BuildManifest.load(self.manifest_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            rendered = generate_pages_recursive(
+                self.content,
+                self.template,
+                self.docs,
+                base_path,
+                manifest,
+                minify=minify,
+            )
+        manifest.save()
+        return sorted(os.path.relpath(p, self.docs) for p in rendered)
+
+    def test_second_build_skips_unchanged_pages(self):
+        self.assertEqual(self._build(), ["blog/post.html", "index.html"])
+        self.assertEqual(self._build(), [])
+
+    def test_changed_source_rerenders_only_that_page(self):
+        self._build()
+        self._write(os.path.join(self.content, "index.md"), "# Home\n\nFixed typo")
+        self.assertEqual(self._build(), ["index.html"])
+        with open(os.path.join(self.docs, "index.html"), encoding="utf-8") as f:
+            self.assertIn("Fixed typo", f.read())
+
+    def test_template_or_base_path_change_rerenders_everything(self):
+        self._build()
+        self._write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self.assertEqual(self._build(), ["blog/post.html", "index.html"])
+        self.assertEqual(self._build("/site/"), ["blog/post.html", "index.html"])
+
+    def test_minify_change_rerenders_everything(self):
+        self._build()
+        self.assertEqual(self._build(minify=True), ["blog/post.html", "index.html"])
+        self.assertEqual(self._build(minify=True), [])
+        self.assertEqual(self._build(), ["blog/post.html", "index.html"])
+
+    def test_missing_output_is_rerendered(self):
+        self._build()
+        os.remove(os.path.join(self.docs, "blog", "post.html"))
+        self.assertEqual(self._build(), ["blog/post.html"])
+
+    def test_removed_source_deletes_output(self):
+        self._build()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self._build()
+        self.assertFalse(os.path.exists(os.path.join(self.docs, "blog")))
+        self.assertTrue(os.path.exists(os.path.join(self.docs, "index.html")))
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertEqual(
+            list(manifest.entries), [os.path.join(self.docs, "index.html")]
+        )
+
+    def test_corrupt_manifest_is_ignored(self):
+        self._write(self.manifest_path, "{not json")
+        self.assertEqual(BuildManifest.load(self.manifest_path).entries, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import unittest
+
+from minify import collapse_whitespace, minify_markup
+
+
+class TestMinify(unittest.TestCase):
+    def test_collapse_whitespace_keeps_nbsp(self):
+        self.assertEqual(collapse_whitespace("a \n\t b\xa0\xa0c"), "a b\xa0\xa0c")
+
+    def test_block_tag_whitespace_removed(self):
+        html = "<!doctype html>\n<html>\n\n<head>\n   <title>T</title>\n</head>\n"
+        self.assertEqual(
+            minify_markup(html), "<!doctype html><html><head><title>T</title></head>"
+        )
+
+    def test_inline_whitespace_collapsed_not_removed(self):
+        self.assertEqual(
+            minify_markup("<p>\n  <b>a</b>\n  <i>b</i>\n</p>"),
+            "<p><b>a</b> <i>b</i></p>",
+        )
+
+    def test_preserved_elements(self):
+        html = (
+            "<div>\n<pre>  keep\n\n  this </pre>\n"
+            "<script>\n  x  =  1\n</script>\n</div>"
+        )
+        self.assertEqual(
+            minify_markup(html),
+            "<div><pre>  keep\n\n  this </pre> <script>\n  x  =  1\n</script></div>",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
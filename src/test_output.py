@@ -0,0 +1,66 @@
+import os
+import tempfile
+import unittest
+
+from output import AtomicOutput, prepare_output_dirs
+
+
+class TestAtomicOutput(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self._tmp.name, "page.html")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def _write(self, *chunks):
+        with AtomicOutput(self.path) as out:
+            for chunk in chunks:
+                out.write(chunk)
+        return out.changed
+
+    def _read(self):
+        with open(self.path, encoding="utf-8") as f:
+            return f.read()
+
+    def test_creates_file_and_directories(self):
+        self.path = os.path.join(self._tmp.name, "a", "b", "page.html")
+        self.assertTrue(self._write("<p>", "é</p>"))
+        self.assertEqual(self._read(), "<p>é</p>")
+
+    def test_identical_output_keeps_file_untouched(self):
+        self._write("<p>same</p>")
+        os.utime(self.path, ns=(10**18, 10**18))
+        self.assertFalse(self._write("<p>", "same", "</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 10**18)
+
+    def test_changed_output_replaces_file(self):
+        for old, new in (
+            ("<p>abc</p>", "<p>abd</p>"),  # differs in the middle
+            ("<p>abc</p>", "<p>abc</p><p>more</p>"),  # old is a prefix
+            ("<p>abc</p><p>more</p>", "<p>abc</p>"),  # new is a prefix
+        ):
+            self._write(old)
+            self.assertTrue(self._write(*new.partition("c")))
+            self.assertEqual(self._read(), new)
+        self.assertEqual(os.listdir(self._tmp.name), ["page.html"])
+
+    def test_error_keeps_old_file(self):
+        self._write("<p>old</p>")
+        with self.assertRaises(RuntimeError):
+            with AtomicOutput(self.path) as out:
+                out.write("<p>new")
+                raise RuntimeError("render failed")
+        self.assertEqual(self._read(), "<p>old</p>")
+        self.assertEqual(os.listdir(self._tmp.name), ["page.html"])
+
+    def test_prepare_output_dirs(self):
+        root = self._tmp.name
+        paths = [os.path.join(root, "x", name) for name in ("a.html", "b.html")]
+        prepare_output_dirs(paths + [os.path.join(root, "y", "z", "c.html")])
+        self.assertTrue(os.path.isdir(os.path.join(root, "x")))
+        self.assertTrue(os.path.isdir(os.path.join(root, "y", "z")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import contextlib
+import io
+import os
+import unittest
+from unittest import mock
+
+from fixtures import TempDirTestCase
+from pagecache import PageCache
+from template import Template
+import utils
+
+
+class TestPageCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = PageCache(os.path.join(self.root, "cache"))
+
+    def test_round_trip_keeps_records(self):
+        chunks = ['<p><a href="/x">', "x</a>\r\n", "</p>"]
+        with self.cache.store("abc123", "Title") as entry:
+            self.assertEqual(list(entry.tee(chunks)), chunks)
+        cached = self.cache.load("abc123")
+        with cached:
+            self.assertEqual(cached.title, "Title")
+            self.assertEqual("".join(cached.iter_content()), "".join(chunks))
+
+    def test_miss_and_failed_store(self):
+        self.assertIsNone(self.cache.load("missing"))
+        with self.assertRaises(RuntimeError):
+            with self.cache.store("broken", "T") as entry:
+                for _chunk in entry.tee(["<p>"]):
+                    raise RuntimeError("render failed")
+        self.assertIsNone(self.cache.load("broken"))
+
+    def test_evict_drops_least_recently_used(self):
+        for i, key in enumerate(["aa1", "bb2", "cc3"]):
+            with self.cache.store(key, "T") as entry:
+                list(entry.tee(["x" * 1000]))
+            path = self.cache._path(key)
+            os.utime(path, (1000 + i, 1000 + i))
+        # Reading an entry makes it the most recently used
+        with self.cache.load("aa1"):
+            pass
+        self.cache.max_bytes = 2500
+        self.assertEqual(self.cache.evict(), 1)
+        self.assertFalse(os.path.exists(self.cache._path("bb2")))
+        self.assertTrue(os.path.exists(self.cache._path("aa1")))
+        self.assertTrue(os.path.exists(self.cache._path("cc3")))
+
+    def test_evict_only_lists_changed_shards(self):
+        for key in ("aa1", "bb2"):
+            with self.cache.store(key, "T") as entry:
+                list(entry.tee(["x" * 1000]))
+        # Push the shards' mtimes out of the racy window
+        for shard in ("aa", "bb"):
+            os.utime(os.path.join(self.cache.directory, shard), ns=(10**9, 10**9))
+        self.assertEqual(self.cache.evict(), 0)
+
+        with self.cache.store("bb3", "T") as entry:
+            list(entry.tee(["x" * 1000]))
+        with mock.patch("pagecache.os.scandir", wraps=os.scandir) as scandir:
+            self.assertEqual(self.cache.evict(), 0)
+        listed = [call.args[0] for call in scandir.call_args_list]
+        shards = [self.cache.directory, os.path.join(self.cache.directory, "bb")]
+        self.assertEqual(listed, shards)
+        self.assertGreater(self.cache.size(), 3000)
+
+        self.cache.max_bytes = 2500
+        self.assertEqual(self.cache.evict(), 1)
+
+
+class TestGeneratePageWithCache(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache = PageCache(os.path.join(self.root, "cache"))
+        self.source = os.path.join(self.root, "page.md")
+        self._write(self.source, "# Hello\n\nSee [home](/) and ![pic](/p.png)\n")
+        self.dest = os.path.join(self.root, "out", "page.html")
+
+    def _render(self, base_path, minify=False):
+        template = Template('<a href="/">{{ Title }}</a>{{ Content }}', base_path)
+        with contextlib.redirect_stdout(io.StringIO()):
+            utils.generate_page(
+                self.source,
+                "template.html",
+                self.dest,
+                base_path,
+                template,
+                self.cache,
+                minify=minify,
+            )
+        with open(self.dest, encoding="utf-8") as f:
+            return f.read()
+
+    def test_base_path_change_skips_parser(self):
+        uncached = self._render("/")
+        with mock.patch.object(
+            utils, "iter_markdown_html", side_effect=AssertionError("parsed")
+        ):
+            self.assertEqual(self._render("/"), uncached)
+            self.assertEqual(
+                self._render("/site/"),
+                '<a href="/site/">Hello</a><div><h1>Hello</h1><p>See <a href="/site/">home</a>'
+                ' and <img src="/site/p.png" alt="pic" /></p></div>',
+            )
+
+    def test_minified_and_plain_entries_are_separate(self):
+        with open(self.source, "w", encoding="utf-8") as f:
+            f.write("# Hello\n\nSpaced    out")
+        plain = self._render("/")
+        minified = self._render("/", minify=True)
+        self.assertIn("Spaced    out", plain)
+        self.assertIn("Spaced out", minified)
+        self.assertEqual(self._render("/"), plain)
+        self.assertEqual(self._render("/", minify=True), minified)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+import utils
+from assets import sync_tree
+from fixtures import TempDirTestCase
+from pagecache import PageCache
+from profiler import Profiler
+
+
+class TestProfiler(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.template = os.path.join(self.root, "template.html")
+        self._write(self.template, "<title>{{ Title }}</title>{{ Content }}")
+        for i in range(3):
+            self._write(
+                os.path.join(self.content, f"page{i}.md"),
+                f"# Page {i}\n\n" + "Some **bold** text.\n\n" * (i * 20 + 1),
+            )
+
+    def _build(self, profiler, cache=None):
+        dest = os.path.join(self.root, "docs")
+        with contextlib.redirect_stdout(io.StringIO()), profiler:
+            utils.generate_pages_recursive(
+                self.content, self.template, dest, "/", cache=cache, io_threads=0
+            )
+
+    def test_records_stages_and_slowest_pages(self):
+        profiler = Profiler(top=2)
+        self._build(profiler)
+        report = profiler.report()
+        self.assertEqual(report["pages"], 3)
+        self.assertEqual(report["stages"]["generate_page"]["calls"], 3)
+        self.assertEqual(report["stages"]["markdown_to_blocks"]["calls"], 3)
+        self.assertGreater(report["stages"]["text_to_textnodes"]["calls"], 3)
+        self.assertGreater(report["stages"]["to_html"]["seconds"], 0)
+        slowest = [page["path"] for page in report["slowest_pages"]]
+        self.assertEqual(len(slowest), 2)
+        self.assertNotIn(os.path.join(self.content, "page0.md"), slowest)
+
+        stage_seconds = sum(s["seconds"] for s in report["stages"].values())
+        self.assertLessEqual(stage_seconds, report["total_seconds"])
+
+    def test_cache_hits_are_a_separate_stage(self):
+        cache = PageCache(os.path.join(self.root, "cache"))
+        self._build(Profiler(), cache)
+        profiler = Profiler()
+        self._build(profiler, cache)
+        stages = profiler.report()["stages"]
+        self.assertEqual(stages["markdown_to_blocks"]["calls"], 0)
+        self.assertEqual(stages["cache"]["calls"], 6)
+
+    def test_uninstall_restores_originals(self):
+        originals = (utils.generate_page, utils.text_to_textnodes, utils.sync_files)
+        self._build(Profiler())
+        self.assertEqual(
+            (utils.generate_page, utils.text_to_textnodes, utils.sync_files), originals
+        )
+
+    def test_static_copy_throughput(self):
+        static = os.path.join(self.root, "static")
+        self._write(os.path.join(static, "a.css"), "x" * 1000)
+        self._write(os.path.join(static, "img", "b.png"), "y" * 500)
+        profiler = Profiler()
+        with contextlib.redirect_stdout(io.StringIO()), profiler:
+            sync_tree(static, os.path.join(self.root, "docs"))
+        copy = profiler.report()["static_copy"]
+        self.assertEqual((copy["files"], copy["bytes"]), (2, 1500))
+
+    def test_report_and_summary(self):
+        profiler = Profiler()
+        self._build(profiler)
+        path = os.path.join(self.root, "out", "profile.json")
+        profiler.write_report(path)
+        with open(path, encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["pages"], 3)
+        summary = profiler.summary()
+        self.assertIn("text_to_textnodes", summary)
+        self.assertIn("Slowest pages:", summary)
+
+
+if __name__ == "__main__":
+    unittest.main()
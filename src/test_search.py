@@ -0,0 +1,169 @@
+import contextlib
+import io
+import json
+import os
+import unittest
+
+from blockcache import BlockCache
+from fixtures import TempDirTestCase
+from manifest import BuildManifest
+from search import SearchIndex, count_terms, shard_of
+from siteindex import PageInfo
+from utils import generate_pages_recursive
+
+
+PAGES = {
+    "index.md": "# Home\n\nWelcome to the [blog](/blog/post1).",
+    "blog/post1.md": (
+        "# First post\n\nSome **bold** words and a ![cat](/images/cat.png).\n\n"
+        "- one item\n- two `code` items\n\n"
+        "```\nhidden words\n```"
+    ),
+    "blog/post2.md": "# Second post\n\n> quoted words\n\n1. first\n2. second",
+}
+
+
+class TestTerms(unittest.TestCase):
+    def test_count_terms(self):
+        terms = {}
+        count_terms(terms, "The cat, the HAT; a 2nd_try Über")
+        self.assertEqual(
+            terms, {"the": 2, "cat": 1, "hat": 1, "2nd_try": 1, "über": 1}
+        )
+
+    def test_shard_of_is_fnv1a(self):
+        self.assertEqual(shard_of("a", 1 << 32), 0xE40C292C)
+        self.assertEqual(shard_of("foobar", 1 << 32), 0xBF9CF968)
+        self.assertEqual(shard_of("foobar"), 0xBF9CF968 % 64)
+
+
+class TestSearchIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self.index_path = os.path.join(self.root, "cache", "search")
+        self._write(self.template, "{{ Title }}{{ Content }}")
+        for rel_path, text in PAGES.items():
+            self._write(os.path.join(self.content, rel_path), text)
+
+    def _build(self, search_index, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_pages_recursive(
+                self.content,
+                self.template,
+                self.dest,
+                "/site/",
+                search_index=search_index,
+                **kwargs,
+            )
+
+    def _search(self, term):
+        # Look a term up the way a browser would: docs.json, then one shard
+        search_dir = os.path.join(self.dest, "search")
+        with open(os.path.join(search_dir, "docs.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        shard = shard_of(term, meta["shards"])
+        with open(os.path.join(search_dir, f"{shard}.json"), encoding="utf-8") as f:
+            flat = json.load(f).get(term, [])
+        pairs = zip(flat[::2], flat[1::2])
+        return {meta["docs"][doc][0]: count for doc, count in pairs}
+
+    def _publish(self, search_index):
+        written = search_index.publish(self.dest, "/site/")
+        search_index.save()
+        return written
+
+    def test_terms_come_from_text_nodes(self):
+        for jobs, io_threads in ((1, 0), (1, 2), (2, 0)):
+            search_index = SearchIndex(self.index_path)
+            self._build(search_index, jobs=jobs, io_threads=io_threads)
+            self._publish(search_index)
+            post1, post2 = "/site/blog/post1.html", "/site/blog/post2.html"
+            self.assertEqual(self._search("words"), {post1: 1, post2: 1})
+            self.assertEqual(self._search("bold"), {post1: 1})
+            # Inline code and image alt text are text; URLs and code blocks are not
+            self.assertEqual(self._search("code"), {post1: 1})
+            self.assertEqual(self._search("cat"), {post1: 1})
+            self.assertEqual(self._search("images"), {})
+            self.assertEqual(self._search("hidden"), {})
+            self.assertEqual(self._search("blog"), {"/site/": 1})
+
+    def test_blocks_served_from_the_block_cache_are_indexed(self):
+        block_cache = BlockCache()
+        self._build(None, block_cache=block_cache)
+        search_index = SearchIndex(self.index_path)
+        self._build(search_index, block_cache=block_cache)
+        self.assertGreater(block_cache.hits, 0)
+        self._publish(search_index)
+        self.assertEqual(self._search("quoted"), {"/site/blog/post2.html": 1})
+
+    def test_only_changed_pages_are_indexed_again(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        search_index = SearchIndex(self.index_path)
+        self._build(search_index, manifest=manifest)
+        self._publish(search_index)
+
+        search_index = SearchIndex.load(self.index_path)
+        self.assertEqual(self._build(search_index, manifest=manifest), [])
+        self.assertEqual(self._publish(search_index), 0)
+
+        post2 = os.path.join(self.content, "blog", "post2.md")
+        self._write(post2, "# Second post\n\nzebra words")
+        os.remove(os.path.join(self.content, "index.md"))
+        search_index = SearchIndex.load(self.index_path)
+        rendered = self._build(search_index, manifest=manifest)
+        self.assertEqual(rendered, [os.path.join(self.dest, "blog", "post2.html")])
+        written = self._publish(search_index)
+
+        old_terms = {"second", "post", "quoted", "words", "first", "home", "welcome"}
+        old_terms.update(("to", "the", "blog"))
+        touched = {shard_of(term) for term in old_terms | {"zebra"}}
+        # The touched shards that changed, plus docs.json
+        self.assertLessEqual(written, len(touched) + 1)
+        self.assertEqual(self._search("zebra"), {"/site/blog/post2.html": 1})
+        self.assertEqual(self._search("quoted"), {})
+        self.assertEqual(self._search("welcome"), {})
+        self.assertEqual(len(self._search("words")), 2)
+
+    def test_pages_without_postings_are_rendered(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        self._build(None, manifest=manifest)
+        search_index = SearchIndex(self.index_path)
+        self.assertEqual(len(self._build(search_index, manifest=manifest)), 3)
+        self.assertEqual(len(search_index.pages), 3)
+
+    def test_removed_doc_ids_are_reused(self):
+        search_index = SearchIndex(self.index_path)
+        for name, words in (("a", "apple"), ("b", "banana"), ("c", "cherry")):
+            info = PageInfo(collect_terms=True)
+            info.title = name
+            count_terms(info.terms, words)
+            search_index.record(os.path.join(self.dest, f"{name}.html"), name, info)
+        search_index.remove(os.path.join(self.dest, "b.html"))
+        self._publish(search_index)
+        self.assertEqual(self._search("banana"), {})
+
+        search_index = SearchIndex.load(self.index_path)
+        info = PageInfo(collect_terms=True)
+        count_terms(info.terms, "durian durian")
+        search_index.record(os.path.join(self.dest, "d.html"), "d", info)
+        self._publish(search_index)
+        self.assertEqual(search_index.pages[os.path.join(self.dest, "d.html")][0], 1)
+        self.assertEqual(self._search("durian"), {"/site/d.html": 2})
+        self.assertEqual(self._search("cherry"), {"/site/c.html": 1})
+
+    def test_a_new_index_replaces_published_shards(self):
+        search_index = SearchIndex(self.index_path)
+        self._build(search_index)
+        self._publish(search_index)
+        os.remove(os.path.join(self.content, "index.md"))
+        search_index = SearchIndex(os.path.join(self.root, "other"))
+        self._build(search_index)
+        self._publish(search_index)
+        self.assertEqual(self._search("welcome"), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
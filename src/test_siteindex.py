@@ -0,0 +1,141 @@
+import contextlib
+import io
+import os
+import unittest
+import xml.etree.ElementTree as ET
+
+from fixtures import TempDirTestCase
+from manifest import BuildManifest
+from pagecache import PageCache
+from siteindex import SiteIndex, page_url, write_feed, write_sitemap
+from utils import generate_pages_recursive
+
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+PAGES = {
+    "index.md": "# Home\n\nWelcome to the [blog](/blog/post1).",
+    "blog/post1.md": (
+        "# First post\n\nSome **bold** words and an ![image](/images/a.png).\n\n"
+        "- one item\n- two [links](/contact) here\n\n"
+        "```\ncode [not](/counted)\n```"
+    ),
+    "blog/post2.md": "# Second post\n\n> quoted text\n\n1. first\n2. second",
+}
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+SITEMAP = "{http://www.sitemaps.org/schemas/sitemap/0.9}"
+
+
+class TestSiteIndex(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.dest = os.path.join(self.root, "docs")
+        self.template = os.path.join(self.root, "template.html")
+        self._write(self.template, TEMPLATE)
+        for rel_path, text in PAGES.items():
+            self._write(os.path.join(self.content, rel_path), text)
+        self.index_path = os.path.join(self.root, "cache", "site-index.json")
+
+    def _dest(self, rel_path):
+        return os.path.join(self.dest, rel_path)
+
+    def _build(self, site_index, **kwargs):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return generate_pages_recursive(
+                self.content,
+                self.template,
+                self.dest,
+                "/site/",
+                site_index=site_index,
+                **kwargs,
+            )
+
+    def test_collects_page_metadata_while_rendering(self):
+        for jobs, io_threads in ((1, 0), (1, 2), (2, 0)):
+            site_index = SiteIndex()
+            self._build(site_index, jobs=jobs, io_threads=io_threads)
+            entry = site_index.entries[self._dest(os.path.join("blog", "post1.html"))]
+            self.assertEqual(entry["title"], "First post")
+            self.assertEqual(entry["links"], ["/contact"])
+            self.assertEqual(entry["images"], ["/images/a.png"])
+            # Heading 2, paragraph 6 and list 5 words; code is not counted
+            self.assertEqual(entry["words"], 13)
+            entry = site_index.entries[self._dest(os.path.join("blog", "post2.html"))]
+            self.assertEqual(entry["words"], 6)
+
+    def test_only_changed_pages_are_collected_again(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        site_index = SiteIndex(self.index_path)
+        self._build(site_index, manifest=manifest)
+        site_index.save()
+
+        site_index = SiteIndex.load(self.index_path)
+        self.assertEqual(self._build(site_index, manifest=manifest), [])
+
+        self._write(os.path.join(self.content, "blog", "post2.md"), "# Renamed\n")
+        os.remove(os.path.join(self.content, "index.md"))
+        rendered = self._build(site_index, manifest=manifest)
+        post2 = self._dest(os.path.join("blog", "post2.html"))
+        self.assertEqual(rendered, [post2])
+        self.assertEqual(site_index.entries[post2]["title"], "Renamed")
+        self.assertNotIn(self._dest("index.html"), site_index.entries)
+
+    def test_fresh_pages_without_an_entry_are_rendered(self):
+        manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        self._build(None, manifest=manifest)
+        site_index = SiteIndex()
+        self.assertEqual(len(self._build(site_index, manifest=manifest)), 3)
+        self.assertEqual(len(site_index.entries), 3)
+
+    def test_cached_pages_are_parsed_for_metadata(self):
+        cache = PageCache(os.path.join(self.root, "pages"))
+        self._build(None, cache=cache, io_threads=0)
+        site_index = SiteIndex()
+        self._build(site_index, cache=cache)
+        entry = site_index.entries[self._dest("index.html")]
+        self.assertEqual((entry["title"], entry["links"]), ("Home", ["/blog/post1"]))
+
+    def test_page_urls(self):
+        self.assertEqual(page_url(self._dest("index.html"), self.dest, "/"), "/")
+        self.assertEqual(
+            page_url(self._dest(os.path.join("a b", "index.html")), self.dest, "/x/"),
+            "/x/a%20b/",
+        )
+        self.assertEqual(
+            page_url(self._dest(os.path.join("blog", "p.html")), self.dest, "/x"),
+            "/x/blog/p.html",
+        )
+
+    def test_sitemap_and_feed(self):
+        site_index = SiteIndex()
+        self._build(site_index)
+        post2 = self._dest(os.path.join("blog", "post2.html"))
+        site_index.entries[post2]["updated"] += 60
+
+        write_sitemap(site_index, self.dest, "/site/", "https://example.com/")
+        urlset = ET.parse(os.path.join(self.dest, "sitemap.xml")).getroot()
+        self.assertEqual(
+            [url.find(f"{SITEMAP}loc").text for url in urlset],
+            [
+                "https://example.com/site/",
+                "https://example.com/site/blog/post1.html",
+                "https://example.com/site/blog/post2.html",
+            ],
+        )
+
+        write_feed(site_index, self.dest, "/site/", "https://example.com", 1)
+        feed = ET.parse(os.path.join(self.dest, "atom.xml")).getroot()
+        self.assertEqual(feed.find(f"{ATOM}title").text, "Home")
+        entries = feed.findall(f"{ATOM}entry")
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0].find(f"{ATOM}title").text, "Second post")
+        self.assertEqual(
+            entries[0].find(f"{ATOM}link").get("href"),
+            "https://example.com/site/blog/post2.html",
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import io
+import unittest
+
+from template import Template
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render_fills_placeholders(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>")
+        self.assertEqual(
+            template.render(Title="Hi", Content="<p>x</p>"),
+            "<title>Hi</title><main><p>x</p></main>",
+        )
+
+    def test_segments_and_slots(self):
+        template = Template('<a href="/">{{ Title }}</a>{{ Content }}', "/site/")
+        self.assertEqual(template.segments, ['<a href="/site/">', "</a>", ""])
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_base_path_rewrites_template_and_values(self):
+        template = Template('<link href="/a.css" />{{ Content }}', "/site/")
+        html = template.render(Content='<img src="/b.png" /><a href="/c">c</a>')
+        self.assertEqual(
+            html,
+            '<link href="/site/a.css" /><img src="/site/b.png" />'
+            '<a href="/site/c">c</a>',
+        )
+
+    def test_unknown_placeholder_is_kept(self):
+        template = Template("{{ Title }} {{ Other }}")
+        self.assertEqual(template.render(Title="T"), "T {{ Other }}")
+
+    def test_repeated_placeholder(self):
+        template = Template("{{ Title }}|{{ Title }}")
+        self.assertEqual(template.render(Title="T"), "T|T")
+
+    def test_minify_compacts_literal_markup_only(self):
+        template = Template(
+            "<html>\n  <body>\n    {{ Content }}\n  </body>\n</html>\n", minify=True
+        )
+        self.assertEqual(
+            template.render(Content="<p>a  b</p>"),
+            "<html><body><p>a  b</p></body></html>",
+        )
+
+    def test_write_streams_chunked_values(self):
+        template = Template('<a href="/">{{ Title }}</a>{{ Content }}', "/site/")
+        buffer = io.StringIO()
+        template.write(buffer, Title="T", Content=iter(['<a href="/x">', "x</a>"]))
+        self.assertEqual(
+            buffer.getvalue(), '<a href="/site/">T</a><a href="/site/x">x</a>'
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
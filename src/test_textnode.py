@@ -25,6 +25,19 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a link", TextType.LINK)
         self.assertNotEqual(node, node2)
 
+    def test_hashable(self):
+        node = TextNode("link", TextType.LINK, "https://example.com")
+        same = TextNode("link", TextType.LINK, "https://example.com")
+        self.assertEqual(hash(node), hash(same))
+        self.assertEqual(len({node, same, TextNode("link", TextType.PLAIN)}), 2)
+
+    def test_not_eq_other_types(self):
+        self.assertNotEqual(TextNode("x", TextType.PLAIN), "x")
+
+    def test_no_instance_dict(self):
+        with self.assertRaises(AttributeError):
+            TextNode("x", TextType.PLAIN).extra = 1
+
 
 if __name__ == "__main__":
     unittest.main()
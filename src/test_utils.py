@@ -1,5 +1,12 @@
+import io
+import random
+import re
+import textwrap
 import unittest
 
+from blocknode import BlockType, block_to_block_type
+from blockcache import BlockCache
+from htmlnode import ParentNode
 from textnode import TextNode, TextType
 from utils import (
     extract_markdown_images,
@@ -11,10 +18,81 @@ from utils import (
     text_to_textnodes,
     markdown_to_blocks,
     markdown_to_html_node,
+    iter_markdown_html,
     extract_title,
+    scan_markdown_blocks,
+    text_to_children,
 )
 
 
+def _reference_blocks(markdown):
+    # Blocks split on empty lines, with fenced code kept whole
+    block, has_content, in_fence = [], False, False
+    for line in markdown.split("\n"):
+        stripped = line.strip()
+        if in_fence:
+            block.append(line)
+            in_fence = not stripped.startswith("```")
+        elif line == "":
+            if has_content:
+                yield "\n".join(block).strip()
+                block, has_content = [], False
+        else:
+            if not has_content and stripped.startswith("```"):
+                in_fence = len(stripped) < 6 or not stripped.endswith("```")
+            block.append(line)
+            has_content = has_content or stripped != ""
+    if has_content:
+        yield "\n".join(block).strip()
+
+
+def _reference_block_html(block):
+    # Each block re-split with splitlines() and converted on its own, as
+    # markdown_to_html_node did before scan_markdown_blocks
+    block_type = block_to_block_type(block)
+    if block_type == BlockType.CODE:
+        lines = block.split("\n")[1:]
+        if lines and lines[-1].strip() == "```":
+            lines = lines[:-1]
+        code = textwrap.dedent("\n".join(lines))
+        if not code.endswith("\n"):
+            code += "\n"
+        return f"<pre><code>{code}</code></pre>"
+    lines = [line.strip() for line in block.splitlines()]
+    if block_type == BlockType.HEADING:
+        level = len(lines[0]) - len(lines[0].lstrip("#"))
+        node = ParentNode(f"h{level}", text_to_children(lines[0][level:].strip()))
+    elif block_type == BlockType.QUOTE:
+        quoted = [re.sub(r"^>\s?", "", line, count=1) for line in lines]
+        text = " ".join(line for line in quoted if line)
+        node = ParentNode("blockquote", text_to_children(text))
+    elif block_type == BlockType.UNORDERED_LIST:
+        items = [line[2:].strip() for line in lines if line.startswith("- ")]
+        node = ParentNode("ul", [ParentNode("li", text_to_children(i)) for i in items])
+    elif block_type == BlockType.ORDERED_LIST:
+        matches = [re.match(r"^(\d+)\.\s+(.*)$", line) for line in lines]
+        items = [m.group(2).strip() for m in matches if m]
+        node = ParentNode("ol", [ParentNode("li", text_to_children(i)) for i in items])
+    else:
+        text = " ".join(line for line in lines if line) if "\n" in block else block
+        node = ParentNode("p", text_to_children(text))
+    return node.to_html()
+
+
+def _reference_html(markdown):
+    try:
+        return "".join(_reference_block_html(b) for b in _reference_blocks(markdown))
+    except ValueError as e:
+        return str(e)
+
+
+def _scanned_html(markdown):
+    try:
+        return markdown_to_html_node(markdown).to_html()[len("<div>") : -len("</div>")]
+    except ValueError as e:
+        return str(e)
+
+
 class TestMain(unittest.TestCase):
     def test_text(self):
         node = TextNode("This is a text node", TextType.PLAIN)
@@ -301,6 +379,36 @@ class TestMain(unittest.TestCase):
             "<div><pre><code>This is text that _should_ remain\nthe **same** even with inline stuff\n</code></pre></div>",
         )
 
+    def test_markdown_to_blocks_keeps_fenced_blank_lines(self):
+        md = "Intro\n\n```\nfirst\n\nsecond\n```\n\nOutro"
+        self.assertEqual(
+            markdown_to_blocks(md),
+            ["Intro", "```\nfirst\n\nsecond\n```", "Outro"],
+        )
+
+    def test_codeblock_with_blank_lines(self):
+        md = """
+        ```
+        def f():
+
+            return 1
+        ```
+        """
+        html = markdown_to_html_node(md).to_html()
+        self.assertEqual(
+            html, "<div><pre><code>def f():\n\n    return 1\n</code></pre></div>"
+        )
+
+    def test_iter_markdown_html_matches_tree(self):
+        md = "# Title\n\n> quote\n\n1. one\n2. two\n\nSome **bold** text\n\n```\ncode\n```"
+        self.assertEqual(
+            "".join(iter_markdown_html(io.StringIO(md))),
+            markdown_to_html_node(md).to_html(),
+        )
+
+    def test_extract_title_from_lines(self):
+        self.assertEqual(extract_title(io.StringIO("intro\n# Title\nbody\n")), "Title")
+
     def test_extract_title_simple(self):
         self.assertEqual(extract_title("# Hello"), "Hello")
 
@@ -330,5 +438,68 @@ class TestMain(unittest.TestCase):
             extract_title(md)
 
 
+class TestScanMarkdownBlocks(unittest.TestCase):
+    def test_blocks_and_types(self):
+        md = "# Title\n\n  > quote\n> more\n\n```\na\n\nb\n```\n\n1. one\n\n- x\n\nend"
+        scanned = [
+            (block, block_type)
+            for block, block_type, _lines in scan_markdown_blocks(md.split("\n"))
+        ]
+        self.assertEqual([block for block, _ in scanned], list(_reference_blocks(md)))
+        self.assertEqual(
+            [block_type for _, block_type in scanned],
+            [
+                BlockType.HEADING,
+                BlockType.QUOTE,
+                BlockType.CODE,
+                BlockType.ORDERED_LIST,
+                BlockType.UNORDERED_LIST,
+                BlockType.PARAGRAPH,
+            ],
+        )
+
+    def test_reads_lines_lazily(self):
+        lines = iter(["# Title\n", "\n", "para one\n", "para two\n", "\n", "- x\n"])
+        blocks = scan_markdown_blocks(lines)
+        self.assertEqual(next(blocks)[0], "# Title")
+        # Only the lines needed for the first block have been consumed
+        self.assertEqual(next(lines), "para one\n")
+        self.assertEqual([block[0] for block in blocks], ["para two", "- x"])
+
+    def test_trailing_space_decides_single_line_blocks(self):
+        # "- " strips to "-", which is a paragraph, not an empty list
+        for md in ["- ", "- \nmore", "# ", "1. ", "```  ", "``` x ```"]:
+            self.assertEqual(_scanned_html(md), _reference_html(md), md)
+
+    def test_other_line_breaks_split_blocks_like_splitlines(self):
+        # Only a one-line paragraph keeps a "\r" or U+2028 inside its text
+        for md in ["# a\rb", "- x\u2028- y", "> a\x0c> b", "p\rq", "a\nb\rc"]:
+            self.assertEqual(_scanned_html(md), _reference_html(md), repr(md))
+        self.assertEqual(_scanned_html("# a\rb"), "<h1>a</h1>")
+        self.assertEqual(_scanned_html("p\rq"), "<p>p\rq</p>")
+
+    def test_block_cache_fragments_match(self):
+        md = "# Title\n\n```\ncode\n\nmore\n```\n\n1. a\n2. b\n\n> q"
+        cache = BlockCache()
+        for _ in range(2):
+            self.assertEqual(
+                "".join(iter_markdown_html(io.StringIO(md), block_cache=cache)),
+                markdown_to_html_node(md).to_html(),
+            )
+        self.assertEqual((cache.hits, cache.misses), (4, 4))
+
+    def test_matches_reference_pipeline_on_random_documents(self):
+        rng = random.Random(1234)
+        pieces = "| |\t|#|# |## |####### |>|> |-|- |1.|1. |12.\t|```|```py|x```"
+        pieces = (pieces + "|a|b c|**|_|\r|\x0c|\u2028").split("|")
+        for _ in range(5000):
+            lines = [
+                "".join(rng.choice(pieces) for _ in range(rng.randint(0, 4)))
+                for _ in range(rng.randint(1, 8))
+            ]
+            md = "\n".join(lines)
+            self.assertEqual(_scanned_html(md), _reference_html(md), repr(md))
+
+
 if __name__ == "__main__":
     unittest.main()
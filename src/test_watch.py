@@ -0,0 +1,139 @@
+import contextlib
+import gzip
+import io
+import os
+import unittest
+
+from fixtures import TempDirTestCase
+from manifest import BuildManifest
+from watch import Watcher, plan_rebuild
+
+
+class TestPlanRebuild(unittest.TestCase):
+    def test_changes_map_to_outputs(self):
+        old = {
+            "content/a.md": (1, 1),
+            "content/b.md": (1, 1),
+            "content/notes.txt": (1, 1),
+            "static/x.css": (1, 1),
+            "static/gone.png": (1, 1),
+            "template.html": (1, 1),
+        }
+        new = dict(old)
+        new["content/a.md"] = (2, 1)
+        new["content/c.md"] = (1, 1)
+        new["content/notes.txt"] = (2, 2)
+        new["static/x.css"] = (2, 1)
+        del new["content/b.md"]
+        del new["static/gone.png"]
+
+        plan = plan_rebuild(old, new, "content", "static", "template.html")
+        self.assertFalse(plan.all_pages)
+        self.assertEqual(plan.pages, ["content/a.md", "content/c.md"])
+        self.assertEqual(plan.removed_pages, ["content/b.md"])
+        self.assertEqual(plan.assets, ["static/x.css"])
+        self.assertEqual(plan.removed_assets, ["static/gone.png"])
+
+    def test_template_change_rebuilds_everything(self):
+        plan = plan_rebuild(
+            {"template.html": (1, 1)},
+            {"template.html": (2, 1)},
+            "content",
+            "static",
+            "template.html",
+        )
+        self.assertTrue(plan.all_pages)
+
+    def test_no_changes(self):
+        state = {"content/a.md": (1, 1)}
+        self.assertFalse(plan_rebuild(state, state, "content", "static", "t.html"))
+
+
+class TestWatcher(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        root = self.root
+        self.content = os.path.join(root, "content")
+        self.static = os.path.join(root, "static")
+        self.template = os.path.join(root, "template.html")
+        self.docs = os.path.join(root, "docs")
+        self._write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        self._write(os.path.join(self.content, "a.md"), "# A\n\none")
+        self._write(os.path.join(self.content, "b.md"), "# B\n\ntwo")
+        self._write(os.path.join(self.static, "site.css"), "body {}")
+        self.manifest = BuildManifest(os.path.join(root, "manifest.json"))
+        self.watcher = Watcher(
+            self.content, self.static, self.template, self.docs, "/", self.manifest
+        )
+
+    def _write(self, path, text):
+        super()._write(path, text)
+        # Force a visible mtime change even on coarse-grained filesystems
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+    def _poll_and_rebuild(self):
+        plan = self.watcher.poll(debounce=0)
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.watcher.rebuild(plan)
+        return plan
+
+    def _docs(self):
+        return sorted(
+            os.path.relpath(os.path.join(root, f), self.docs)
+            for root, _dirs, files in os.walk(self.docs)
+            for f in files
+        )
+
+    def test_markdown_edit_renders_single_page(self):
+        self._write(os.path.join(self.content, "a.md"), "# A\n\nedited")
+        plan = self._poll_and_rebuild()
+        self.assertEqual(plan.pages, [os.path.join(self.content, "a.md")])
+        self.assertEqual(self._docs(), ["a.html"])
+        self.assertIn(os.path.join(self.docs, "a.html"), self.manifest.entries)
+        self.assertIsNone(self.watcher.poll(debounce=0))
+
+    def test_template_edit_renders_all_pages(self):
+        self._write(self.template, "<h2>{{ Title }}</h2>{{ Content }}")
+        self._poll_and_rebuild()
+        self.assertEqual(self._docs(), ["a.html", "b.html"])
+
+    def test_static_change_copies_single_file(self):
+        self._write(os.path.join(self.static, "img", "new.png"), "png")
+        self._poll_and_rebuild()
+        self.assertEqual(self._docs(), [os.path.join("img", "new.png")])
+
+    def test_removed_page_deletes_output(self):
+        self._write(os.path.join(self.content, "b.md"), "# B\n\nedited")
+        self._poll_and_rebuild()
+        os.remove(os.path.join(self.content, "b.md"))
+        self._poll_and_rebuild()
+        self.assertEqual(self._docs(), [])
+
+    def test_removed_outputs_leave_no_empty_directories(self):
+        self.watcher.compress = True
+        self.watcher.compress_workers = 1
+        page = os.path.join(self.content, "new", "index.md")
+        asset = os.path.join(self.static, "img", "new.css")
+        self._write(page, "# New")
+        self._write(asset, "body {}" * 100)
+        self._poll_and_rebuild()
+        self.assertIn(os.path.join("new", "index.html.gz"), self._docs())
+        os.remove(page)
+        os.remove(asset)
+        self._poll_and_rebuild()
+        self.assertEqual(os.listdir(self.docs), [])
+
+    def test_compressed_copies_follow_edits(self):
+        self.watcher.compress = True
+        self.watcher.compress_workers = 1
+        self._write(os.path.join(self.content, "a.md"), "# A\n\nfirst")
+        self._poll_and_rebuild()
+        self._write(os.path.join(self.content, "a.md"), "# A\n\nsecond")
+        self._poll_and_rebuild()
+        with gzip.open(os.path.join(self.docs, "a.html.gz"), "rt") as f:
+            self.assertIn("second", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
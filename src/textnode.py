@@ -11,19 +11,26 @@ class TextType(Enum):
 
 
 class TextNode:
+    # Pages create huge numbers of nodes; slots drop the per-instance __dict__
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text, text_type, url=None):
         self.text = text
         self.text_type = text_type
         self.url = url
 
     def __eq__(self, value):
-        if (
-            value.text == self.text
-            and value.text_type == self.text_type
-            and value.url == self.url
-        ):
-            return True
-        return False
+        if not isinstance(value, TextNode):
+            return NotImplemented
+        # TextType members are singletons, so identity is enough for the type
+        return (
+            self.text_type is value.text_type
+            and self.text == value.text
+            and self.url == value.url
+        )
+
+    def __hash__(self):
+        return hash((self.text, self.text_type, self.url))
 
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
@@ -1,10 +1,28 @@
 from htmlnode import LeafNode, ParentNode
 from textnode import TextType, TextNode
-from blocknode import BlockType, block_to_block_type
+from blocknode import HEADING_PREFIXES, BlockType
+from manifest import hash_file
+from assets import DEFAULT_COPY_WORKERS, sync_files
+from buildlog import log
+from discovery import DirectoryIndex
+from linkcheck import BrokenLinksError
+from output import AtomicOutput, prepare_output_dirs
+from search import count_terms
+from siteindex import PageInfo
+from template import Template
+from inline import scan_inline
 import re
 import textwrap
 import os
 import shutil
+import traceback
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+
+_IMAGE_RE = re.compile(r"!\[([^\[\]]*)\]\(([^\(\)]*)\)")
+_LINK_RE = re.compile(r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)")
 
 
 def text_node_to_html_node(text_node):
@@ -49,15 +67,11 @@ def split_nodes_delimiter(old_nodes, delimiter, text_type):
 
 
 def extract_markdown_images(text):
-    pattern = r"!\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return _IMAGE_RE.findall(text)
 
 
 def extract_markdown_links(text):
-    pattern = r"(?<!!)\[([^\[\]]*)\]\(([^\(\)]*)\)"
-    matches = re.findall(pattern, text)
-    return matches
+    return _LINK_RE.findall(text)
 
 
 def split_nodes_image(old_nodes):
@@ -115,6 +129,12 @@ def split_nodes_link(old_nodes):
 
 
 def text_to_textnodes(text):
+    return scan_inline(text)
+
+
+def _text_to_textnodes_split(text):
+    # The original five-pass pipeline that scan_inline replaces; kept as the
+    # reference for equivalence tests and bench_inline.py
     nodes = [TextNode(text, TextType.PLAIN)]
     nodes = split_nodes_image(nodes)
     nodes = split_nodes_link(nodes)
@@ -125,131 +145,284 @@ def text_to_textnodes(text):
 
 
 def markdown_to_blocks(markdown):
-    return [y for y in ([x.strip() for x in markdown.split("\n\n")]) if y != ""]
+    blocks = scan_markdown_blocks(markdown.split("\n"))
+    return [block for block, _block_type, _lines in blocks]
+
+
+# Helper to convert inline markdown text into HTMLNode children
+def text_to_children(text):
+    return [text_node_to_html_node(n) for n in text_to_textnodes(text)]
+
+
+def _code_lines_to_node(lines):
+    # lines follow the opening fence; the last one is right-stripped
+    # Remove closing fence line
+    if lines and lines[-1].strip() == "```":
+        lines = lines[:-1]
+    # Dedent common leading whitespace introduced by triple-quoted formatting
+    code_body = "\n".join(lines)
+    code_body = textwrap.dedent(code_body)
+    # Ensure trailing newline as per expected output
+    if not code_body.endswith("\n"):
+        code_body += "\n"
+    return ParentNode("pre", [LeafNode("code", code_body)])
+
+
+# Bound once, as in inline.py; the scanner compares block types per block
+_HEADING = BlockType.HEADING
+_QUOTE = BlockType.QUOTE
+_UNORDERED_LIST = BlockType.UNORDERED_LIST
+_ORDERED_LIST = BlockType.ORDERED_LIST
+_CODE = BlockType.CODE
+_PARAGRAPH = BlockType.PARAGRAPH
+
+
+def _scanned_block(lines, stripped_lines, broken):
+    # Trailing blank lines (possible after a fence) are stripped from a block
+    while not stripped_lines[-1]:
+        lines.pop()
+        stripped_lines.pop()
+    block = "\n".join(lines).strip()
+
+    # Same decision as block_to_block_type(block), made on the first and last
+    # lines only; the first line keeps its trailing space unless it is the last
+    first = stripped_lines[0] if len(lines) == 1 else lines[0].lstrip()
+    head = first[0]
+    block_type = _PARAGRAPH
+    if head == "#":
+        if first.startswith(HEADING_PREFIXES):
+            block_type = _HEADING
+    elif head == ">":
+        block_type = _QUOTE
+    elif head == "-":
+        if first.startswith("- "):
+            block_type = _UNORDERED_LIST
+    elif head == "`":
+        if first.startswith("```") and stripped_lines[-1].endswith("```"):
+            # Code is rendered from the raw lines after the opening fence
+            code_lines = lines[1:]
+            if code_lines:
+                code_lines[-1] = code_lines[-1].rstrip()
+            return block, _CODE, code_lines
+    elif head.isdecimal():
+        number, dot, rest = first.partition(".")
+        if dot and number.isdecimal() and rest[:1] == " ":
+            block_type = _ORDERED_LIST
+    # Markdown lines are split at "\n" only, while str.splitlines() also breaks
+    # at "\r", "\f", U+2028 and the like. Where a line holds one of those, the
+    # block is split again with splitlines(), except a one-line paragraph,
+    # which is rendered whole.
+    if broken and (len(lines) > 1 or block_type is not _PARAGRAPH):
+        stripped_lines = [s.strip() for s in block.splitlines()]
+    return block, block_type, stripped_lines
+
+
+def scan_markdown_blocks(lines):
+    """Split and classify a markdown document in a single pass over its lines.
+
+    - Yields (block, block_type, lines): block is the block's stripped text,
+      block_type what block_to_block_type(block) returns, and lines the
+      stripped lines block_lines_to_html_node builds the block from
+    - Blocks are separated by empty lines, exactly like splitting on "\n\n"
+    - A block opening with a ``` fence runs until the closing fence, so code
+      containing blank lines stays in one block
+    - Each line is stripped once, as it is read, so no block is split or
+      scanned again; only lines that are not all printable are checked for
+      the other line breaks str.splitlines() honours
+    - Only the current block is held in memory
+    """
+    block_lines = []
+    stripped_lines = []
+    broken = False
+    in_fence = False
+    for line in lines:
+        if line.endswith("\n"):
+            line = line[:-1]
+        stripped = line.strip()
+        if in_fence:
+            if stripped.startswith("```"):
+                in_fence = False
+        elif not block_lines:
+            # Blank lines before a block's first line are stripped away
+            if not stripped:
+                continue
+            if stripped.startswith("```"):
+                # A fence that also closes on its first line is a one-line block
+                in_fence = len(stripped) < 6 or not stripped.endswith("```")
+        elif line == "":
+            yield _scanned_block(block_lines, stripped_lines, broken)
+            block_lines = []
+            stripped_lines = []
+            broken = False
+            continue
+        if not stripped.isprintable() and len(stripped.splitlines()) > 1:
+            broken = True
+        block_lines.append(line)
+        stripped_lines.append(stripped)
+    if block_lines:
+        yield _scanned_block(block_lines, stripped_lines, broken)
 
 
-def markdown_to_html_node(markdown):
-    # Helper to convert inline markdown text into HTMLNode children
-    def text_to_children(text):
-        return [text_node_to_html_node(n) for n in text_to_textnodes(text)]
+def _inline_texts(block_type, lines):
+    """Return the inline markdown of each element of a scanned block.
 
-    # Helper to process heading blocks
-    def heading_block_to_node(block):
-        first_line = block.splitlines()[0].strip()
+    One text for a paragraph, heading or quote, one per list item, and none
+    for code. lines are the stripped lines from scan_markdown_blocks.
+    """
+    if block_type is _PARAGRAPH:
+        return [lines[0] if len(lines) == 1 else " ".join([s for s in lines if s])]
+    if block_type is _HEADING:
+        # A heading has at most six '#'s, all followed by whitespace
+        return [lines[0].lstrip("#").strip()]
+    if block_type is _CODE:
+        return []
+    if block_type is _QUOTE:
+        quoted = []
+        for s in lines:
+            # Remove leading '>' and one optional whitespace character
+            if s[:1] == ">":
+                s = s[2:] if s[1:2].isspace() else s[1:]
+            if s:
+                quoted.append(s)
+        return [" ".join(quoted)]
+
+    # Lines are stripped already, so item text only needs its left side trimmed
+    if block_type is _UNORDERED_LIST:
+        return [s[2:].lstrip() for s in lines if s.startswith("- ")]
+    texts = []
+    for s in lines:
+        number, dot, text = s.partition(".")
+        if dot and number.isdecimal() and text[:1].isspace():
+            texts.append(text.lstrip())
+    return texts
+
+
+def block_lines_to_html_node(block, block_type, lines, text_nodes=None):
+    """Build the HTMLNode for a block yielded by scan_markdown_blocks.
+
+    Works from the lines the scanner already stripped, so the block text is
+    not split again. text_nodes, if given, holds the text_to_textnodes
+    output of each of the block's _inline_texts, which are then not parsed
+    again.
+    """
+    if block_type is _CODE:
+        return _code_lines_to_node(lines)
+    if text_nodes is None:
+        children = [text_to_children(text) for text in _inline_texts(block_type, lines)]
+    else:
+        children = [[text_node_to_html_node(n) for n in nodes] for nodes in text_nodes]
+    if block_type is _PARAGRAPH:
+        return ParentNode("p", children[0])
+    if block_type is _HEADING:
+        first_line = lines[0]
         level = len(first_line) - len(first_line.lstrip("#"))
-        level = min(max(level, 1), 6)
-        text = first_line[level:].strip()
-        return ParentNode(f"h{level}", text_to_children(text))
-
-    # Helper to process paragraph blocks (merge lines with spaces)
-    def paragraph_block_to_node(block):
-        text = (
-            " ".join(
-                [line.strip() for line in block.splitlines() if line.strip() != ""]
-            )
-            if "\n" in block
-            else block.strip()
-        )
-        return ParentNode("p", text_to_children(text))
-
-    # Helper to process blockquote blocks (strip leading ">" per line)
-    def quote_block_to_node(block):
-        lines = []
-        for line in block.splitlines():
-            # Remove leading '>' and optional space
-            stripped = re.sub(r"^>\s?", "", line.strip())
-            if stripped != "":
-                lines.append(stripped)
-        text = " ".join(lines)
-        return ParentNode("blockquote", text_to_children(text))
-
-    # Helper to process unordered list blocks
-    def ul_block_to_node(block):
-        items = []
-        for line in block.splitlines():
-            s = line.strip()
-            if not s:
-                continue
-            if s.startswith("- "):
-                item_text = s[2:].strip()
-                items.append(ParentNode("li", text_to_children(item_text)))
-        return ParentNode("ul", items)
-
-    # Helper to process ordered list blocks
-    def ol_block_to_node(block):
-        items = []
-        for line in block.splitlines():
-            s = line.strip()
-            if not s:
-                continue
-            m = re.match(r"^(\d+)\.\s+(.*)$", s)
-            if m:
-                item_text = m.group(2).strip()
-                items.append(ParentNode("li", text_to_children(item_text)))
-        return ParentNode("ol", items)
-
-    # Helper to process code blocks (no inline parsing)
-    def code_block_to_node(block):
-        # Normalize block and remove opening/closing fences
-        content = block.strip()
-        lines = content.split("\n")
-        # Remove opening fence line
-        if lines and lines[0].startswith("```"):
-            lines = lines[1:]
-        # Remove closing fence line
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        # Dedent common leading whitespace introduced by triple-quoted formatting
-        code_body = "\n".join(lines)
-        code_body = textwrap.dedent(code_body)
-        # Ensure trailing newline as per expected output
-        if not code_body.endswith("\n"):
-            code_body += "\n"
-        return ParentNode("pre", [LeafNode("code", code_body)])
-
-    blocks = markdown_to_blocks(markdown)
-    children = []
-    for block in blocks:
-        btype = block_to_block_type(block)
-        if btype == BlockType.HEADING:
-            children.append(heading_block_to_node(block))
-        elif btype == BlockType.QUOTE:
-            children.append(quote_block_to_node(block))
-        elif btype == BlockType.UNORDERED_LIST:
-            children.append(ul_block_to_node(block))
-        elif btype == BlockType.ORDERED_LIST:
-            children.append(ol_block_to_node(block))
-        elif btype == BlockType.CODE:
-            children.append(code_block_to_node(block))
+        return ParentNode(f"h{level}", children[0])
+    if block_type is _QUOTE:
+        return ParentNode("blockquote", children[0])
+    items = [ParentNode("li", item) for item in children]
+    return ParentNode("ul" if block_type is _UNORDERED_LIST else "ol", items)
+
+
+def markdown_to_html_node(markdown):
+    blocks = scan_markdown_blocks(markdown.split("\n"))
+    return ParentNode("div", [block_lines_to_html_node(*block) for block in blocks])
+
+
+def _block_word_count(block, block_type, lines):
+    words = len(block.split())
+    if block_type is _PARAGRAPH:
+        return words
+    if block_type is _HEADING:
+        # Only the first line is rendered; its '#' marker is not a word
+        return len(lines[0].split()) - 1
+    # Count quote and list text without the marker in front of each line
+    for s in lines:
+        marker = s.split(None, 1)[0] if s else ""
+        if marker in ("-", ">") or (marker.endswith(".") and marker[:-1].isdecimal()):
+            words -= 1
+    return words
+
+
+def _collect_block_info(page_info, block, block_type, lines):
+    # Code is neither prose nor markup, so it adds no words, links or images
+    if block_type is _CODE:
+        return None
+    page_info.words += _block_word_count(block, block_type, lines)
+    if "](" in block:
+        page_info.images.extend(url for _alt, url in extract_markdown_images(block))
+        page_info.links.extend(url for _text, url in extract_markdown_links(block))
+    terms = page_info.terms
+    if terms is None:
+        return None
+    # Search terms come from the text of the parsed inline nodes, so markup
+    # and URLs are left out; the nodes are handed on to build the block
+    text_nodes = [text_to_textnodes(text) for text in _inline_texts(block_type, lines)]
+    for nodes in text_nodes:
+        for node in nodes:
+            count_terms(terms, node.text)
+    return text_nodes
+
+
+def iter_markdown_html(lines, minify=False, block_cache=None, page_info=None):
+    """Yield the HTML of a markdown document block by block.
+
+    Produces the same output as markdown_to_html_node(...).to_html(minify),
+    but only one block and its HTMLNode tree are alive at any time. With a
+    BlockCache, blocks rendered before (in this page or any other) are not
+    parsed again; each is yielded as one fragment. With a PageInfo, the
+    word count, links and images of every block are added to it as the
+    block goes by, as are its search terms if the PageInfo collects them.
+    """
+    yield "<div>"
+    for block, block_type, block_lines in scan_markdown_blocks(lines):
+        text_nodes = None
+        if page_info is not None:
+            text_nodes = _collect_block_info(page_info, block, block_type, block_lines)
+        if block_cache is None:
+            node = block_lines_to_html_node(block, block_type, block_lines, text_nodes)
+            yield from node.iter_html(minify)
         else:
-            children.append(paragraph_block_to_node(block))
 
-    return ParentNode("div", children)
+            def render(block, minify):
+                node = block_lines_to_html_node(
+                    block, block_type, block_lines, text_nodes
+                )
+                return node.to_html(minify)
+
+            yield block_cache.fragment(block, minify, render)
+    yield "</div>"
 
 
-def _copy_dir_contents(src_dir, dst_dir):
+def _copy_dir_contents(src_dir, dst_dir, workers=DEFAULT_COPY_WORKERS):
     """Recursively copy contents of src_dir into dst_dir.
 
-    Assumes dst_dir already exists. Logs each file copied.
+    Assumes dst_dir already exists. Creates every subdirectory up front, then
+    copies the files on a pool of `workers` threads. Logs each file copied
+    when the build log is verbose.
     """
-    for entry in os.listdir(src_dir):
-        src_path = os.path.join(src_dir, entry)
-        dst_path = os.path.join(dst_dir, entry)
-        if os.path.isdir(src_path):
-            os.makedirs(dst_path, exist_ok=True)
-            _copy_dir_contents(src_path, dst_path)
-        else:
-            # Copy file and preserve metadata
-            shutil.copy2(src_path, dst_path)
-            print(f"Copied {src_path} -> {dst_path}")
+    pairs = []
+    for root, dirs, files in os.walk(src_dir, followlinks=True):
+        rel_dir = os.path.relpath(root, src_dir)
+        dst_root = dst_dir if rel_dir == "." else os.path.join(dst_dir, rel_dir)
+        for dirname in dirs:
+            os.makedirs(os.path.join(dst_root, dirname), exist_ok=True)
+        for filename in files:
+            src_path = os.path.join(root, filename)
+            pairs.append((src_path, os.path.join(dst_root, filename)))
 
+    sync_files(pairs, "copy", workers)
+    log.count("files", len(pairs))
+    if log.verbose:
+        for src_path, dst_path in pairs:
+            log.detail(f"Copied {src_path} -> {dst_path}")
 
-def copy_tree_clean(src_dir, dst_dir):
+
+def copy_tree_clean(src_dir, dst_dir, workers=DEFAULT_COPY_WORKERS):
     """Delete dst_dir (if exists) and copy entire src_dir tree into it.
 
     - Removes the destination directory to ensure a clean copy
-    - Recursively copies files and subdirectories
-    - Logs each copied file path
+    - Recursively copies files and subdirectories on a thread pool
+    - Logs each copied file path (verbose only)
     """
     if not os.path.exists(src_dir):
         raise FileNotFoundError(f"Source directory does not exist: {src_dir}")
@@ -258,7 +431,7 @@ def copy_tree_clean(src_dir, dst_dir):
         shutil.rmtree(dst_dir)
     os.makedirs(dst_dir, exist_ok=True)
 
-    _copy_dir_contents(src_dir, dst_dir)
+    _copy_dir_contents(src_dir, dst_dir, workers)
 
 
 def extract_title(markdown):
@@ -266,74 +439,527 @@ def extract_title(markdown):
 
     Returns the stripped title text. Raises a ValueError if no H1 exists.
     Leading whitespace on each line is ignored, so indented H1s are supported.
+    markdown may also be an iterable of lines, such as an open file; reading
+    stops at the title.
     """
-    for line in markdown.splitlines():
+    lines = markdown.splitlines() if isinstance(markdown, str) else markdown
+    for line in lines:
         s = line.strip()
         if s.startswith("# "):
             return s[2:].strip()
     raise ValueError("No H1 title ('# ') found in markdown")
 
 
-def generate_page(from_path, template_path, dest_path, base_path):
+def _write_page(dest_path, template, title, content):
+    # Stream the filled template into dest_path, never leaving a partial page
+    with AtomicOutput(dest_path) as out:
+        template.write(out, Title=title, Content=content)
+
+
+def _cache_variant(minify):
+    # Minified content must never be served to a normal build, or vice versa
+    return "min" if minify else None
+
+
+def generate_page(
+    from_path,
+    template_path,
+    dest_path,
+    base_path,
+    template=None,
+    cache=None,
+    source_hash=None,
+    minify=False,
+    block_cache=None,
+    page_info=None,
+):
     """Generate a full HTML page from a markdown file and an HTML template.
 
-    - Logs the operation
-    - Converts markdown to HTML using markdown_to_html_node().to_html()
     - Extracts title using extract_title()
-    - Replaces {{ Title }} and {{ Content }} in the template
-    - Writes output to dest_path, creating directories as needed
+    - Fills {{ Title }} and {{ Content }} using a compiled Template; pass one in
+      as template to avoid re-reading template_path for every page
+    - Reads, converts and writes the markdown block by block, so memory use
+      stays bounded no matter how large the page is
+    - With a PageCache, reuses the converted content and title of an identical
+      source (by source_hash, computed if not given) instead of parsing, and
+      stores them after a fresh conversion
+    - With minify=True, collapses whitespace while serialising the content
+      (<pre>/<code> excepted); pass a template compiled with minify=True too
+    - With a BlockCache, only blocks not seen before are parsed and rendered
+    - With a PageInfo, fills it with the page's title and metadata as the
+      page renders; the page cache is not read then, since cached content
+      carries no metadata
+    - Writes through AtomicOutput: the page is replaced atomically, left
+      untouched (mtime included) if its bytes are unchanged, and an old page
+      survives a failed render
     """
-    print(f"Generating page from {from_path} to {dest_path} using {template_path}")
-
+    if template is None:
+        template = Template.from_file(template_path, base_path, minify)
+
+    variant = _cache_variant(minify)
+    if cache is not None and source_hash is None:
+        source_hash = hash_file(from_path)
+    if cache is not None and page_info is None:
+        cached = cache.load(source_hash, variant)
+        if cached is not None:
+            with cached:
+                _write_page(dest_path, template, cached.title, cached.iter_content())
+            return
+
+    # The title is needed before any content is written, so find it first
     with open(from_path, "r", encoding="utf-8") as f:
-        md = f.read()
-    with open(template_path, "r", encoding="utf-8") as f:
-        template = f.read()
-
-    html_node = markdown_to_html_node(md)
-    content_html = html_node.to_html()
-    title = extract_title(md)
-
-    full_html = (
-        template.replace("{{ Title }}", title)
-        .replace("{{ Content }}", content_html)
-        .replace('href="/', f'href="{base_path}')
-        .replace('src="/', f'src="{base_path}')
-    )
+        title = extract_title(f)
+    if page_info is not None:
+        page_info.title = title
+
+    try:
+        with open(from_path, "r", encoding="utf-8") as src:
+            content = iter_markdown_html(src, minify, block_cache, page_info)
+            if cache is None:
+                _write_page(dest_path, template, title, content)
+                return
+            with cache.store(source_hash, title, variant) as entry:
+                _write_page(dest_path, template, title, entry.tee(content))
+    finally:
+        if block_cache is not None:
+            block_cache.flush()
+
+
+class PageGenerationError(Exception):
+    """Raised after a build when one or more pages failed to render.
+
+    failures is a list of (from_path, message) pairs, one per failed page.
+    """
+
+    def __init__(self, failures):
+        self.failures = failures
+        lines = [f"{len(failures)} page(s) failed to generate:"]
+        lines.extend(f"  {path}: {message}" for path, message in failures)
+        super().__init__("\n".join(lines))
+
+
+def page_dest_path(from_path, dir_path_content, dest_dir_path):
+    """Return the .html output path for a markdown file under dir_path_content."""
+    rel_path = os.path.relpath(from_path, dir_path_content)
+    return os.path.join(dest_dir_path, os.path.splitext(rel_path)[0] + ".html")
+
 
-    dest_dir = os.path.dirname(dest_path)
-    if dest_dir:
-        os.makedirs(dest_dir, exist_ok=True)
-    with open(dest_path, "w", encoding="utf-8") as f:
-        f.write(full_html)
+def _find_markdown_pages(dir_path_content, dest_dir_path, index):
+    """Return sorted (from_path, dest_path, rel_path) for every .md file.
 
+    index is the DirectoryIndex to list the tree with; rel_path is the
+    source's path relative to dir_path_content, as the index knows it.
+    """
+    pages = []
+    for rel_path in index.scan(dir_path_content):
+        # Replace .md with .html for output filename
+        dest_rel_path = os.path.splitext(rel_path)[0] + ".html"
+        pages.append(
+            (
+                os.path.join(dir_path_content, rel_path),
+                os.path.join(dest_dir_path, dest_rel_path),
+                rel_path,
+            )
+        )
+    return pages
+
+
+# The arguments of generate_page for one page of a build, in its order
+PageJob = namedtuple(
+    "PageJob",
+    [
+        "from_path",
+        "template_path",
+        "dest_path",
+        "base_path",
+        "template",
+        "cache",
+        "source_hash",
+        "minify",
+        "block_cache",
+        "page_info",
+    ],
+)
+
+
+def _format_error(e):
+    return "".join(traceback.format_exception_only(type(e), e)).strip()
+
+
+def _generate_page_job(job):
+    """Render one PageJob, returning (error, page_info, block_counts).
+
+    error is None on success or an error message. Runs inside pool workers,
+    so errors are reported back as strings instead of being raised across
+    the process boundary. The job's PageInfo (filled in the worker's copy)
+    is sent back with it, and so are the (hits, disk_hits, misses) its
+    BlockCache counted for this page, or None without one.
+    """
+    block_cache = job.block_cache
+    before = block_cache.counts() if block_cache is not None else None
+    error = None
+    try:
+        generate_page(*job)
+    except Exception as e:
+        error = _format_error(e)
+    if before is None:
+        return error, job.page_info, None
+    after = block_cache.counts()
+    return error, job.page_info, tuple(a - b for a, b in zip(after, before))
+
+
+# Pages read ahead of rendering, and rendered pages waiting to be written
+DEFAULT_PIPELINE_DEPTH = 8
+DEFAULT_IO_THREADS = 4
+
+# Larger sources skip the pipeline and stream through generate_page instead,
+# so a huge page is never held in memory whole
+_PIPELINE_MAX_SOURCE_BYTES = 8 * 1024 * 1024
+
+
+def _read_page_source(from_path, cache, source_hash, minify):
+    """Fetch a page's input on an I/O thread.
 
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, base_path):
+    Returns (title, content, None) for a cache hit, (None, None, markdown)
+    otherwise, or None if the source is too large to read whole.
+    """
+    if cache is not None:
+        if source_hash is None:
+            source_hash = hash_file(from_path)
+        cached = cache.load(source_hash, _cache_variant(minify))
+        if cached is not None:
+            with cached:
+                return cached.title, "".join(cached.iter_content()), None
+    if os.path.getsize(from_path) > _PIPELINE_MAX_SOURCE_BYTES:
+        return None
+    with open(from_path, "r", encoding="utf-8") as f:
+        return None, None, f.read()
+
+
+def _render_page_source(job, source):
+    """Render a PageJob from _read_page_source's result, as generate_page would."""
+    template = job.template
+    if template is None:
+        template = Template.from_file(job.template_path, job.base_path, job.minify)
+    title, content, markdown = source
+    if markdown is None:
+        return template.render(Title=title, Content=content)
+
+    cache, block_cache, page_info = job.cache, job.block_cache, job.page_info
+    lines = markdown.split("\n")
+    title = extract_title(lines)
+    if page_info is not None:
+        page_info.title = title
+    content = iter_markdown_html(lines, job.minify, block_cache, page_info)
+    try:
+        if cache is None:
+            return template.render(Title=title, Content=content)
+        source_hash = job.source_hash
+        if source_hash is None:
+            source_hash = hash_file(job.from_path)
+        with cache.store(source_hash, title, _cache_variant(job.minify)) as entry:
+            return template.render(Title=title, Content=entry.tee(content))
+    finally:
+        if block_cache is not None:
+            block_cache.flush()
+
+
+def _write_page_html(dest_path, html):
+    with AtomicOutput(dest_path) as out:
+        out.write(html)
+
+
+def _render_pages_pipelined(
+    jobs, io_threads, depth=DEFAULT_PIPELINE_DEPTH, on_result=None
+):
+    """Render every job in this process, overlapping file I/O with rendering.
+
+    - Sources are read up to depth pages ahead on io_threads threads while
+      the current page renders, and rendered pages are written on the same
+      threads while the next one renders
+    - At most depth reads and depth writes are in flight, so memory use stays
+      bounded however many pages there are
+    - A page is finished once it is written (or has failed); on_result is
+      called for it then, as in _render_pages
+    - Returns (error, page_info) pairs in job order, like _render_pages
+    """
+    errors = [None] * len(jobs)
+
+    def finish(index, error=None):
+        errors[index] = error
+        if on_result is not None:
+            on_result(index, error, jobs[index].page_info)
+
+    def finish_write(index, future):
+        try:
+            future.result()
+        except Exception as e:
+            finish(index, _format_error(e))
+        else:
+            finish(index)
+
+    with ThreadPoolExecutor(max_workers=io_threads) as executor:
+
+        def read(index, job):
+            # Collecting metadata needs the markdown, not cached content
+            cache = job.cache if job.page_info is None else None
+            future = executor.submit(
+                _read_page_source, job.from_path, cache, job.source_hash, job.minify
+            )
+            return index, job, future
+
+        upcoming = enumerate(jobs)
+        reads = deque(read(index, job) for index, job in islice(upcoming, depth))
+        writes = deque()
+        while reads:
+            index, job, future = reads.popleft()
+            for next_index, next_job in islice(upcoming, 1):
+                reads.append(read(next_index, next_job))
+            try:
+                source = future.result()
+                if source is None:
+                    generate_page(*job)
+                    finish(index)
+                    continue
+                html = _render_page_source(job, source)
+            except Exception as e:
+                finish(index, _format_error(e))
+                continue
+            write = executor.submit(_write_page_html, job.dest_path, html)
+            writes.append((index, write))
+            # Backpressure: wait for the oldest write before rendering more
+            while len(writes) > depth:
+                finish_write(*writes.popleft())
+        for index, future in writes:
+            finish_write(index, future)
+    return [(error, job.page_info) for error, job in zip(errors, jobs)]
+
+
+def _render_pages(jobs, workers, io_threads=0, on_result=None):
+    """Run _generate_page_job for every job; return (error, page_info) in job order.
+
+    - A serial build with io_threads > 0 overlaps reading and writing pages
+      with rendering (see _render_pages_pipelined)
+    - on_result, if given, is called with (index, error, page_info) as each
+      page finishes, while later pages are still rendering; a process pool
+      reports pages in job order as their chunks complete
+    - Block cache lookups made by pool workers are added to the counts of
+      the jobs' BlockCache
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        if io_threads > 0 and len(jobs) > 1:
+            return _render_pages_pipelined(jobs, io_threads, on_result=on_result)
+        results = map(_generate_page_job, jobs)
+        executor = None
+    else:
+        workers = min(workers, len(jobs))
+        # A few chunks per worker keeps IPC overhead low while still balancing load
+        chunksize = max(1, len(jobs) // (workers * 4))
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_generate_page_job, jobs, chunksize=chunksize)
+    pairs = []
+    try:
+        for index, (error, page_info, block_counts) in enumerate(results):
+            if block_counts is not None and executor is not None:
+                # Workers counted on their own copies of the cache
+                jobs[index].block_cache.add_counts(*block_counts)
+            if on_result is not None:
+                on_result(index, error, page_info)
+            pairs.append((error, page_info))
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    return pairs
+
+
+def new_page_info(dest_path, source_hash, site_index=None, search_index=None):
+    """Return a PageInfo to collect while rendering dest_path, or None.
+
+    Only the indexes whose record of the page is not current need it; terms
+    are counted only if the SearchIndex is one of them.
+    """
+    stale_site = site_index is not None and not site_index.is_current(
+        dest_path, source_hash
+    )
+    stale_search = search_index is not None and not search_index.is_current(
+        dest_path, source_hash
+    )
+    if stale_site or stale_search:
+        return PageInfo(collect_terms=stale_search)
+    return None
+
+
+def generate_pages_recursive(
+    dir_path_content,
+    template_path,
+    dest_dir_path,
+    base_path,
+    manifest=None,
+    jobs=1,
+    cache=None,
+    io_threads=DEFAULT_IO_THREADS,
+    index=None,
+    minify=False,
+    block_cache=None,
+    site_index=None,
+    link_checker=None,
+    search_index=None,
+):
     """Recursively generate HTML pages for all markdown files under a directory.
 
-    - Walks the dir_path_content tree
+    - Walks the dir_path_content tree; with a DirectoryIndex, only directories
+      changed since the index was last saved are listed again, and only
+      sources whose size or mtime changed are hashed again
     - For every .md file, renders it using the shared template
     - Writes output into dest_dir_path, preserving the relative directory structure
       and replacing the .md extension with .html
+    - With a BuildManifest, skips pages whose source, template, base_path and
+      minify setting are unchanged since the last build, and deletes outputs
+      whose source was removed
+    - With minify=True, strips insignificant whitespace from the template and
+      the rendered content
+    - With a BlockCache, re-renders only the blocks of a page that changed
+    - With a SiteIndex, collects the metadata of every page whose source
+      changed while it renders (pages without a current entry are rendered
+      even if the manifest says they are fresh), and drops the entries of
+      removed pages
+    - With a LinkChecker (which needs a SiteIndex), checks the links and
+      images of every page against the outputs: pages with a current entry
+      are checked on the checker's thread while the others render, and those
+      as they finish. Raises BrokenLinksError if any target is missing
+    - With a SearchIndex, likewise tokenizes only the pages whose source
+      changed (or that it has no postings for) while they render, replaces
+      their postings, and drops the postings of removed pages
+    - With jobs > 1, renders pages on a process pool of that many workers;
+      otherwise, with io_threads > 0, reads and writes pages on that many
+      threads so disk latency overlaps with rendering
+    - With a PageCache, reuses previously converted content of unchanged
+      sources, then evicts old entries once the build is done
+    - Collects per-page errors and raises PageGenerationError once all pages
+      have been attempted
+    - Logs each rendered page (verbose only) and adds the page counts to the
+      build log's totals
+    - Returns the list of output paths that were (re)rendered
     """
     if not os.path.isdir(dir_path_content):
         raise FileNotFoundError(f"Content directory does not exist: {dir_path_content}")
     if not os.path.isfile(template_path):
         raise FileNotFoundError(f"Template file does not exist: {template_path}")
 
-    for root, _dirs, files in os.walk(dir_path_content):
-        # Determine the relative directory inside the content root
-        rel_dir = os.path.relpath(root, dir_path_content)
-        # Compute corresponding destination directory
-        dest_current_dir = (
-            dest_dir_path if rel_dir == "." else os.path.join(dest_dir_path, rel_dir)
+    if index is None:
+        index = DirectoryIndex()
+    pages = _find_markdown_pages(dir_path_content, dest_dir_path, index)
+    # Compile the template once; every page render reuses it
+    template = Template.from_file(template_path, base_path, minify)
+    template_hash = hash_file(template_path) if manifest is not None else None
+
+    # (from_path, dest_path, source_hash) for every page that needs rendering
+    pending = []
+    hashed = any(
+        state is not None for state in (manifest, cache, site_index, search_index)
+    )
+    for from_path, dest_path, rel_path in pages:
+        if not hashed:
+            pending.append((from_path, dest_path, None))
+            continue
+        source_hash = index.source_hash(rel_path)
+        if (
+            manifest is not None
+            and manifest.is_fresh(
+                dest_path, source_hash, template_hash, base_path, minify
+            )
+            and (site_index is None or site_index.is_current(dest_path, source_hash))
+            and (
+                search_index is None
+                or search_index.is_current(dest_path, source_hash)
+            )
+        ):
+            continue
+        pending.append((from_path, dest_path, source_hash))
+
+    page_jobs = [
+        PageJob(
+            from_path,
+            template_path,
+            dest_path,
+            base_path,
+            template,
+            cache,
+            source_hash,
+            minify,
+            block_cache,
+            new_page_info(dest_path, source_hash, site_index, search_index),
         )
+        for from_path, dest_path, source_hash in pending
+    ]
+    outputs = [dest_path for _from_path, dest_path, _rel_path in pages]
+    if link_checker is not None:
+        if site_index is None:
+            raise ValueError("Link checking needs a SiteIndex to read links from")
+        link_checker.add_outputs(outputs)
+        collecting = {job.dest_path for job in page_jobs if job.page_info is not None}
+        for dest_path in outputs:
+            if dest_path not in collecting:
+                entry = site_index.entries[dest_path]
+                link_checker.check(
+                    entry["source"], dest_path, entry["links"], entry["images"]
+                )
 
-        for filename in files:
-            if not filename.lower().endswith(".md"):
-                continue
-            from_path = os.path.join(root, filename)
-            # Replace .md with .html for output filename
-            base_name = os.path.splitext(filename)[0] + ".html"
-            dest_path = os.path.join(dest_current_dir, base_name)
-            generate_page(from_path, template_path, dest_path, base_path)
+    on_result = None
+    if link_checker is not None:
+
+        def on_result(index, error, page_info):
+            # Queue a page's links as soon as it renders, so the checker's
+            # thread works through them while later pages render
+            job = page_jobs[index]
+            if error is None and page_info is not None:
+                link_checker.check(
+                    job.from_path, job.dest_path, page_info.links, page_info.images
+                )
+
+    # Create each output directory once instead of once per page
+    prepare_output_dirs(dest_path for _from_path, dest_path, _hash in pending)
+    results = _render_pages(page_jobs, jobs, io_threads, on_result)
+    if cache is not None:
+        cache.evict()
+
+    rendered = []
+    failures = []
+    for (from_path, dest_path, source_hash), (error, page_info) in zip(
+        pending, results
+    ):
+        if error is not None:
+            failures.append((from_path, error))
+            continue
+        if manifest is not None:
+            manifest.record(
+                dest_path, from_path, source_hash, template_hash, base_path, minify
+            )
+        if page_info is not None:
+            if site_index is not None:
+                site_index.record(dest_path, from_path, source_hash, page_info)
+            if page_info.terms is not None:
+                search_index.record(dest_path, source_hash, page_info)
+        rendered.append(dest_path)
+        if log.verbose:
+            log.detail(f"Generated page from {from_path} to {dest_path}")
+    log.count("pages", len(rendered))
+    log.count("unchanged_pages", len(pages) - len(pending))
+    log.count("failed_pages", len(failures))
+
+    if manifest is not None:
+        for dest_path in manifest.remove_stale(outputs, dest_dir_path):
+            log.info(f"Removed stale page {dest_path}")
+    if site_index is not None:
+        site_index.retain(outputs)
+    if search_index is not None:
+        search_index.retain(outputs)
+
+    broken = link_checker.finish() if link_checker is not None else []
+    if link_checker is not None and log.verbose:
+        log.detail(f"Checked {link_checker.checked} link(s) and image(s)")
+    if failures:
+        raise PageGenerationError(failures)
+    if broken:
+        raise BrokenLinksError(broken)
+    return rendered
@@ -0,0 +1,312 @@
+import os
+import time
+
+from assets import sync_file
+from buildlog import log
+from compress import DEFAULT_COMPRESS_WORKERS, compress_tree
+from manifest import hash_file, prune_empty_dirs
+from siteindex import write_feed, write_sitemap
+from template import Template
+from utils import (
+    generate_page,
+    generate_pages_recursive,
+    new_page_info,
+    page_dest_path,
+)
+
+
+def snapshot(content_dir, static_dir, template_path):
+    """Return {path: (mtime_ns, size)} for every watched input file."""
+    state = {}
+    for directory in (content_dir, static_dir):
+        for root, _dirs, files in os.walk(directory):
+            for filename in files:
+                path = os.path.join(root, filename)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    # Deleted between listing and stat; the next poll sees it
+                    continue
+                state[path] = (st.st_mtime_ns, st.st_size)
+    try:
+        st = os.stat(template_path)
+        state[template_path] = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        pass
+    return state
+
+
+class RebuildPlan:
+    """The outputs affected by a set of input changes.
+
+    - all_pages: the template changed, so every page must be re-rendered
+    - pages / removed_pages: markdown sources edited or added / deleted
+    - assets / removed_assets: static files edited or added / deleted
+    """
+
+    def __init__(self):
+        self.all_pages = False
+        self.pages = []
+        self.removed_pages = []
+        self.assets = []
+        self.removed_assets = []
+
+    def __bool__(self):
+        return bool(
+            self.all_pages
+            or self.pages
+            or self.removed_pages
+            or self.assets
+            or self.removed_assets
+        )
+
+
+def plan_rebuild(old, new, content_dir, static_dir, template_path):
+    """Compare two snapshots and work out what needs rebuilding."""
+    plan = RebuildPlan()
+    changed = sorted(path for path, stat in new.items() if old.get(path) != stat)
+    removed = sorted(set(old) - set(new))
+    content_prefix = os.path.join(content_dir, "")
+    static_prefix = os.path.join(static_dir, "")
+
+    for path in changed:
+        if path == template_path:
+            plan.all_pages = True
+        elif path.startswith(content_prefix):
+            if path.lower().endswith(".md"):
+                plan.pages.append(path)
+        elif path.startswith(static_prefix):
+            plan.assets.append(path)
+    for path in removed:
+        if path.startswith(content_prefix):
+            if path.lower().endswith(".md"):
+                plan.removed_pages.append(path)
+        elif path.startswith(static_prefix):
+            plan.removed_assets.append(path)
+    return plan
+
+
+class Watcher:
+    """Polls the site inputs and rebuilds only the outputs they affect.
+
+    A markdown edit re-renders that one page (with a BlockCache, only its
+    edited blocks), a template edit re-renders every page, and a static asset
+    change copies (or deletes) that one file. With a SiteIndex, page edits
+    update their entries, and with a site_url the sitemap and feed are
+    rewritten after every rebuild. With a SearchIndex, page edits replace
+    their postings and the changed shards are published again. With
+    compress, the .gz/.br copies of changed outputs are refreshed too.
+    """
+
+    def __init__(
+        self,
+        content_dir,
+        static_dir,
+        template_path,
+        dest_dir,
+        base_path,
+        manifest=None,
+        cache=None,
+        link_mode="copy",
+        minify=False,
+        block_cache=None,
+        site_index=None,
+        site_url=None,
+        search_index=None,
+        compress=False,
+        compress_workers=DEFAULT_COMPRESS_WORKERS,
+    ):
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.base_path = base_path
+        self.manifest = manifest
+        self.cache = cache
+        self.link_mode = link_mode
+        self.minify = minify
+        self.block_cache = block_cache
+        self.site_index = site_index
+        self.site_url = site_url
+        self.search_index = search_index
+        self.compress = compress
+        self.compress_workers = compress_workers
+        self.state = self._snapshot()
+
+    def _snapshot(self):
+        return snapshot(self.content_dir, self.static_dir, self.template_path)
+
+    def poll(self, debounce=0.2):
+        """Return a RebuildPlan for changes since the last poll, or None.
+
+        Once a change is seen, keeps re-scanning every debounce seconds until
+        the inputs stop changing, so a burst of saves causes a single rebuild.
+        """
+        current = self._snapshot()
+        if current == self.state:
+            return None
+        while True:
+            time.sleep(debounce)
+            settled = self._snapshot()
+            if settled == current:
+                break
+            current = settled
+        plan = plan_rebuild(
+            self.state, current, self.content_dir, self.static_dir, self.template_path
+        )
+        self.state = current
+        return plan
+
+    def rebuild(self, plan):
+        """Apply a RebuildPlan, reporting (not raising) per-output errors."""
+        for path in plan.removed_assets:
+            rel_path = os.path.relpath(path, self.static_dir)
+            dst_path = os.path.join(self.dest_dir, rel_path)
+            self._remove(dst_path)
+            if self.manifest is not None:
+                self.manifest.assets.pop(dst_path, None)
+        for path in plan.assets:
+            rel_path = os.path.relpath(path, self.static_dir)
+            dst_path = os.path.join(self.dest_dir, rel_path)
+            try:
+                os.makedirs(os.path.dirname(dst_path), exist_ok=True)
+                action = sync_file(path, dst_path, self.link_mode)
+                log.info(f"{action.capitalize()} {path} -> {dst_path}")
+            except OSError as e:
+                log.error(f"Error copying {path}: {e}")
+                continue
+            if self.manifest is not None:
+                self.manifest.assets[dst_path] = path
+
+        for path in plan.removed_pages:
+            dest_path = page_dest_path(path, self.content_dir, self.dest_dir)
+            self._remove(dest_path)
+            if self.manifest is not None:
+                self.manifest.entries.pop(dest_path, None)
+            if self.site_index is not None:
+                self.site_index.entries.pop(dest_path, None)
+            if self.search_index is not None:
+                self.search_index.remove(dest_path)
+
+        if plan.all_pages:
+            try:
+                generate_pages_recursive(
+                    self.content_dir,
+                    self.template_path,
+                    self.dest_dir,
+                    self.base_path,
+                    self.manifest,
+                    cache=self.cache,
+                    minify=self.minify,
+                    block_cache=self.block_cache,
+                    site_index=self.site_index,
+                    search_index=self.search_index,
+                )
+            except Exception as e:
+                log.error(f"Error: {e}")
+        else:
+            self._rebuild_pages(plan)
+
+        if self.manifest is not None:
+            self.manifest.save()
+        if self.site_index is not None:
+            self._update_site_files()
+        if self.search_index is not None:
+            self._update_search_index()
+        if self.compress:
+            # Only outputs whose variants are out of date are compressed again
+            try:
+                compress_tree(self.dest_dir, workers=self.compress_workers)
+            except OSError as e:
+                log.error(f"Error compressing outputs: {e}")
+        log.flush()
+
+    def _update_site_files(self):
+        self.site_index.save()
+        if not self.site_url:
+            return
+        try:
+            write_sitemap(self.site_index, self.dest_dir, self.base_path, self.site_url)
+            write_feed(self.site_index, self.dest_dir, self.base_path, self.site_url)
+        except OSError as e:
+            log.error(f"Error writing sitemap or feed: {e}")
+
+    def _update_search_index(self):
+        try:
+            self.search_index.publish(self.dest_dir, self.base_path)
+            self.search_index.save()
+        except OSError as e:
+            log.error(f"Error writing search index: {e}")
+
+    def _rebuild_pages(self, plan):
+        if not plan.pages:
+            return
+
+        try:
+            template = Template.from_file(
+                self.template_path, self.base_path, self.minify
+            )
+            template_hash = hash_file(self.template_path)
+        except OSError as e:
+            log.error(f"Error reading template: {e}")
+            return
+        for path in plan.pages:
+            dest_path = page_dest_path(path, self.content_dir, self.dest_dir)
+            page_info = None
+            try:
+                source_hash = hash_file(path)
+                page_info = new_page_info(
+                    dest_path, source_hash, self.site_index, self.search_index
+                )
+                generate_page(
+                    path,
+                    self.template_path,
+                    dest_path,
+                    self.base_path,
+                    template,
+                    self.cache,
+                    source_hash,
+                    self.minify,
+                    self.block_cache,
+                    page_info,
+                )
+            except Exception as e:
+                log.error(f"Error generating {path}: {e}")
+                continue
+            if page_info is not None and self.site_index is not None:
+                self.site_index.record(dest_path, path, source_hash, page_info)
+            if page_info is not None and page_info.terms is not None:
+                self.search_index.record(dest_path, source_hash, page_info)
+            log.info(f"Generated page from {path} to {dest_path}")
+            if self.manifest is not None:
+                self.manifest.record(
+                    dest_path,
+                    path,
+                    source_hash,
+                    template_hash,
+                    self.base_path,
+                    self.minify,
+                )
+
+    def _remove(self, path):
+        # Precompressed copies go too, so that the directory can be pruned
+        paths = [path, f"{path}.gz", f"{path}.br"] if self.compress else [path]
+        for removed in paths:
+            try:
+                os.remove(removed)
+                log.info(f"Removed {removed}")
+            except FileNotFoundError:
+                pass
+        prune_empty_dirs(os.path.dirname(path), self.dest_dir)
+
+    def run(self, interval=0.5, debounce=0.2):
+        """Poll forever, rebuilding after each settled burst of changes."""
+        log.info(
+            f"Watching {self.content_dir}, {self.static_dir} and {self.template_path}"
+        )
+        log.flush()
+        while True:
+            time.sleep(interval)
+            plan = self.poll(debounce)
+            if plan:
+                self.rebuild(plan)